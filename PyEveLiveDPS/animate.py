@@ -1,18 +1,23 @@
 """
 This class handles all the animation for peld
-it is the main loop of PELD, and runs in a separate thread
+it is the main loop of PELD, and runs on the Tk event loop with after()
 """
-import threading
 import time
 import numpy as np
 import matplotlib
 import simulator
 import simulationWindow
+from engine.ringbuffer import RingBuffer
+from fleetHistory import FleetHistory
+from engine.aggregator import CharacterHistory
+from perfMonitor import PerfMonitor
+from engine.events import coalesce
+from engine.parser import _emptyResult
 from peld import settings
 import logging
 
 
-class Animator(threading.Thread):
+class Animator():
     # zorder may be added as a settings in the future
     categories = {
         "dpsIn": { "zorder": 90 },
@@ -25,8 +30,10 @@ class Animator(threading.Thread):
         "capDamageIn": { "zorder": 30 },
         "mining": { "zorder": 20 }
         }
+    # the shortest time between frames while the main window is collapsed, in ms
+    collapsedFrameInterval = 200
+    
     def __init__(self, mainWindow, **kwargs):
-        threading.Thread.__init__(self, name="animator")
         self.mainWindow = mainWindow
         self.graph = mainWindow.graphFrame
         self.labelHandler = mainWindow.labelHandler
@@ -38,31 +45,65 @@ class Animator(threading.Thread):
         self.errorQueue = None
         self.fleetData = {}
         self.fleetMode = False
+        # character -> CharacterHistory, 'history' is the one being displayed
+        self.histories = {}
+        self.selectedCharacter = None
+        self.history = None
         
-        self.slowDown = False
         self.simulationEnabled = False
-        self.daemon = True
+        # the pending after() call and the perf_counter time it is due
+        self.running = False
+        self.afterId = None
+        self.deadline = None
+        # per stage timing of animate, for the performance overlay and the log
+        self.perfMonitor = PerfMonitor()
         
         self.changeSettings()
         self.start()
     
-    def run(self):
-        logging.info('Starting animator thread')
-        self.run = True
-        self.paused = False
-        self.time = time.time()
-        while self.run:
-            if not self.paused:
-                self.mainWindow.after(self.interval, self.animate)
-            sleepTime = (self.interval - 1)/1000 - (time.time() - self.time)
-            if (sleepTime > 0):
-                time.sleep(sleepTime)
-            #else: print("Warning, sleep time negative")
-            self.time = time.time()
+    def start(self):
+        logging.info('Starting animator')
+        self.running = True
+        self.restart()
+    
+    def restart(self):
+        """ starts a new series of deadlines, the first tick is one interval from now """
+        self.cancel()
+        self.deadline = time.perf_counter() + self.interval/1000
+        self.afterId = self.mainWindow.after(self.interval, self.tick)
+    
+    def cancel(self):
+        if self.afterId:
+            self.mainWindow.after_cancel(self.afterId)
+            self.afterId = None
             
     def stop(self):
-        self.run = False
-        self.mainWindow.after_cancel(self.animate)
+        self.running = False
+        self.cancel()
+    
+    def tick(self):
+        self.afterId = None
+        self.animate()
+        self.scheduleNext()
+    
+    def scheduleNext(self):
+        """
+        Deadlines are kept on a grid 'interval' apart, instead of counting from when
+        animate finished, so the time animate takes and a late timer don't add up to drift.
+        If animate has fallen a whole interval or more behind, the missed deadlines are
+        coalesced into one tick that runs right away instead of running them back to back.
+        The log worker keeps queueing ticks meanwhile, so no data is lost.
+        """
+        if not self.running:
+            return
+        interval = self.interval/1000
+        now = time.perf_counter()
+        self.deadline += interval
+        if self.deadline < now:
+            missed = int((now - self.deadline) // interval)
+            self.deadline += missed * interval
+            self.perfMonitor.dropTicks(missed)
+        self.afterId = self.mainWindow.after(max(round((self.deadline - now)*1000), 0), self.tick)
         
     def catchup(self):
         """This is just to 'clear' the graph"""
@@ -77,117 +118,210 @@ class Animator(threading.Thread):
             self.simulationEnabled = False
             
     def animate(self):
-        """ this function gets called every 'interval', and handles all the tracking data """
+        """
+        this function gets called every 'interval', and handles all the tracking data
+        new data is taken in every tick, the graph, labels and windows are only drawn when a frame is due
+        """
+        perf = self.perfMonitor
+        perf.startTick(self.interval, self.deadline)
         try:
             # data points are retrieved from either the simulator or the EVE logs
             if self.simulationEnabled:
-                newEntries = self.simulator.simulate()
+                character = None
+                logTicks = [{character: self.simulator.simulate()}]
             else:
-                newEntries = self.characterDetector.readLog()
+                # the logs are read and parsed off the Tk thread, these are the ticks queued since the last call
+                # every tracked character is read, only the selected one is displayed
+                character = self.characterDetector.selectedCharacter()
+                logTicks = self.characterDetector.readLogs()
+                perf.queued(len(logTicks), *self.characterDetector.queueStats())
+            if character != self.selectedCharacter:
+                self.showCharacter(character)
+            perf.lap('read')
             
-            # insert all the new values into the categories entries
-            self.categories["dpsOut"]["newEntry"] = newEntries[0]
-            self.categories["dpsIn"]["newEntry"] = newEntries[1]
-            self.categories["logiOut"]["newEntry"] = newEntries[2]
-            self.categories["logiIn"]["newEntry"] = newEntries[3]
-            self.categories["capTransfered"]["newEntry"] = newEntries[4]
-            self.categories["capRecieved"]["newEntry"] = newEntries[5]
-            self.categories["capDamageOut"]["newEntry"] = newEntries[6]
-            self.categories["capDamageIn"]["newEntry"] = newEntries[7]
-            self.categories["mining"]["newEntry"] = newEntries[8]
-            self.interval = settings.getInterval()
-            
-            # pops old values, adds new values, and passes those to the graph and other handlers
-            for category, items in self.categories.items():
-                if self.fleetMode and category != 'mining':
-                    for entry in items["newEntry"]:
-                        self.dataQueue.put({"category": category, "entry": entry})
-                # if items["settings"] is empty, this isn't a category that is being tracked
-                if items["settings"]:
-                    # remove old values
-                    items["historical"].pop(0)
-                    items["historicalDetails"].pop(0)
-                    # as values are broken up by weapon, add them together for the non-details views
-                    amountSum = sum([entry['amount'] for entry in items["newEntry"]])
-                    items["historical"].append(amountSum)
-                    items["historicalDetails"].append(items["newEntry"])
-                    # update totals if necessary
-                    if items["settings"][0].get("showTotal", False) and amountSum > 0:
-                        self.labelHandler.updateTotal(category, amountSum)
-                    # 'yValues' is for the actual DPS at that point in time, as opposed to raw values
-                    items["yValues"] = items["yValues"][1:]
-                    average = (np.sum(items["historical"])*(1000/self.interval))/self.arrayLength
-                    items["yValues"] = np.append(items["yValues"], average)
-                    # pass the values to the graph and other handlers
-                    if not items["labelOnly"] and not self.graphDisabled:
-                        self.graph.animateLine(items["yValues"], items["settings"], items["lines"], zorder=items["zorder"])
-                    color = self.findColor(category, average)
-                    self.labelHandler.updateLabel(category, average, color)
-                    self.detailsHandler.updateDetails(category, items["historicalDetails"])
+            # if the Tk thread fell behind several ticks are waiting, each one still moves the graph by one
+            for logEntries in logTicks:
+                self.addTick(character, logEntries)
             
             # Find highest average for the y-axis scaling
             # We need to track graph avg and label avg separately, since graph avg is used for y-axis scaling
-            #  and label average is needed for detecting when to slow down the animation
+            #  and label average is needed for detecting when there is nothing left to draw
             self.highestAverage = 0
             self.highestLabelAverage = 0
             for category, items in self.categories.items():
                 if items["settings"] and not items["labelOnly"]:
-                    highest = max(items["yValues"])
+                    highest = self.history.yValues[category].max()
                     if highest > self.highestAverage:
                         self.highestAverage = highest
                 elif items["settings"]:
-                    highest = max(items["yValues"])
+                    highest = self.history.yValues[category].max()
                     if highest > self.highestLabelAverage:
                         self.highestLabelAverage = highest
+            perf.lap('aggregate')
             
-            if not self.graphDisabled:
-                self.graph.readjust(self.highestAverage)
-            
-            # if there are no values coming in to the graph, enable 'slowDown' mode to save CPU
-            if self.highestAverage == 0 and self.highestLabelAverage == 0 and not self.fleetMode:
-                if not self.slowDown:
-                    self.slowDown = True
-                    self.interval = 500
-            else:
-                if self.slowDown:
-                    self.slowDown = False
-                    self.interval = settings.getInterval()
-            
-            # display of pilot details is handled after all values are updated, for sorting and such
-            self.detailsHandler.cleanupAndDisplay(self.interval, self.arrayLength, lambda x,y: self.findColor(x,y))
-
             if self.fleetMode:
-                self.updateFleetWindow(self.mainWindow.fleetWindow)
+                self.updateFleetData(self.mainWindow.fleetWindow)
+                perf.lap('fleet')
+            
+            if self.frameDue():
+                self.drawFrame()
             
         except Exception as e:
             logging.exception(e)
+        finally:
+            perf.endTick()
+    
+    def addTick(self, character, logEntries):
+        """ adds one tick of entries, character -> the lists from LogParser.readLog, to the histories """
+        perf = self.perfMonitor
+        newEntries = logEntries.get(character, _emptyResult)
+        
+        # insert all the new values into the categories entries
+        self.categories["dpsOut"]["newEntry"] = newEntries[0]
+        self.categories["dpsIn"]["newEntry"] = newEntries[1]
+        self.categories["logiOut"]["newEntry"] = newEntries[2]
+        self.categories["logiIn"]["newEntry"] = newEntries[3]
+        self.categories["capTransfered"]["newEntry"] = newEntries[4]
+        self.categories["capRecieved"]["newEntry"] = newEntries[5]
+        self.categories["capDamageOut"]["newEntry"] = newEntries[6]
+        self.categories["capDamageIn"]["newEntry"] = newEntries[7]
+        self.categories["mining"]["newEntry"] = newEntries[8]
+        
+        # the whole tick goes to the fleet server as one message, with hits summed per pilot and weapon
+        if self.fleetMode:
+            fleetEntries = {category: coalesce(items["newEntry"]) for category, items in self.categories.items()
+                            if category != 'mining' and items["newEntry"]}
+            if fleetEntries:
+                self.dataQueue.put({"entries": fleetEntries})
+            perf.lap('fleet')
+        
+        # pops old values, adds new values, and keeps totals, peaks and details up to date for the next frame
+        for category, items in self.categories.items():
+            # if items["settings"] is empty, this isn't a category that is being tracked
+            if items["settings"]:
+                # pushing into the ring buffers also drops the oldest values
+                amountSum, average, droppedEntries = self.history.push(category, items["newEntry"])
+                # update totals if necessary
+                if items["settings"][0].get("showTotal", False) and amountSum > 0:
+                    self.labelHandler.updateTotal(category, amountSum)
+                items["average"] = average
+                # yValues only moved by one, so only the newest smoothed point has to be calculated
+                if items["ySmooth"] is not None:
+                    items["ySmooth"].push(self.graph.smoothTail(self.history.yValues[category].view(), self.graph.degree))
+                # peaks are checked every tick, not just the ones that get drawn
+                self.labelHandler.updatePeak(category, average)
+                perf.lap('aggregate')
+                self.detailsHandler.updateDetails(category, items["newEntry"], droppedEntries)
+                perf.lap('details')
+        # pruning keeps the running totals bounded, so it can't wait for the details window to be shown
+        self.detailsHandler.prune()
+        perf.lap('details')
+        
+        # the other characters only need their history kept, for when they are selected
+        for otherCharacter, otherEntries in logEntries.items():
+            if otherCharacter != character:
+                self.historyFor(otherCharacter).pushAll(otherEntries)
+        perf.lap('aggregate')
+    
+    def frameDue(self):
+        """
+        The frame rate adapts to what can be seen: nothing is drawn while the main window is minimized,
+         one last frame is drawn once every value has dropped to zero, and frames are spaced out to
+         'collapsedFrameInterval' while the window is collapsed over the game.
+        Everything a frame shows is kept up to date every tick, so skipped frames are never missed.
+        """
+        self.ticksSinceFrame += 1
+        if not self.mainWindow.winfo_viewable():
+            return False
+        idle = self.highestAverage == 0 and self.highestLabelAverage == 0 and not self.fleetMode
+        if idle and self.idleFrameDrawn:
+            return False
+        frameInterval = self.interval
+        if self.mainWindow.collapsed:
+            frameInterval = max(frameInterval, self.collapsedFrameInterval)
+        if self.ticksSinceFrame*self.interval < frameInterval:
+            return False
+        self.ticksSinceFrame = 0
+        self.idleFrameDrawn = idle
+        return True
     
-    def updateFleetWindow(self, fleetWindow):
+    def drawFrame(self):
+        """ passes the current values to the graph, labels, details and fleet windows """
+        perf = self.perfMonitor
+        for category, items in self.categories.items():
+            if items["settings"]:
+                if not items["labelOnly"] and not self.graphDisabled:
+                    smoothed = items["ySmooth"].view() if items["ySmooth"] is not None else None
+                    self.graph.animateLine(self.history.yValues[category].view(), items["settings"], items["lines"], 
+                                           zorder=items["zorder"], smoothed=smoothed)
+                    perf.lap('graph')
+                color = self.findColor(category, items["average"])
+                self.labelHandler.updateLabel(category, items["average"], color)
+                perf.lap('labels')
+        
+        if not self.graphDisabled:
+            self.graph.readjust(self.highestAverage)
+            perf.lap('graph')
+        
+        # display of pilot details is handled after all values are updated, for sorting and such
+        if self.mainWindow.detailsWindow.winfo_viewable():
+            self.detailsHandler.display(self.interval, self.arrayLength, lambda x,y: self.findColor(x,y))
+            perf.lap('details')
+        
+        if self.fleetMode and self.mainWindow.fleetWindow.winfo_viewable():
+            self.mainWindow.fleetWindow.displayFleetData(self.fleetData)
+            self.mainWindow.fleetWindow.displayAggregate(self.fleetData)
+            perf.lap('fleet')
+        perf.frameDrawn()
+    
+    def historyFor(self, character):
+        if character not in self.histories:
+            trackedCategories = [category for category, items in self.categories.items() if items["settings"]]
+            self.histories[character] = CharacterHistory(trackedCategories, self.arrayLength, self.interval)
+        return self.histories[character]
+    
+    def showCharacter(self, character):
+        """
+        Displays the history kept for 'character' from the next frame on.
+        Unless every character is being tracked this is a new, empty history.
+        The smoothed line, details and label totals are rebuilt from the history,
+         after that they are updated every tick like before.
+        """
+        self.selectedCharacter = character
+        self.history = self.historyFor(character)
+        self.detailsHandler.reset()
+        for category, items in self.categories.items():
+            if items["settings"]:
+                items["average"] = self.history.yValues[category].view()[-1]
+                if items["ySmooth"] is not None:
+                    for smoothed in self.graph.smoothListGaussian(self.history.yValues[category].view(), self.graph.degree):
+                        items["ySmooth"].push(smoothed)
+                for entries in self.history.historicalDetails[category].view():
+                    self.detailsHandler.updateDetails(category, entries, [])
+                self.labelHandler.restoreValues(category, self.history.totals[category], self.history.peaks[category])
+        self.ticksSinceFrame = self.arrayLength
+        self.idleFrameDrawn = False
+    
+    def clearValues(self):
+        """ the Clear Total/Peak Values menu option """
+        self.history.clearValues()
+        self.labelHandler.clearValues(self.findColor)
+    
+    def updateFleetData(self, fleetWindow):
         fleetWindow.processErrorQueue(self.errorQueue)
         fleetWindow.processMetadataQueue(self.fleetMetadataQueue)
         if not settings.fleetWindowShow:
             while not self.dataRecieveQueue.empty():
                 fleetEntry = self.dataRecieveQueue.get(False)
             return
-        fleetWindow.processRecieveQueue(self.dataRecieveQueue, self.fleetData, self.arrayLength)
-        for category, pilots in self.fleetData.items():
-            toDelete = []
-            for pilot, entries in pilots.items():
-                average = (np.sum(entries["historical"])*(1000/self.interval))/self.arrayLength
-                if category != 'aggregate' and max(entries["yValues"]) == 0 and average == 0 and pilot != fleetWindow.characterName:
-                    toDelete.append(pilot)
-                entries["yValues"] = entries["yValues"][1:]
-                entries["yValues"] = np.append(entries["yValues"], average)
-            for pilot in toDelete:
-                del pilots[pilot]
-        fleetWindow.displayFleetData(self.fleetData)
-        fleetWindow.displayAggregate(self.fleetData['aggregate'])
+        fleetWindow.processRecieveQueue(self.dataRecieveQueue, self.fleetData)
+        for history in self.fleetData.values():
+            history.update(self.interval)
         
     def changeSettings(self):
         """This function is called when a user changes settings after the settings are verified"""
-        if self.is_alive():
-            self.paused = True
-            self.mainWindow.after_cancel(self.animate)
+        if self.running:
+            self.cancel()
             self.graph.subplot.clear()
         if self.simulationEnabled:
             self.simulationSettings(enable=False)
@@ -196,7 +330,6 @@ class Animator(threading.Thread):
             self.mainWindow.topLabel.grid_remove()
             self.mainWindow.mainMenu.menu.entryconfig(5, state="normal")
         
-        self.slowDown = False
         self.seconds = settings.getSeconds()
         self.interval = settings.getInterval()
         self.categories["dpsOut"]["settings"] = settings.getDpsOutSettings()
@@ -229,10 +362,13 @@ class Animator(threading.Thread):
             self.mainWindow.fleetWindow.withdraw()
         
         self.arrayLength = int((self.seconds*1000)/self.interval)
-        historicalTemplate = [0] * self.arrayLength
-        yValuesTemplate = np.array([0] * self.arrayLength)
-        ySmooth = self.graph.smoothListGaussian(yValuesTemplate, 5)
+        self.perfMonitor.reset()
+        # the first tick always draws, to show the cleared graph and labels
+        self.ticksSinceFrame = self.arrayLength
+        self.idleFrameDrawn = False
+        ySmooth = self.graph.smoothListGaussian(np.zeros(self.arrayLength), self.graph.degree)
         # resets all the arrays to contain no values
+        self.detailsHandler.reset()
         showAnyPeakOrTotal = False
         for category, items in self.categories.items():
             if items["settings"]:
@@ -244,9 +380,8 @@ class Animator(threading.Thread):
                 showAnyPeakOrTotal = showAnyPeakOrTotal or showPeak or showTotal
                 self.labelHandler.enableTotal(category, findColor, showTotal)
                 self.detailsHandler.enableLabel(category, True)
-                items["historical"] = historicalTemplate.copy()
-                items["historicalDetails"] = [[]] * self.arrayLength
-                items["yValues"] = yValuesTemplate.copy()
+                items["ySmooth"] = RingBuffer(len(ySmooth)) if len(ySmooth) > 0 else None
+                items["average"] = 0
                 items["labelOnly"] = items["settings"][0].get("labelOnly", False)
                 if not items["labelOnly"]:
                     plotLine, = self.graph.subplot.plot(ySmooth, zorder=items["zorder"])
@@ -256,7 +391,11 @@ class Animator(threading.Thread):
                 self.labelHandler.enablePeak(category, False)
                 self.detailsHandler.enableLabel(category, False)
 
-        self.mainWindow.showClearMenuOption(showAnyPeakOrTotal, lambda: self.labelHandler.clearValues(self.findColor))
+        self.mainWindow.showClearMenuOption(showAnyPeakOrTotal, self.clearValues)
+        
+        # every character starts over with the new window length and categories
+        self.histories = {}
+        self.history = self.historyFor(self.selectedCharacter)
         
         if not self.graphDisabled:
             self.graph.subplot.margins(0,0)
@@ -267,43 +406,16 @@ class Animator(threading.Thread):
         characterName = self.mainWindow.fleetWindow.characterName
         if self.dataQueue:
             self.fleetData = {
-                'aggregate': {
-                    'dpsOut': {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    },
-                    'dpsIn': {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    },
-                    'logiOut': {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    }
-                },
-                'dpsOut': {
-                    characterName: {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    }
-                },
-                'dpsIn': {
-                    characterName: {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    }
-                },
-                'logiOut': {
-                    characterName: {
-                        'historical': historicalTemplate.copy(),
-                        'yValues': yValuesTemplate.copy()
-                    }
-                }
+                'dpsOut': FleetHistory(self.arrayLength, characterName),
+                'dpsIn': FleetHistory(self.arrayLength, characterName),
+                'logiOut': FleetHistory(self.arrayLength, characterName)
             }
         self.mainWindow.fleetWindow.resetGraphs(ySmooth)
         self.mainWindow.fleetWindow.changeSettings()
         
-        self.paused = False
+        # the interval may have changed, so the deadlines start over
+        if self.running:
+            self.restart()
         
     def findColor(self, category, value):
         """
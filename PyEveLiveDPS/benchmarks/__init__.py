@@ -0,0 +1,14 @@
+"""
+Benchmarks for the parse -> aggregate -> render pipeline, run from the
+PyEveLiveDPS directory:
+
+    python -m benchmarks                              everything, report printed as a table
+    python -m benchmarks --output report.json         also write the machine readable report
+    python -m benchmarks --compare baseline.json      flag anything more than 10% slower than a saved report
+    python -m benchmarks --only readLog animateLine   just these benchmarks
+
+The benchmarks run on synthetic logs and an in-memory copy of the default
+profile, so they don't depend on (or change) the user's settings.  The
+animate and detailsHandler benchmarks need tk and a display, without one
+they are reported as skipped.
+"""
@@ -0,0 +1,74 @@
+import sys
+import json
+import logging
+import argparse
+
+from benchmarks import runner
+# importing these registers their benchmarks
+from benchmarks import pipeline
+from benchmarks import gui
+
+def formatParams(params):
+    return ' '.join('%s=%s' % (key, value) for key, value in sorted(params.items()))
+
+def printResults(results):
+    print('%-20s %-40s %12s %12s %16s' % ('benchmark', 'params', 'median ms', 'min ms', 'throughput'))
+    for result in results:
+        if result['status'] != 'ok':
+            print('%-20s %-40s %12s   %s' % (result['name'], formatParams(result['params']), result['status'], result['reason']))
+            continue
+        throughput = '%.0f %s/s' % (result['throughput'], result['unit']) if result['throughput'] else '-'
+        print('%-20s %-40s %12.3f %12.3f %16s' % (result['name'], formatParams(result['params']),
+              result['median']*1000, result['min']*1000, throughput))
+
+def printComparison(rows, threshold):
+    print()
+    print('%-20s %-40s %12s %12s %8s' % ('compared to', 'baseline', 'before ms', 'now ms', 'ratio'))
+    for result, before, ratio, regressed in rows:
+        flag = '  SLOWER' if regressed else ''
+        print('%-20s %-40s %12.3f %12.3f %8.2f%s' % (result['name'], formatParams(result['params']),
+              before*1000, result['median']*1000, ratio, flag))
+    regressions = len([row for row in rows if row[3]])
+    if regressions:
+        print('%d result(s) more than %d%% slower than the baseline' % (regressions, threshold*100))
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='python -m benchmarks', description='benchmark the parse, aggregate and render pipeline')
+    argParser.add_argument('--only', nargs='+', choices=runner.benchmarkNames(), help='only run these benchmarks')
+    argParser.add_argument('--samples', type=int, default=5, help='timed samples per benchmark, the median is reported')
+    argParser.add_argument('--quick', action='store_true', help='smaller inputs, for checking the benchmarks themselves')
+    argParser.add_argument('--headless', action='store_true', help='skip the benchmarks that need a display')
+    argParser.add_argument('--output', help='write the json report to this file')
+    argParser.add_argument('--json', action='store_true', help='print the json report instead of a table')
+    argParser.add_argument('--compare', help='a saved json report to compare against')
+    argParser.add_argument('--threshold', type=float, default=0.1, help='slowdown that counts as a regression, 0.1 is 10%%')
+    args = argParser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s:%(name)s:%(levelname)s - %(message)s')
+    display = not args.headless and gui.displayAvailable()
+    progress = None
+    if not args.json:
+        progress = lambda result: print('running ' + result['name'] + ' ' + formatParams(result['params']), file=sys.stderr, flush=True)
+    results = runner.run(args.only, args.samples, args.quick, display, progress)
+    report = runner.makeReport(results, display)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as output:
+            json.dump(report, output, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        printResults(results)
+
+    if args.compare:
+        with open(args.compare, encoding='utf8') as baselineFile:
+            baseline = json.load(baselineFile)
+        rows = runner.compare(report, baseline, args.threshold)
+        if not args.json:
+            printComparison(rows, args.threshold)
+        if any(regressed for result, before, ratio, regressed in rows):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Benchmarks that need tk and a display: a full Animator tick, from reading
+the log to the labels and the details window, and the details window on
+its own with many pilots.
+"""
+
+import logging
+import random
+import tkinter as tk
+
+from peld import settings
+from engine.events import Event, sessionSymbols
+from animate import Animator
+from graph import DPSGraph
+from labelHandler import LabelHandler
+from detailsWindow import DetailsWindow
+from detailsHandler import DetailsHandler
+from fleetWindow import FleetWindow
+from engine.ringbuffer import RingBuffer
+from benchmarks.runner import benchmark, timeSamples
+from loggenerator import GamelogGenerator, LogFeed, defaultRates, scaledRates
+from benchmarks.pipeline import useProfile
+
+def displayAvailable():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return False
+    root.destroy()
+    return True
+
+class BenchmarkWindow(tk.Tk):
+    """
+    The parts of MainWindow the Animator uses, with the real graph, labels,
+    details and fleet windows, but no menus, log watching or update checks
+    """
+    def __init__(self, characterDetector):
+        tk.Tk.__init__(self)
+        self.wm_title("PELD benchmark")
+        self.configure(background="black")
+        self.characterDetector = characterDetector
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        self.geometry("%sx%s" % (settings.getWindowWidth(), settings.getWindowHeight()))
+        self.labelHandler = LabelHandler(self, background="black")
+        self.labelHandler.grid(row="0", column="0", sticky="news")
+        self.graphFrame = DPSGraph(self, blit=True, background="black", borderwidth="0")
+        self.graphFrame.grid(row="1", column="0", sticky="nesw")
+        self.detailsWindow = DetailsWindow(self)
+        self.fleetWindow = FleetWindow(self)
+        # the graph needs a real size before the first readjust
+        self.update()
+
+    collapsed = False
+
+    def makeAllChildrenDraggable(self, widget):
+        pass
+
+    def showClearMenuOption(self, show, command):
+        pass
+
+class BenchmarkAnimator(Animator):
+    """ an Animator that is never scheduled, the benchmark calls animate() itself """
+    def start(self):
+        pass
+
+class ErrorCounter(logging.Handler):
+    """ animate() logs exceptions instead of raising them, this turns them back into a failed benchmark """
+    def __init__(self):
+        logging.Handler.__init__(self, logging.ERROR)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def __enter__(self):
+        logging.getLogger().addHandler(self)
+        return self
+
+    def __exit__(self, *exc):
+        logging.getLogger().removeHandler(self)
+        if self.records and not exc[0]:
+            raise RuntimeError('animate logged an error: ' + self.records[0].getMessage())
+
+@benchmark('animate', 'ticks', display=True, seconds=[10, 30], interval=[100, 50], categories=[2, 9])
+def animateBenchmark(samples, quick, seconds, interval, categories):
+    """ whole ticks at about 200 log lines per second, after a full window of warmup """
+    ticks = 10 if quick else 50
+    useProfile(seconds, interval, categories)
+    # the LogFeed stands in for the CharacterDetector
+    feed = LogFeed(GamelogGenerator('english', rates=scaledRates(defaultRates, 200), seed=1), interval)
+    window = BenchmarkWindow(feed)
+    try:
+        with ErrorCounter():
+            animator = BenchmarkAnimator(window)
+            for warmup in range(animator.arrayLength):
+                animator.animate()
+            times = timeSamples(lambda: [animator.animate() for tick in range(ticks)], samples)
+    finally:
+        window.destroy()
+    return ticks, times
+
+@benchmark('detailsHandler', 'ticks', display=True, pilots=[10, 50, 200])
+def detailsBenchmark(samples, quick, pilots):
+    """ updateDetails for three categories, prune and display, with every pilot hitting about every third tick """
+    ticks = 10 if quick else 50
+    interval = 100
+    arrayLength = int(10*1000/interval)
+    useProfile(categories=3)
+    categories = ['dpsOut', 'dpsIn', 'logiOut']
+    intern = sessionSymbols.intern
+    pilotIds = [(intern('Details Pilot %d' % pilot), intern('Ship %d' % (pilot % 7))) for pilot in range(pilots)]
+    weapons = [intern('Weapon %d' % weapon) for weapon in range(4)]
+    rnd = random.Random(1)
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        detailsHandler = DetailsHandler(root, background="black")
+        detailsHandler.grid(row="0", column="0", sticky="news")
+        for category in categories:
+            detailsHandler.enableLabel(category, True)
+        history = {category: RingBuffer(arrayLength, dtype=object, fill=list) for category in categories}
+        def tick():
+            for category in categories:
+                newEntries = [Event(rnd.randint(1, 1000), pilot, ship, rnd.choice(weapons))
+                              for pilot, ship in pilotIds if rnd.random() < 0.3]
+                detailsHandler.updateDetails(category, newEntries, history[category].push(newEntries))
+            detailsHandler.prune()
+            detailsHandler.display(interval, arrayLength, lambda category, amount: '#FFFFFF')
+        for warmup in range(arrayLength):
+            tick()
+        times = timeSamples(lambda: [tick() for index in range(ticks)], samples)
+    finally:
+        root.destroy()
+    return ticks, times
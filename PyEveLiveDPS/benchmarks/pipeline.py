@@ -0,0 +1,172 @@
+"""
+Benchmarks that don't need tk: log parsing, the moving averages, graph math
+and drawing on an Agg canvas, and fleet aggregation.
+"""
+
+import copy
+import queue
+import random
+import datetime
+import itertools
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from peld import settings
+from engine.parser import _logLanguageRegex
+from engine.aggregator import CharacterHistory, categories as logCategories
+from logreader import BaseLogReader
+from graph import DPSGraph
+from fleetHistory import FleetHistory
+from fleetWindow import FleetWindow
+from benchmarks.runner import benchmark, timeSamples
+from loggenerator import GamelogGenerator, LogFeed
+
+# categories in the order Animator tracks them, benchmarks enable the first N
+trackedCategories = ['dpsOut', 'dpsIn', 'logiOut', 'logiIn', 'capTransfered', 'capRecieved',
+                     'capDamageOut', 'capDamageIn', 'mining']
+
+def useProfile(seconds=10, interval=100, categories=2, transitions=1):
+    """
+    Replaces the current profile with a copy of the default one, in memory only,
+     so benchmarks never depend on (or write to) the user's settings file
+    """
+    profile = copy.deepcopy(settings.defaultProfile[0]['profileSettings'])
+    profile['seconds'] = seconds
+    profile['interval'] = interval
+    profile['detailsWindow']['show'] = 0
+    profile['fleetWindow']['show'] = 0
+    for index, category in enumerate(trackedCategories):
+        if index < categories:
+            profile[category] = lineSettings(transitions)
+        else:
+            profile[category] = []
+    settings.lowCPUMode = False
+    # an empty overviewFiles keeps the overview notification from popping up
+    settings.allSettings = [{'profile': 'Default', 'overviewFiles': {}, 'profileSettings': profile}]
+    settings.currentProfile = profile
+    return profile
+
+def lineSettings(transitions):
+    """ 'transitions' colors for one category, each kicking in 100 higher than the last """
+    colors = ['#00FFFF', '#FFFF00', '#FF0000', '#FF00FF']
+    return [{'color': colors[index % len(colors)], 'transitionValue': index*100, 'labelOnly': 0, 'showPeak': 0}
+            for index in range(transitions)]
+
+class AggGraph(DPSGraph):
+    """ a DPSGraph drawn on a plain Agg canvas, so the graph can be measured without tk or a display """
+    def __init__(self, width=350, height=160, blit=False):
+        # tk.Frame.__init__ is skipped, there is no tk parent here
+        self.width = width
+        self.height = height
+        self.degree = 5
+        self.xValues = np.arange(0)
+        self.blit = blit
+        self.background = None
+        self.blitKey = None
+        self.createFigure()
+        self.graphFigure.set_size_inches(width/100, height/100)
+        self.canvas = FigureCanvasAgg(self.graphFigure)
+        if self.blit:
+            self.canvas.mpl_connect('draw_event', self.onDraw)
+        self.canvas.draw()
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+def newReader(language, character='Benchmark Character'):
+    """ a BaseLogReader for 'language' without a log file, call useProfile first """
+    reader = BaseLogReader(None, None)
+    reader.character = character
+    reader.language = language
+    reader.compileRegex()
+    return reader
+
+@benchmark('readLog', 'lines', language=list(_logLanguageRegex))
+def readLogBenchmark(samples, quick, language):
+    lineCount = 2000 if quick else 20000
+    useProfile()
+    reader = newReader(language)
+    generator = GamelogGenerator(language, seed=1)
+    body = '\n'.join(itertools.islice(generator.lines(datetime.datetime(2018, 1, 1)), lineCount)) + '\n'
+    reader.readLog(body)
+    return lineCount, timeSamples(lambda: reader.readLog(body), samples)
+
+@benchmark('aggregate', 'ticks', seconds=[10, 60], interval=[100, 50])
+def aggregateBenchmark(samples, quick, seconds, interval):
+    """ one tick of every category into a CharacterHistory, which both the Animator and the headless Engine keep """
+    ticks = 100 if quick else 1000
+    feed = LogFeed(GamelogGenerator(seed=1), interval)
+    logTicks = [feed.readLog() for tick in range(ticks)]
+    history = CharacterHistory(logCategories, int(seconds*1000/interval), interval)
+    def aggregate():
+        for newEntries in logTicks:
+            history.pushAll(newEntries)
+    return ticks, timeSamples(aggregate, samples)
+
+@benchmark('smoothListGaussian', 'calls', seconds=[10, 60], interval=[100])
+def smoothBenchmark(samples, quick, seconds, interval):
+    calls = 100 if quick else 1000
+    graph = AggGraph()
+    values = np.random.RandomState(1).randint(0, 1000, size=int(seconds*1000/interval)).astype(float)
+    def smooth():
+        for call in range(calls):
+            graph.smoothListGaussian(values, graph.degree)
+    return calls, timeSamples(smooth, samples)
+
+@benchmark('animateLine', 'frames', seconds=[10, 60], transitions=[1, 3], blit=[False, True])
+def animateLineBenchmark(samples, quick, seconds, transitions, blit):
+    """ one frame is what the animator does per category and tick: smooth, bin into colored lines, then draw """
+    frames = 10 if quick else 50
+    interval = 100
+    length = int(seconds*1000/interval)
+    graph = AggGraph(blit=blit)
+    categories = lineSettings(transitions)
+    lines = []
+    rnd = np.random.RandomState(1)
+    values = rnd.randint(0, 100*transitions + 100, size=length*2 + frames*samples + 1).astype(float)
+    position = [0]
+    def frame():
+        start = position[0]
+        yValues = values[start:start + length]
+        graph.animateLine(yValues, categories, lines, zorder=100)
+        graph.readjust(yValues.max())
+        position[0] += 1
+    for warmup in range(5):
+        frame()
+    return frames, timeSamples(lambda: [frame() for index in range(frames)], samples)
+
+@benchmark('fleetAggregation', 'ticks', pilots=[10, 100, 250])
+def fleetBenchmark(samples, quick, pilots):
+    """ a tick of fleet mode without the graphs: the recieve queue, the moving averages and the top three """
+    ticks = 20 if quick else 100
+    interval = 100
+    arrayLength = int(10*1000/interval)
+    fleetWindow = FleetWindow.__new__(FleetWindow)
+    fleetData = {category: FleetHistory(arrayLength, 'Benchmark Character') for category in ['dpsOut', 'dpsIn', 'logiOut']}
+    rnd = random.Random(1)
+    messages = []
+    for pilot in range(pilots):
+        entries = {'dpsOut': [['Enemy', 'Ship', 'Weapon', rnd.randint(100, 900)]],
+                   'dpsIn': [['Enemy', 'Ship', 'Weapon', rnd.randint(100, 600)]]}
+        if pilot % 5 == 0:
+            entries['logiOut'] = [['Friend', 'Ship', 'Repairer', rnd.randint(100, 500)]]
+        messages.append({'owner': 'Pilot %d' % pilot, 'entries': entries})
+    recieveQueue = queue.Queue()
+    def tick():
+        for message in messages:
+            recieveQueue.put(message)
+        FleetWindow.processRecieveQueue(fleetWindow, recieveQueue, fleetData)
+        for history in fleetData.values():
+            history.update(interval)
+            history.top(3)
+    def run():
+        for index in range(ticks):
+            tick()
+    # the first window fills every pilot's history
+    for index in range(arrayLength):
+        tick()
+    return ticks, timeSamples(run, samples)
@@ -0,0 +1,135 @@
+"""
+Timing and the report format shared by every benchmark.
+
+A benchmark is a function registered with @benchmark, which is called once
+per parameter combination.  It does its own setup, then returns the
+seconds taken by each of its samples, measured around the code under test
+only, along with how much work one sample did (lines, ticks, pilots...).
+
+The report is a single json document:
+
+    {
+        "version": 1,
+        "commit": "<git commit, if there is one>",
+        "created": "<iso time>",
+        "environment": {"python": ..., "platform": ..., "numpy": ..., "matplotlib": ..., "display": true},
+        "results": [
+            {"name": "readLog", "params": {"language": "english"}, "unit": "lines",
+             "work": 20000, "samples": 5, "median": 0.031, "min": 0.030, "max": 0.033,
+             "throughput": 645161.3},
+            {"name": "animate", "params": {...}, "status": "skipped", "reason": "needs a display for tk"}
+        ]
+    }
+
+median/min/max are seconds per sample and throughput is work per second at
+the median.  Results are matched between reports by name and params.
+"""
+
+import sys
+import time
+import json
+import platform
+import datetime
+import itertools
+import subprocess
+import statistics
+
+_reportVersion = 1
+
+# name -> (function, parameter grid, unit, needs a display)
+_benchmarks = {}
+
+def benchmark(name, unit, display=False, **grid):
+    """
+    Registers a benchmark, every keyword is a list of parameter values
+    and the benchmark is run once for every combination of them
+    """
+    def register(function):
+        _benchmarks[name] = (function, grid, unit, display)
+        return function
+    return register
+
+def benchmarkNames():
+    return list(_benchmarks)
+
+def parameterSets(grid):
+    keys = sorted(grid)
+    for values in itertools.product(*[grid[key] for key in keys]):
+        yield dict(zip(keys, values))
+
+def timeSamples(function, samples):
+    """ perf_counter seconds of 'samples' calls of function() """
+    times = []
+    for sample in range(samples):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+def resultKey(result):
+    return result['name'] + json.dumps(result['params'], sort_keys=True)
+
+def run(names=None, samples=5, quick=False, display=True, progress=None):
+    """ runs the named benchmarks (all of them by default), returns the results """
+    results = []
+    for name, (function, grid, unit, needsDisplay) in _benchmarks.items():
+        if names and name not in names:
+            continue
+        for params in parameterSets(grid):
+            result = {'name': name, 'params': params, 'unit': unit}
+            if progress:
+                progress(result)
+            if needsDisplay and not display:
+                result.update(status='skipped', reason='needs a display for tk')
+                results.append(result)
+                continue
+            work, times = function(samples=samples, quick=quick, **params)
+            median = statistics.median(times)
+            result.update(status='ok', work=work, samples=len(times), median=median,
+                          min=min(times), max=max(times), throughput=work/median if median else None)
+            results.append(result)
+    return results
+
+def gitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment(display):
+    import numpy
+    import matplotlib
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': numpy.__version__,
+        'matplotlib': matplotlib.__version__,
+        'display': display
+        }
+
+def makeReport(results, display):
+    return {
+        'version': _reportVersion,
+        'commit': gitCommit(),
+        'created': datetime.datetime.now().isoformat(),
+        'environment': environment(display),
+        'results': results
+        }
+
+def compare(report, baseline, threshold):
+    """
+    (result, baseline median, ratio, regressed) for every result that is in both reports,
+     a result regressed if it got more than 'threshold' slower
+    """
+    baselineResults = {resultKey(result): result for result in baseline['results'] if result.get('status') == 'ok'}
+    rows = []
+    for result in report['results']:
+        key = resultKey(result)
+        if result.get('status') != 'ok' or key not in baselineResults:
+            continue
+        before = baselineResults[key]['median']
+        ratio = result['median']/before if before else float('inf')
+        rows.append((result, before, ratio, ratio > 1 + threshold))
+    return rows
@@ -4,115 +4,171 @@ DetailsHandler:
 Maintains all the pilot and weapon groups for the details window
  and the child DetailFrame
 It handles grouping all the data under unique weapons and pilots
+Each weapon group keeps a running total of the entries inside the graph window,
+ the animator passes in the entries entering and leaving the window every tick,
+ so the window never has to be re-walked
+Groups and pilots whose totals dropped to zero are pruned every tick, whether the
+ details window is shown or not, the display itself is only updated while it is
 
 DetailFrame:
 
 Contains the tk Labels that have the pilot and weapon information
 Receives values to display from DetailsHandler
+Frames of pilots that leave the window are hidden and pooled instead of destroyed,
+ and rows only call grid or configure when their position, text or color changed
 """
 
 import tkinter as tk
 import tkinter.font as tkFont
 from peld import settings
+from engine.events import sessionSymbols
+
+# hidden DetailFrames kept around for pilots that come back, past this the oldest are destroyed
+_maxPooledFrames = 50
 
 class DetailsHandler(tk.Frame):
     def __init__(self, parent, **kwargs):
         tk.Frame.__init__(self, parent, **kwargs)
         self.columnconfigure(0, weight=1)
+        # pilots in display order, and the same pilots by their pilot id
         self.pilots = []
+        self.pilotIndex = {}
+        # hidden frames of pilots that left the window, by pilot id, oldest first
+        self.framePool = {}
         self.enabledLabels = []
         
-    def updateDetails(self, fieldName, historicalDetails):
-        """ called from animator, sorts the pilots and weapons data into groups """
+    def updateDetails(self, fieldName, newEntries, droppedEntries):
+        """ called from animator with the entries that entered and left the window this tick,
+        adds and subtracts them from the running totals of their pilot and weapon group """
         if fieldName not in self.enabledLabels:
             return
-        for detailList in historicalDetails:
-            for detail in detailList:
-                if detail.get('pilotName') and detail['amount'] > 0:
-                    match = False
-                    for pilot in self.pilots:
-                        if pilot['pilotName'] == detail['pilotName']:
-                            match = True
-                            weaponMatch = False
-                            for weapon in pilot['weaponGroups']:
-                                if weapon['name'] == detail['weaponType'] and weapon['category'] == fieldName:
-                                    weaponMatch = True
-                                    weapon['amount'] += detail['amount']
-                            if not weaponMatch:
-                                weaponGroup = {}
-                                weaponGroup['name'] = detail['weaponType']
-                                weaponGroup['amount'] = detail['amount']
-                                weaponGroup['category'] = fieldName
-                                pilot['weaponGroups'].append(weaponGroup)
-                    if not match:
-                        newPilot = {}
-                        newPilot['pilotName'] = detail['pilotName']
-                        newPilot['shipType'] = detail['shipType']
-                        weaponGroup = {}
-                        weaponGroup['name'] = detail['weaponType']
-                        weaponGroup['amount'] = detail['amount']
-                        weaponGroup['category'] = fieldName
-                        newPilot['weaponGroups'] = [weaponGroup]
-                        self.pilots.append(newPilot)
+        for detail in droppedEntries:
+            if detail.pilot and detail.amount > 0:
+                pilot = self.pilotIndex.get(detail.pilot)
+                if pilot:
+                    weaponGroup = pilot['groupIndex'].get((detail.weapon, fieldName))
+                    if weaponGroup:
+                        weaponGroup['total'] -= detail.amount
+        for detail in newEntries:
+            if detail.pilot and detail.amount > 0:
+                pilot = self.pilotIndex.get(detail.pilot)
+                if not pilot:
+                    pilot = {}
+                    pilot['pilot'] = detail.pilot
+                    pilot['pilotName'] = sessionSymbols.name(detail.pilot)
+                    pilot['shipType'] = sessionSymbols.name(detail.ship)
+                    pilot['weaponGroups'] = []
+                    pilot['groupIndex'] = {}
+                    self.pilotIndex[detail.pilot] = pilot
+                    self.pilots.append(pilot)
+                weaponGroup = pilot['groupIndex'].get((detail.weapon, fieldName))
+                if not weaponGroup:
+                    weaponGroup = {}
+                    weaponGroup['name'] = sessionSymbols.name(detail.weapon)
+                    weaponGroup['category'] = fieldName
+                    weaponGroup['total'] = 0
+                    weaponGroup['amount'] = 0
+                    pilot['groupIndex'][(detail.weapon, fieldName)] = weaponGroup
+                    pilot['weaponGroups'].append(weaponGroup)
+                weaponGroup['total'] += detail.amount
 
-    def cleanupAndDisplay(self, interval, length, findColor):
-        """ called near the end of the animation cycle, does some cleanup of
-        stale labels and calculations/sorting needed before displaying the values,
-        then displays them """
+    def prune(self):
+        """ called every tick after updateDetails, drops the groups and pilots that left the window """
+        for pilot in list(self.pilots):
+            if any(weapon['total'] <= 0 for weapon in pilot['weaponGroups']):
+                pilot['weaponGroups'] = [weapon for weapon in pilot['weaponGroups'] if weapon['total'] > 0]
+                pilot['groupIndex'] = {key: weapon for key, weapon in pilot['groupIndex'].items() if weapon['total'] > 0}
+            if len(pilot['weaponGroups']) == 0:
+                if pilot.get('detailFrame'):
+                    self.releaseFrame(pilot['pilot'], pilot['detailFrame'])
+                self.pilots.remove(pilot)
+                del self.pilotIndex[pilot['pilot']]
+                
+    def display(self, interval, length, findColor):
+        """ called when a frame is drawn while the details window is shown, turns the running totals
+        into per second amounts, re-sorts the pilots if their order changed, then displays them """
+        scale = (1000/interval)/length
         for pilot in self.pilots:
             for weapon in pilot['weaponGroups']:
-                weapon['amount'] = (weapon['amount']*(1000/interval))/length
+                weapon['amount'] = weapon['total']*scale
                 weapon['color'] = findColor(weapon['category'], weapon['amount'])
-                
-        for group in reversed(settings.detailsOrder):
-            self.pilots.sort(key=lambda pilot: sum([x['amount'] if x['category'] == group else -1 for x in pilot['weaponGroups']]), reverse=True)
         
-        self.displayPilots()
+        # pilots are ordered by their total in each category of detailsOrder, first category first
+        sortKeys = [self.sortKey(pilot) for pilot in self.pilots]
+        if any(sortKeys[index] < sortKeys[index+1] for index in range(len(sortKeys)-1)):
+            self.pilots.sort(key=self.sortKey, reverse=True)
         
-        for pilot in self.pilots:
-            for weapon in pilot['weaponGroups']:
-                if weapon['amount'] == 0:
-                    pilot['weaponGroups'].remove(weapon)
-                else:
-                    weapon['amount'] = 0
-            if len(pilot['weaponGroups']) == 0:
-                pilot['detailFrame'].grid_forget()
-                pilot['detailFrame'].destroy()
-                self.pilots.remove(pilot)
+        self.displayPilots()
         self.update_idletasks()
-            
+        
+    def sortKey(self, pilot):
+        categoryTotals = {}
+        for weapon in pilot['weaponGroups']:
+            categoryTotals[weapon['category']] = categoryTotals.get(weapon['category'], 0) + weapon['amount']
+        return tuple(categoryTotals.get(category, -1) for category in settings.detailsOrder)
                 
     def displayPilots(self):
-        """ creates a DetailFrame if one doesn't exist for a pilot,
+        """ gives every pilot a DetailFrame, recycling hidden ones before creating new ones,
          and updates all DetailsFrames with new data """
         for index, pilot in enumerate(self.pilots):
             if not pilot.get('detailFrame'):
-                pilot['detailFrame'] = DetailFrame(self, pilot, background="black")
-            pilot['detailFrame'].grid(row=index, column="0", sticky="news")
+                pilot['detailFrame'] = self.acquireFrame(pilot['pilot'])
+                pilot['detailFrame'].setPilot(pilot['pilotName'], pilot['shipType'])
+            pilot['detailFrame'].showAt(index)
             pilot['detailFrame'].updateLabels(pilot['weaponGroups'])
             
+    def acquireFrame(self, pilotId):
+        """ the pilot's own frame if they left recently, otherwise the longest hidden frame, otherwise a new one """
+        frame = self.framePool.pop(pilotId, None)
+        if frame is not None:
+            return frame
+        if self.framePool:
+            return self.framePool.pop(next(iter(self.framePool)))
+        return DetailFrame(self, background="black")
+    
+    def releaseFrame(self, pilotId, frame):
+        frame.hide()
+        self.framePool[pilotId] = frame
+        if len(self.framePool) > _maxPooledFrames:
+            oldestFrame = self.framePool.pop(next(iter(self.framePool)))
+            oldestFrame.destroy()
+            
+    def reset(self):
+        """ drops every running total, the animator calls this whenever it starts a new window """
+        for pilot in self.pilots:
+            for weapon in pilot['weaponGroups']:
+                weapon['total'] = 0
+            
     def enableLabel(self, labelName, enable):
         if labelName in self.enabledLabels:
             if not enable:
                 self.enabledLabels.remove(labelName)
+                for pilot in self.pilots:
+                    for weapon in pilot['weaponGroups']:
+                        if weapon['category'] == labelName:
+                            weapon['total'] = 0
         else:
             if enable:
                 self.enabledLabels.append(labelName)
             
 
 class DetailFrame(tk.Frame):
-    def __init__(self, parent, pilot, **kwargs):
+    def __init__(self, parent, **kwargs):
         tk.Frame.__init__(self, parent, **kwargs)
         self.columnconfigure(1, weight=1)
         #self.decimalPlaces = settings["decimalPlaces"]
         #self.inThousands = settings["inThousands"]
-        self.weaponLabels = []
+        # rows are pooled by position, row n always shows the n-th weapon group
+        self.weaponRows = []
+        self.gridRow = None
+        self.pilotName = None
+        self.shipType = None
         
         self.topFrame = tk.Frame(self, background="black")
         self.topFrame.grid(row="0", column="0", columnspan="3", sticky="ew")
         self.topFrame.columnconfigure(1, weight=1)
         
-        self.pilotLabel = tk.Label(self.topFrame, text=pilot['pilotName'], fg="white", background="black")
+        self.pilotLabel = tk.Label(self.topFrame, fg="white", background="black")
         font = tkFont.Font(font=self.pilotLabel['font'])
         font.config(weight='bold')
         self.pilotLabel['font'] = font
@@ -120,8 +176,7 @@ class DetailFrame(tk.Frame):
         
         tk.Frame(self.topFrame, background="black").grid(row="0", column="1", sticky="news")
         
-        shipTypeString = "(" + pilot['shipType'] + ")"
-        self.shipLabel = tk.Label(self.topFrame, text=shipTypeString, fg="white", background="black")
+        self.shipLabel = tk.Label(self.topFrame, fg="white", background="black")
         font = tkFont.Font(font=self.shipLabel['font'])
         font.config(slant='italic')
         self.shipLabel['font'] = font
@@ -129,44 +184,67 @@ class DetailFrame(tk.Frame):
         
         tk.Frame(self, highlightthickness="1", highlightbackground="dim gray", background="black").grid(row="1000", column="0", columnspan="3", sticky="we")
         
+    def setPilot(self, pilotName, shipType):
+        """ points a new or recycled frame at a pilot """
+        if pilotName != self.pilotName:
+            self.pilotLabel['text'] = pilotName
+            self.pilotName = pilotName
+        if shipType != self.shipType:
+            self.shipLabel['text'] = "(" + shipType + ")"
+            self.shipType = shipType
+            
+    def showAt(self, row):
+        if row != self.gridRow:
+            self.grid(row=row, column="0", sticky="news")
+            self.gridRow = row
+            
+    def hide(self):
+        if self.gridRow is not None:
+            self.grid_forget()
+            self.gridRow = None
+        
     def updateLabels(self, weaponGroups):
-        """ finds the right label for a weapon type, and updates it """
-        for group in reversed(settings.detailsOrder):
-            weaponGroups.sort(key=lambda weaponGroup: weaponGroup['amount'] if weaponGroup['category'] == group else -1, reverse=True)
-        for label in self.weaponLabels:
-            label[3] = False
+        """ sorts the weapon groups and shows them, only rows whose content changed are touched """
+        categoryOrder = {category: index for index, category in enumerate(settings.detailsOrder)}
+        weaponGroups.sort(key=lambda weaponGroup: (categoryOrder.get(weaponGroup['category'], len(categoryOrder)), -weaponGroup['amount']))
         for index, group in enumerate(weaponGroups):
-            weaponMatch = False
-            for label in self.weaponLabels:
-                if group['name'] == label[1]['text'] and group['category'] == label[1].category:
-                    weaponMatch = True
-                    label[2]['text'] = ('%.0f') % (round(group['amount'], 0),)
-                    label[2]['fg'] = group['color']
-                    label[0].grid(row=index+1, column="0", sticky="w")
-                    label[1].grid(row=index+1, column="1", sticky="w")
-                    label[2].grid(row=index+1, column="2", sticky="e")
-                    label[3] = True
-            if not weaponMatch:
-                weaponLabel = []
-                spacerFrame = tk.Frame(self, width="10", background="black")
-                spacerFrame.grid(row=index+1, column="0", sticky="w")
-                weaponLabel.append(spacerFrame)
-                nameLabel = tk.Label(self, text=group['name'], fg="white", background="black")
-                nameLabel.category = group['category']
-                nameLabel.grid(row=index+1, column="1", sticky="w", columnspan="2")
-                weaponLabel.append(nameLabel)
-                amountLabel = tk.Label(self, fg=group['color'], background="black")
-                amountLabel['text'] = ('%.0f') % (round(group['amount'], 0),)
-                amountLabel.grid(row=index+1, column="2", sticky="e")
-                weaponLabel.append(amountLabel)
-                weaponLabel.append(True)
-                self.weaponLabels.append(weaponLabel)
-        for label in self.weaponLabels:
-            if not label[3]:
-                label[0].grid_forget()
-                label[0].destroy()
-                label[1].grid_forget()
-                label[1].destroy()
-                label[2].grid_forget()
-                label[2].destroy()
-                self.weaponLabels.remove(label)
\ No newline at end of file
+            if index == len(self.weaponRows):
+                self.weaponRows.append(WeaponRow(self, index+1))
+            self.weaponRows[index].update(group['name'], ('%.0f') % (round(group['amount'], 0),), group['color'])
+        for weaponRow in self.weaponRows[len(weaponGroups):]:
+            weaponRow.hide()
+            
+class WeaponRow():
+    """ the labels of one weapon row in a DetailFrame, remembers what they show so tk is only called on changes """
+    def __init__(self, parent, row):
+        self.row = row
+        self.spacerFrame = tk.Frame(parent, width="10", background="black")
+        self.nameLabel = tk.Label(parent, fg="white", background="black")
+        self.amountLabel = tk.Label(parent, background="black")
+        self.name = None
+        self.text = None
+        self.color = None
+        self.shown = False
+        
+    def update(self, name, text, color):
+        if name != self.name:
+            self.nameLabel['text'] = name
+            self.name = name
+        if text != self.text:
+            self.amountLabel['text'] = text
+            self.text = text
+        if color != self.color:
+            self.amountLabel['fg'] = color
+            self.color = color
+        if not self.shown:
+            self.spacerFrame.grid(row=self.row, column="0", sticky="w")
+            self.nameLabel.grid(row=self.row, column="1", sticky="w", columnspan="2")
+            self.amountLabel.grid(row=self.row, column="2", sticky="e")
+            self.shown = True
+            
+    def hide(self):
+        if self.shown:
+            self.spacerFrame.grid_forget()
+            self.nameLabel.grid_forget()
+            self.amountLabel.grid_forget()
+            self.shown = False
@@ -0,0 +1,22 @@
+"""
+Headless log processing for PELD.
+
+Everything needed to find, tail, parse and average EVE gamelogs lives here,
+without tkinter, matplotlib or the settings file.  The GUI builds its log
+readers on top of these classes, and reads and averages the logs with the
+same LogReadWorker and CharacterHistory the Engine uses.  To run it
+without a display:
+
+    python -m engine --help
+"""
+
+from engine.parser import LogParser, BadLogException, LogCollisionException, ProcessCharacterLine
+from engine.logfile import LogTail, CharacterLog, HeaderCache, readLogHeader
+from engine.events import Event, SymbolTable, sessionSymbols, coalesce
+from engine.logindex import LogIndex
+from engine.timestamps import parseTimestamp, parseLogTime, toEpoch, fromEpoch
+from engine.discovery import defaultLogLocation, listRecentLogs, recentLogStats, findCharacterLogs
+from engine.ringbuffer import RingBuffer
+from engine.aggregator import CharacterHistory, categories
+from engine.worker import LogReadWorker
+from engine.engine import Engine, parseLogFile
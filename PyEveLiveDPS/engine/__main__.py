@@ -0,0 +1,94 @@
+"""
+Command line interface for the headless engine, run from the PyEveLiveDPS directory:
+
+    python -m engine                        live averages for every character active in the last 24 hours
+    python -m engine --character "Name"     only track the given character(s)
+    python -m engine --file 2018_log.txt    parse a whole log file and print the totals
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+
+from engine.aggregator import categories
+from engine.engine import Engine, parseLogFile
+
+def loadOverviewSettings(overviewFile):
+    if not overviewFile:
+        return None
+    import yaml
+    with open(overviewFile, encoding='utf8') as overviewFileContent:
+        return yaml.safe_load(overviewFileContent.read())
+
+def printFileTotals(args, overviewSettings):
+    character, entries = parseLogFile(args.file, overviewSettings)
+    totals = {}
+    for category, categoryEntries in zip(categories, entries):
+        totals[category] = {'hits': len(categoryEntries), 'amount': sum([entry.amount for entry in categoryEntries])}
+    if args.json:
+        print(json.dumps({'character': character, 'totals': totals}))
+    else:
+        print(character)
+        for category in categories:
+            print('  %-14s %8d hits %12d' % (category, totals[category]['hits'], totals[category]['amount']))
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='python -m engine', description='PELD without a GUI')
+    argParser.add_argument('--path', help='gamelog directory (default: the EVE default location)')
+    argParser.add_argument('--file', help='parse this entire log file once and print the totals')
+    argParser.add_argument('--character', action='append', help='only track this character, can be repeated')
+    argParser.add_argument('--seconds', type=int, default=10, help='length of the moving average window')
+    argParser.add_argument('--interval', type=int, default=100, help='ms between log reads')
+    argParser.add_argument('--hours', type=int, default=24, help='how old a log can be and still be tracked')
+    argParser.add_argument('--report', type=float, default=1.0, help='seconds between printed reports')
+    argParser.add_argument('--duration', type=float, help='stop after this many seconds')
+    argParser.add_argument('--overview', help='exported overview settings yaml file')
+    argParser.add_argument('--json', action='store_true', help='print one json object per report')
+    args = argParser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(name)s:%(levelname)s - %(message)s')
+    overviewSettings = loadOverviewSettings(args.overview)
+
+    if args.file:
+        printFileTotals(args, overviewSettings)
+        return 0
+
+    engine = Engine(args.path, seconds=args.seconds, interval=args.interval, hours=args.hours,
+                    characters=args.character, overviewSettings=overviewSettings)
+    try:
+        engine.discover()
+    except FileNotFoundError:
+        logging.error('EVE logs directory not found, path checked: ' + engine.logPath)
+        return 1
+    if not engine.characterLogs:
+        logging.warning('No character logs found for the past ' + str(args.hours) + ' hours, waiting for new logs')
+
+    latest = {}
+    engine.subscribe(lambda character, newEntries, averages: latest.__setitem__(character, averages))
+    nextReport = time.time() + args.report
+    def report(character, newEntries, averages):
+        nonlocal nextReport
+        if time.time() < nextReport:
+            return
+        nextReport = time.time() + args.report
+        for character, averages in sorted(latest.items()):
+            if args.json:
+                print(json.dumps({'time': time.time(), 'character': character, 'averages': averages}))
+            else:
+                values = ' '.join(['%s=%.1f' % (category, averages[category]) for category in categories if averages[category]])
+                print(character + ': ' + (values or 'idle'))
+        sys.stdout.flush()
+    engine.subscribe(report)
+
+    try:
+        engine.run(duration=args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+CharacterHistory:
+    The graph window of one character, for every tracked category: the
+    amount recieved each tick, the entries behind it (for the details
+    window), and the moving averages that get graphed, along with the
+    running total and the peak average of each category.
+
+    This is the one place the moving averages are calculated, the
+    Animator keeps one for every character it reads, and so does the
+    headless Engine.  When all characters are tracked, switching to
+    another one shows its real history instead of an empty graph.
+"""
+
+from engine.ringbuffer import RingBuffer
+
+# the order of the lists returned by LogParser.readLog
+categories = ['dpsOut', 'dpsIn', 'logiOut', 'logiIn', 'capTransfered', 'capRecieved', 'capDamageOut', 'capDamageIn', 'mining']
+
+class CharacterHistory():
+    def __init__(self, trackedCategories, arrayLength, interval):
+        self.arrayLength = arrayLength
+        self.interval = interval
+        self.historical = {}
+        self.historicalDetails = {}
+        self.yValues = {}
+        self.totals = {}
+        self.peaks = {}
+        for category in trackedCategories:
+            self.historical[category] = RingBuffer(arrayLength)
+            self.historicalDetails[category] = RingBuffer(arrayLength, dtype=object, fill=list)
+            self.yValues[category] = RingBuffer(arrayLength)
+            self.totals[category] = 0
+            self.peaks[category] = 0
+
+    def push(self, category, newEntries):
+        """
+        adds one tick of entries to 'category', dropping the oldest tick
+        returns the amount added, the new average and the entries that left the window
+        """
+        # as values are broken up by weapon, add them together for the non-details views
+        amountSum = sum([entry.amount for entry in newEntries])
+        self.historical[category].push(amountSum)
+        droppedEntries = self.historicalDetails[category].push(newEntries)
+        # 'yValues' is for the actual DPS at that point in time, as opposed to raw values
+        average = (self.historical[category].sum()*(1000/self.interval))/self.arrayLength
+        self.yValues[category].push(average)
+        self.totals[category] += amountSum
+        if average > self.peaks[category]:
+            self.peaks[category] = average
+        return amountSum, average, droppedEntries
+
+    def pushAll(self, newEntries):
+        """
+        adds the nine lists returned by LogParser.readLog, to the categories that are tracked
+        returns a dict of category -> average per second over the window
+        """
+        averages = {}
+        for category, entries in zip(categories, newEntries):
+            if category in self.historical:
+                amountSum, averages[category], droppedEntries = self.push(category, entries)
+        return averages
+
+    def clearValues(self):
+        for category in self.totals:
+            self.totals[category] = 0
+            self.peaks[category] = 0
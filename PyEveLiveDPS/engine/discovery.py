@@ -0,0 +1,80 @@
+"""
+Finds the character logs in the eve gamelog directory.
+
+Gamelog filenames start with the time the log was created
+ (e.g. 20180101_123456_90000001.txt), which is what decides if a log is recent.
+As the directory can hold tens of thousands of logs, the filename is checked
+ before anything else, only the recent logs are stat()ed and opened.
+"""
+
+import re
+import os
+import platform
+import datetime
+import logging
+import functools
+
+from engine.parser import BadLogException
+from engine.logfile import readLogHeader
+
+_logNameRegex = re.compile(r'^([0-9]{8}_[0-9]{6})_[0-9]*\.txt$')
+
+def defaultLogLocation():
+    """ where EVE writes gamelogs unless the user has moved them """
+    if platform.system() == "Windows":
+        return os.path.join(os.environ['USERPROFILE'], "Documents", "EVE", "logs", "Gamelogs")
+    return os.environ['HOME'] + "/Documents/EVE/logs/Gamelogs/"
+
+def _directoryEntries(path):
+    """
+    yields (name, path, stat function) for every entry in 'path'
+    os.scandir is python 3.5+, where it isn't there (the windows build) os.listdir is used instead
+    """
+    if hasattr(os, 'scandir'):
+        # not used with 'with', that is 3.6+, the iterator closes itself once it has been exhausted
+        for entry in os.scandir(path):
+            yield entry.name, entry.path, entry.stat
+    else:
+        for name in os.listdir(path):
+            entryPath = os.path.join(path, name)
+            yield name, entryPath, functools.partial(os.stat, entryPath)
+
+def recentLogStats(path, hours=24):
+    """
+    returns (path, stat) of all logs in 'path' created in the last 'hours', oldest modified first
+    raises FileNotFoundError if the directory doesn't exist
+    """
+    # the filename times are fixed width, so comparing them as strings is comparing the times
+    oneDayAgo = (datetime.datetime.now() - datetime.timedelta(hours=hours)).strftime("%Y%m%d_%H%M%S")
+    recentLogs = []
+    for name, entryPath, stat in _directoryEntries(path):
+        nameMatch = _logNameRegex.match(name)
+        if nameMatch and nameMatch.group(1) >= oneDayAgo:
+            recentLogs.append((entryPath, stat()))
+    recentLogs.sort(key=lambda log: log[1].st_mtime)
+    return recentLogs
+
+def listRecentLogs(path, hours=24):
+    """
+    returns the paths of all logs in 'path' created in the last 'hours', oldest modified first
+    raises FileNotFoundError if the directory doesn't exist
+    """
+    return [logPath for logPath, logStat in recentLogStats(path, hours)]
+
+def findCharacterLogs(path, hours=24, headerCache=None):
+    """
+    returns a dict of character -> (logPath, language) for the newest log of each character
+    that was created in the last 'hours', the headers are read through 'headerCache' if there is one
+    """
+    characterLogs = {}
+    for logPath, logStat in recentLogStats(path, hours):
+        try:
+            if headerCache:
+                character, language = headerCache.readLogHeader(logPath, logStat)
+            else:
+                character, language = readLogHeader(logPath)
+        except (BadLogException, UnicodeDecodeError):
+            logging.info("Log " + logPath + " is not a character log.")
+            continue
+        characterLogs[character] = (logPath, language)
+    return characterLogs
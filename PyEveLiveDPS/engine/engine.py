@@ -0,0 +1,130 @@
+"""
+Engine:
+    Headless version of what PELD does every animation tick.  It opens the
+    log of every recently active character and reads and parses whatever
+    is new every 'interval' ms on a LogReadWorker, the same worker the GUI
+    reads through.  Each tick is added to the character's CharacterHistory,
+    the same one the Animator keeps, and handed to every subscriber.
+    Subscribers are plain callables, so a stats exporter, a benchmark or
+    a test can all watch the same engine.
+"""
+
+import time
+import logging
+import threading
+
+from engine.parser import LogParser, BadLogException, ProcessCharacterLine
+from engine.logfile import CharacterLog, HeaderCache
+from engine.aggregator import CharacterHistory, categories
+from engine.discovery import defaultLogLocation, findCharacterLogs
+from engine.worker import LogReadWorker
+
+class Engine():
+    def __init__(self, logPath=None, seconds=10, interval=100, hours=24, characters=None, overviewSettings=None):
+        self.logPath = logPath or defaultLogLocation()
+        self.seconds = seconds
+        self.interval = interval
+        self.arrayLength = int((seconds*1000)/interval)
+        self.hours = hours
+        self.characters = characters
+        self.overviewSettings = overviewSettings
+        self.characterLogs = {}
+        self.histories = {}
+        self.subscribers = []
+        self.running = False
+        # held while the logs are read by the worker or replaced by discover()
+        self.readLock = threading.Lock()
+        self.worker = LogReadWorker(self.readLogs, lambda: self.interval)
+        # discover() runs again and again, the logs that haven't changed don't have to be opened each time
+        self.headerCache = HeaderCache()
+
+    def discover(self):
+        """ opens the newest log of every character active in the last 'hours', replacing older logs """
+        for character, (logPath, language) in findCharacterLogs(self.logPath, self.hours, self.headerCache).items():
+            if self.characters and character not in self.characters:
+                continue
+            currentLog = self.characterLogs.get(character)
+            if currentLog and currentLog.logPath == logPath:
+                continue
+            try:
+                newLog = CharacterLog(logPath, self.overviewSettings)
+            except BadLogException as e:
+                logging.error('Unable to track log ' + logPath + ': ' + str(e))
+                continue
+            logging.info('Tracking ' + character + ' from ' + logPath)
+            with self.readLock:
+                self.characterLogs[character] = newLog
+            if currentLog:
+                currentLog.close()
+            self.historyFor(character)
+
+    def historyFor(self, character):
+        if character not in self.histories:
+            self.histories[character] = CharacterHistory(categories, self.arrayLength, self.interval)
+        return self.histories[character]
+
+    def subscribe(self, callback):
+        """ callback(character, newEntries, averages) is called for every character on every tick """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def readLogs(self):
+        """ called by the worker, returns character -> new entries for every tracked log """
+        with self.readLock:
+            return {character: characterLog.readLog() for character, characterLog in self.characterLogs.items()}
+
+    def tick(self):
+        """
+        adds the ticks the worker has read since the last call to the histories, oldest first,
+         and passes each of them on to the subscribers, on the thread that calls this
+        """
+        for logEntries in self.worker.takeTicks():
+            for character, newEntries in logEntries.items():
+                averages = self.historyFor(character).pushAll(newEntries)
+                for subscriber in self.subscribers:
+                    subscriber(character, newEntries, averages)
+
+    def run(self, duration=None, rescanSeconds=10):
+        """ hands out the worker's ticks every 'interval' ms until stop() is called or 'duration' seconds have passed """
+        if not self.worker.is_alive():
+            self.worker.start()
+        self.running = True
+        startTime = time.time()
+        nextTick = startTime
+        lastScan = startTime
+        while self.running:
+            self.tick()
+            now = time.time()
+            if rescanSeconds and now - lastScan >= rescanSeconds:
+                self.discover()
+                lastScan = now
+            if duration is not None and now - startTime >= duration:
+                break
+            nextTick += self.interval/1000
+            sleepTime = nextTick - time.time()
+            if (sleepTime > 0):
+                time.sleep(sleepTime)
+            else:
+                nextTick = time.time()
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.worker.stop()
+        with self.readLock:
+            for characterLog in self.characterLogs.values():
+                characterLog.close()
+            self.characterLogs.clear()
+
+def parseLogFile(logPath, overviewSettings=None):
+    """ parses an entire log file at once, returns (character, the nine lists from LogParser.readLog) """
+    with open(logPath, 'r', encoding="utf8") as log:
+        log.readline()
+        log.readline()
+        character, language = ProcessCharacterLine(log.readline())
+        parser = LogParser(language, overviewSettings)
+        return character, parser.readLines(line.rstrip('\n') for line in log)
@@ -0,0 +1,82 @@
+"""
+Event:
+    One parsed log entry (a hit, a rep, a neut, a mining cycle).
+    Events are created for every matching log line and then kept in the
+    history for the whole graph window, so they use __slots__ and only
+    store integers: the amount, and the ids of the pilot, ship and weapon
+    names in the SymbolTable.
+
+SymbolTable:
+    Interns pilot, ship and weapon names into small integer ids.  A fight
+    only has so many distinct names, so every event after the first few
+    just points at an existing string.  Id 0 is always the empty string,
+    which is what events without a pilot (mining) use, so 'if event.pilot'
+    works the same way a missing name did before.
+
+coalesce:
+    Sums a tick's worth of events per pilot, ship and weapon, this is the
+    compact form events are sent to the fleet server in.
+"""
+
+import threading
+
+class SymbolTable():
+    def __init__(self):
+        self.ids = {'': 0}
+        self.names = ['']
+        # logs can be parsed on several threads at once, adding a name has to be atomic
+        self.lock = threading.Lock()
+
+    def intern(self, name):
+        """ returns the id for 'name', adding it to the table if it is new """
+        try:
+            return self.ids[name]
+        except KeyError:
+            with self.lock:
+                if name in self.ids:
+                    return self.ids[name]
+                newId = len(self.names)
+                self.names.append(name)
+                self.ids[name] = newId
+                return newId
+
+    def name(self, symbolId):
+        return self.names[symbolId]
+
+    def __len__(self):
+        return len(self.names)
+
+# every log reader in a PELD session shares this table, so ids can be compared across characters
+sessionSymbols = SymbolTable()
+
+class Event():
+    __slots__ = ('amount', 'pilot', 'ship', 'weapon')
+
+    def __init__(self, amount, pilot=0, ship=0, weapon=0):
+        self.amount = amount
+        self.pilot = pilot
+        self.ship = ship
+        self.weapon = weapon
+
+    def asDict(self, symbols=sessionSymbols):
+        """ the entry as a plain dict of names, this is what gets sent to the fleet server """
+        if not self.pilot:
+            return {'amount': self.amount}
+        return {
+            'amount': self.amount,
+            'pilotName': symbols.name(self.pilot),
+            'shipType': symbols.name(self.ship),
+            'weaponType': symbols.name(self.weapon)
+            }
+
+    def __repr__(self):
+        return 'Event(%r, %r, %r, %r)' % (self.amount, self.pilot, self.ship, self.weapon)
+
+def coalesce(events, symbols=sessionSymbols):
+    """ returns [pilotName, shipType, weaponType, amount] rows with the amounts of matching events summed """
+    sums = {}
+    for event in events:
+        key = (event.pilot, event.ship, event.weapon)
+        sums[key] = sums.get(key, 0) + event.amount
+    return [[symbols.name(pilot), symbols.name(ship), symbols.name(weapon), amount]
+            for (pilot, ship, weapon), amount in sums.items()]
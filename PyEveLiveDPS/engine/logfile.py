@@ -0,0 +1,184 @@
+"""
+LogTail:
+    Follows a single live gamelog file.  The header is read when the
+    file is opened, and every read after that only returns data that
+    EVE has written since the last read.
+
+    The log is read as bytes, 'chunkSize' at a time, and only complete
+    lines are decoded and passed on.  A line EVE has only written part
+    of is kept until the rest of it is written, so it is never parsed
+    in pieces, and a backlog of any size never has to be held in
+    memory at once.
+
+CharacterLog:
+    A LogTail paired with the LogParser for its language, this is all
+    that is needed to track one character without the GUI.
+
+HeaderCache:
+    The (character, language) of logs that have been read before, saved
+    to a file between runs.  An entry is only used while the log's size
+    and modification time haven't changed.  Only the entries looked up
+    since the cache was loaded are saved, so logs that are no longer
+    recent drop out of it and it doesn't grow with the gamelog directory.
+"""
+
+import os
+import json
+import logging
+
+from engine.parser import LogParser, BadLogException, LogCollisionException, ProcessCharacterLine
+
+_collisionLine = "------------------------------------------------------------"
+# the header is a few short lines, the 'Listener' line is the third one
+_headerSize = 1024
+_cacheVersion = 1
+
+def _decodeLine(line):
+    """ a line of the log as text, without its line ending, which is CRLF as EVE runs on windows """
+    return line.rstrip(b'\r\n').decode('utf8', errors='replace')
+
+def readLogHeader(logPath):
+    """
+    returns (character, language) for a log, raises BadLogException if it isn't a character log
+     and LogCollisionException if two characters share it
+    only the first '_headerSize' bytes of the log are read
+    """
+    with open(logPath, 'rb', buffering=0) as log:
+        headerLines = log.read(_headerSize).split(b'\n')
+    # the 'Listener' line is only complete if there is another line after it
+    if len(headerLines) < 4:
+        raise BadLogException("not character log")
+    character, language = ProcessCharacterLine(_decodeLine(headerLines[2]))
+    if len(headerLines) > 8 and _decodeLine(headerLines[5]) == _collisionLine:
+        collisionCharacter, collisionLanguage = ProcessCharacterLine(_decodeLine(headerLines[7]))
+        raise LogCollisionException(character, collisionCharacter)
+    return character, language
+
+class HeaderCache():
+    def __init__(self, cachePath=None):
+        self.cachePath = cachePath
+        # logPath -> [size, mtime in ns, [character, language] or None if it isn't a character log]
+        self.entries = {}
+        self.used = {}
+        if cachePath:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.cachePath, 'r', encoding="utf8") as cacheFile:
+                data = json.load(cacheFile)
+            if data['version'] == _cacheVersion:
+                self.entries = data['logs']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+
+    def save(self):
+        if not self.cachePath or self.used == self.entries:
+            return
+        try:
+            with open(self.cachePath, 'w', encoding="utf8") as cacheFile:
+                json.dump({'version': _cacheVersion, 'logs': self.used}, cacheFile, separators=(',', ':'))
+            self.entries = dict(self.used)
+        except OSError as e:
+            logging.info('Unable to save log header cache ' + self.cachePath + ': ' + str(e))
+
+    def readLogHeader(self, logPath, logStat=None):
+        """ readLogHeader, from the cache if the log hasn't changed, 'logStat' saves a stat() if the caller has it """
+        if logStat is None:
+            logStat = os.stat(logPath)
+        key = [logStat.st_size, logStat.st_mtime_ns]
+        cached = self.used.get(logPath) or self.entries.get(logPath)
+        if cached and cached[:2] == key:
+            header = cached[2]
+        else:
+            try:
+                header = list(readLogHeader(logPath))
+            except LogCollisionException:
+                # not cached, so the collision is reported every time
+                raise
+            except BadLogException:
+                header = None
+        self.used[logPath] = key + [header]
+        if header is None:
+            raise BadLogException("not character log")
+        return tuple(header)
+
+class LogTail():
+    # the most that is read from the log at a time
+    chunkSize = 64*1024
+
+    def __init__(self, logPath, offset=None):
+        """ reading starts at 'offset', by default at the end of the log """
+        self.logPath = logPath
+        self.log = open(logPath, 'rb')
+        try:
+            self.log.readline()
+            self.log.readline()
+            self.character, self.language = ProcessCharacterLine(_decodeLine(self.log.readline()))
+            self.log.readline()
+            self.log.readline()
+            # the line after the header is only part of it if two characters share the log,
+            #  otherwise it is already a log entry, which isn't skipped if the log is opened late
+            self.headerEnd = self.log.tell()
+            if (_decodeLine(self.log.readline()) == _collisionLine):
+                self.log.readline()
+                collisionCharacter, language = ProcessCharacterLine(_decodeLine(self.log.readline()))
+                raise LogCollisionException(self.character, collisionCharacter)
+        except:
+            self.log.close()
+            raise
+        # the start of a line EVE hasn't finished writing yet
+        self.partial = b''
+        self.skipTo(offset)
+
+    def lines(self):
+        """ yields every complete line written since the last read, decoded and without its line ending """
+        while True:
+            chunk = self.log.read(self.chunkSize)
+            if not chunk:
+                return
+            lines = (self.partial + chunk).split(b'\n')
+            self.partial = lines.pop()
+            for line in lines:
+                yield _decodeLine(line)
+
+    def read(self):
+        """ the complete lines written since the last read, as one string """
+        return '\n'.join(self.lines())
+
+    def catchup(self):
+        """ skips everything written so far """
+        self.skipTo(None)
+
+    def skipTo(self, offset):
+        """
+        skips to 'offset' (None for the end of the log) without reading what comes before it,
+         only the last chunk before it is read to find the start of a line that is still being written
+        """
+        if offset is None:
+            end = self.log.seek(0, os.SEEK_END)
+        else:
+            end = self.log.seek(max(offset, self.headerEnd))
+        start = max(end - self.chunkSize, self.headerEnd)
+        self.log.seek(start)
+        tail = self.log.read(end - start)
+        self.partial = tail[tail.rfind(b'\n') + 1:]
+
+    def close(self):
+        self.log.close()
+
+class CharacterLog(LogParser):
+    def __init__(self, logPath, overviewSettings=None):
+        self.tail = LogTail(logPath)
+        self.logPath = logPath
+        self.character = self.tail.character
+        LogParser.__init__(self, self.tail.language, overviewSettings)
+
+    def readLog(self):
+        return self.readLines(self.tail.lines())
+
+    def catchup(self):
+        self.tail.catchup()
+
+    def close(self):
+        self.tail.close()
@@ -0,0 +1,131 @@
+"""
+LogIndex:
+    Maps every second of a log to the byte offset of the first line written
+    in that second.  The index is built in a single pass over the file, after
+    that jumping to any point of the log is a binary search and one seek().
+
+    Since the index also counts the lines in every second, it is all playback
+    needs for the end time of a log and the log activity graph.
+
+    Given a 'sidecarDir' the index is saved there (as logname.txt.peldindex)
+    and reused as long as the log's size and modification time haven't changed.
+    Nothing is ever written next to the log, that directory belongs to EVE.
+"""
+
+import os
+import json
+import bisect
+import logging
+
+from engine.timestamps import parseTimestamp, toEpoch, timestampLength
+
+_sidecarSuffix = '.peldindex'
+_sidecarVersion = 1
+
+class LogIndex():
+    def __init__(self, logPath, startTime, sidecarDir=None):
+        self.logPath = logPath
+        self.startTime = startTime
+        self.sidecarDir = sidecarDir
+        if sidecarDir:
+            self.sidecarPath = os.path.join(sidecarDir, os.path.basename(logPath) + _sidecarSuffix)
+        # one entry per second that has log lines, in seconds since startTime, ascending
+        self.seconds = []
+        # byte offset of the first line logged in that second
+        self.offsets = []
+        # number of lines logged in that second
+        self.counts = []
+        self.endOffset = 0
+        if not (sidecarDir and self.load()):
+            self.build()
+            if sidecarDir:
+                self.save()
+
+    def build(self):
+        seconds, offsets, counts = [], [], []
+        lastTimestamp = None
+        lastSecond = None
+        startEpoch = toEpoch(self.startTime)
+        offset = 0
+        with open(self.logPath, 'rb') as log:
+            for line in log:
+                timestamp = line[:timestampLength]
+                if timestamp != lastTimestamp:
+                    # lines come in bursts with the same timestamp, so only parse the ones that changed
+                    try:
+                        entryTime = parseTimestamp(timestamp.decode('ascii'))
+                    except UnicodeDecodeError:
+                        entryTime = None
+                    if entryTime is None:
+                        offset += len(line)
+                        continue
+                    lastTimestamp = timestamp
+                    second = entryTime - startEpoch
+                    if lastSecond is None or second > lastSecond:
+                        seconds.append(second)
+                        offsets.append(offset)
+                        counts.append(0)
+                        lastSecond = second
+                if counts:
+                    counts[-1] += 1
+                offset += len(line)
+        self.seconds, self.offsets, self.counts = seconds, offsets, counts
+        self.endOffset = offset
+
+    def load(self):
+        """ reads the sidecar index, returns False if there isn't a usable one """
+        try:
+            with open(self.sidecarPath, 'r', encoding="utf8") as sidecar:
+                data = json.load(sidecar)
+            logStat = os.stat(self.logPath)
+            if (data['version'] != _sidecarVersion or data['size'] != logStat.st_size or
+                    data['mtime'] != logStat.st_mtime or data['startTime'] != self.startTime.isoformat()):
+                return False
+            self.seconds, self.offsets, self.counts = data['seconds'], data['offsets'], data['counts']
+            self.endOffset = data['size']
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def save(self):
+        logStat = os.stat(self.logPath)
+        data = {
+            'version': _sidecarVersion,
+            'size': logStat.st_size,
+            'mtime': logStat.st_mtime,
+            'startTime': self.startTime.isoformat(),
+            'seconds': self.seconds,
+            'offsets': self.offsets,
+            'counts': self.counts
+            }
+        try:
+            os.makedirs(self.sidecarDir, exist_ok=True)
+            with open(self.sidecarPath, 'w', encoding="utf8") as sidecar:
+                json.dump(data, sidecar, separators=(',', ':'))
+        except OSError as e:
+            logging.info('Unable to save log index ' + self.sidecarPath + ': ' + str(e))
+
+    def empty(self):
+        return not self.seconds
+
+    def firstOffset(self):
+        return self.offsets[0] if self.offsets else self.endOffset
+
+    def endSeconds(self):
+        """ seconds from startTime to the last line with a timestamp """
+        return self.seconds[-1] if self.seconds else 0
+
+    def offsetAt(self, seconds):
+        """ byte offset of the first line logged at or after 'seconds', or None if that is past the end of the log """
+        index = bisect.bisect_left(self.seconds, seconds)
+        if index == len(self.seconds):
+            return None
+        return self.offsets[index]
+
+    def frequency(self):
+        """ number of lines logged in each second from startTime to the end of the log """
+        frequency = [0] * (self.endSeconds() + 1)
+        for second, count in zip(self.seconds, self.counts):
+            if second >= 0:
+                frequency[second] += count
+        return frequency
@@ -0,0 +1,307 @@
+"""
+LogParser:
+    Holds the regex which process log entries into a consumable format,
+    for every language the eve game log can be in.  It has no knowledge
+    of files or of the GUI, it only turns log text into Events.
+
+ProcessCharacterLine:
+    Finds the character and language of a log from its 'Listener' line.
+"""
+
+import re
+import logging
+import functools
+import data.oreVolume
+from engine.events import Event, sessionSymbols
+_oreVolume = data.oreVolume._oreVolume
+
+_emptyResult = [[] for x in range(0,9)]
+
+# this holds the regex strings for all the different languages the eve game log can be in
+_logLanguageRegex = {
+    'english': {
+        'character': "(?<=Listener: ).*",
+        'sessionTime': "(?<=Session Started: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?P<default_ship>.*)\)<|<)/b.*> \-(?: (?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>to<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>from<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired to <",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired to <",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted to <",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired by <",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired by <",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted by <",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted to <",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> energy neutralized <",
+        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> energy drained from <",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted by <",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> energy neutralized <",
+        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> energy drained to <",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*> units of <.*?><.*?>(.+?)<"
+    },
+    'russian': {
+        'character': "(?<=Слушатель: ).*",
+        'sessionTime': "(?<=Сеанс начат: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>на<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>из<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности брони отремонтировано <",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности корпуса отремонтировано <",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности щитов накачано <",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности брони получено дистанционным ремонтом от <",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности корпуса получено дистанционным ремонтом от <",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности щитов получено накачкой от <",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса энергии накопителя отправлено в <",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> энергии нейтрализовано <",
+        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> энергии извлечено из <",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса энергии накопителя получено от <",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> энергии нейтрализовано <",
+        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> энергии извлечено и передано <",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
+    },
+    'french': {
+        'character': "(?<=Auditeur: ).*",
+        'sessionTime': "(?<=Session commencée: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>à<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>de<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> points de blindage transférés à distance à <",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> points de structure transférés à distance à <",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> points de boucliers transférés à distance à <",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> points de blindage réparés à distance par <",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> points de structure réparés à distance par <",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> points de boucliers transférés à distance par <",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> points de capaciteur transférés à distance à <",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> d'énergie neutralisée en faveur de <",
+        'nosRecieved': "\(combat\) <.*?><b>([0-9]+).*> d'énergie siphonnée aux dépens de <",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> points de capaciteur transférés à distance par <",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> d'énergie neutralisée aux dépens de <",
+        'nosTaken': "\(combat\) <.*?><b>([0-9]+).*> d'énergie siphonnée en faveur de <",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
+    },
+    'german': {
+        'character': "(?<=Empfänger: ).*",
+        'sessionTime': "(?<=Sitzung gestartet: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>nach<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>von<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> Panzerungs-Fernreparatur zu <",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> Rumpf-Fernreparatur zu <",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> Schildfernbooster aktiviert zu <",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> Panzerungs-Fernreparatur von <",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> Rumpf-Fernreparatur von <",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> Schildfernbooster aktiviert von <",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> Fernenergiespeicher übertragen zu <",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> Energie neutralisiert <",
+        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> Energie transferiert von <",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> Fernenergiespeicher übertragen von <",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>\-([0-9]+).*> Energie neutralisiert <",
+        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> Energie transferiert zu <",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
+    },
+    'japanese': {
+        'character': "(?<=傍聴者: ).*",
+        'sessionTime': "(?<=セッション開始: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>対象:<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>攻撃者:<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired to <",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired to <",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted to <",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired by <",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired by <",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted by <",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted to <",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> エネルギーニュートラライズ 対象:<",
+        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> エネルギードレイン 対象:<",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted by <",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*>のエネルギーが解放されました<",
+        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> エネルギードレイン 攻撃者:<",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
+    },
+    'chinese':{
+        'character': "(?<=收听者: ).*",
+        'sessionTime': "(?<=进程开始: ).*",
+        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
+        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>对<",
+        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>来自<",
+        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*>远程装甲维修量至<",
+        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*>远程结构维修量至<",
+        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*>远程护盾回充增量至<",
+        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*>远程装甲维修量由<",
+        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*>远程结构维修量由<",
+        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*>远程护盾回充增量由<",
+        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*>远程电容传输至<",
+        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*>能量中和<",
+        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*>被从<",
+        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*>远程电容传输量由<",
+        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*>能量中和<",
+        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*>被吸取到<",
+        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
+        }
+}
+
+# the combat entries of _logLanguageRegex, in the order LogParser builds its classifiers
+_combatCategories = ['damageOut', 'damageIn',
+                     'armorRepairedOut', 'hullRepairedOut', 'shieldBoostedOut',
+                     'armorRepairedIn', 'hullRepairedIn', 'shieldBoostedIn',
+                     'capTransferedOut', 'capNeutralizedOut', 'nosRecieved',
+                     'capTransferedIn', 'capNeutralizedIn', 'nosTaken']
+
+class LogParser():
+    """
+    Turns raw gamelog text into the nine lists of entries PELD tracks.
+    'language' must be set (usually by ProcessCharacterLine) before calling compileRegex
+    """
+    # names are interned here, a parser can be given its own table to keep its ids separate
+    symbols = sessionSymbols
+    def __init__(self, language, overviewSettings=None):
+        self.language = language
+        self.compileRegex(overviewSettings)
+
+    def createOverviewRegex(self, overviewSettings):
+        if overviewSettings:
+            def safeGetIndex(elem, _list):
+                try:
+                    return _list.index(elem)
+                except ValueError:
+                    return 10
+            try:
+                keyLambda = lambda e: safeGetIndex(e[0], overviewSettings['shipLabelOrder'])
+                sortedShipLabels = sorted(overviewSettings['shipLabels'], key=keyLambda)
+                pilotAndWeaponRegex = "(?:(?:.*ffffffff>"
+                for shipLabel in sortedShipLabels[:]:
+                    shipLabel[1] = dict(shipLabel[1])
+                    if not shipLabel[1]['state']:
+                        if shipLabel[1]['type'] in ['pilot name', 'ship type']:
+                            identifier = shipLabel[1]['type'].split()[0]
+                            pilotAndWeaponRegex += '(?P<'+identifier+'>)'
+                        continue
+                    if shipLabel[1]['type'] == None:
+                        safePre = re.escape(shipLabel[1]['pre'])
+                        pilotAndWeaponRegex += '(?:'+safePre+')?'
+                    elif shipLabel[1]['type'] in ['alliance', 'corporation', 'ship name']:
+                        safePre = re.escape(shipLabel[1]['pre'])
+                        safePost = re.escape(shipLabel[1]['post'])
+                        pilotAndWeaponRegex += '(?:'+safePre+'.*?'+safePost+')?'
+                    elif shipLabel[1]['type'] in ['pilot name', 'ship type']:
+                        safePre = re.escape(shipLabel[1]['pre'])
+                        safePost = re.escape(shipLabel[1]['post'])
+                        identifier = shipLabel[1]['type'].split()[0]
+                        pilotAndWeaponRegex += '(?:'+safePre+'(?:<localized .*?>)?(?P<'+identifier+'>.*?)'+safePost+')'
+                    else:
+                        continue
+                pilotAndWeaponRegex += ".*> \-(?: (?:<localized .*?>)?(?P<weapon>.*?)(?: \-|<)|.*))"
+                pilotAndWeaponRegex += '|' + _logLanguageRegex[self.language]['pilotAndWeapon'] + ')?'
+                return pilotAndWeaponRegex
+            except Exception as e:
+                logging.error('error parsing overview settings: ' + str(e))
+                return None
+        else:
+            return None
+        
+    def compileRegex(self, overviewSettings=None):
+        basicPilotAndWeaponRegex = _logLanguageRegex[self.language]['pilotAndWeapon']
+        basicPilotAndWeaponRegex += '(?P<pilot>)(?P<ship>)(?P<weapon>)'
+
+        pilotAndWeaponRegex = self.createOverviewRegex(overviewSettings) or basicPilotAndWeaponRegex
+        self.combatClassifiers, self.minedRegex = _compileClassifiers(self.language, basicPilotAndWeaponRegex, pilotAndWeaponRegex)
+        
+    def readLog(self, logData):
+        """ parses a block of log text, see readLines """
+        return self.readLines(logData.split('\n'))
+        
+    def readLines(self, lines):
+        """
+        Single pass over an iterable of lines, each line is dispatched on its (combat)/(mining) tag
+         and direction keyword, so only the regex that applies is run against it.
+        The lines are only iterated once, so they can be streamed from the log as they are read.
+        """
+        matches = {category: [] for category in _combatCategories}
+        mined = []
+        miningM3 = None
+        for line in lines:
+            if '(combat)' in line:
+                for keyword, category, regex in self.combatClassifiers:
+                    if keyword in line:
+                        match = regex.search(line)
+                        if match:
+                            matches[category].append(self.extractValues(match))
+            if '(mining)' in line:
+                match = self.minedRegex.search(line)
+                if match:
+                    if miningM3 is None:
+                        miningM3 = self.getMiningM3Setting()
+                    mined.append(self.extractValues(match, mining=True, miningM3=miningM3))
+        
+        damageOut = matches['damageOut']
+        damageIn = matches['damageIn']
+        logisticsOut = matches['armorRepairedOut'] + matches['hullRepairedOut'] + matches['shieldBoostedOut']
+        logisticsIn = matches['armorRepairedIn'] + matches['hullRepairedIn'] + matches['shieldBoostedIn']
+        capTransfered = matches['capTransferedOut']
+        capRecieved = matches['capTransferedIn'] + matches['nosRecieved']
+        # a nos hit counts in both categories, each gets its own events so they never share state
+        nosDone = [Event(event.amount, event.pilot, event.ship, event.weapon) for event in matches['nosRecieved']]
+        capDamageDone = matches['capNeutralizedOut'] + nosDone
+        capDamageRecieved = matches['capNeutralizedIn'] + matches['nosTaken']
+                
+        return damageOut, damageIn, logisticsOut, logisticsIn, capTransfered, capRecieved, capDamageDone, capDamageRecieved, mined
+    
+    def getMiningM3Setting(self):
+        """ mined amounts are reported in units unless this is overridden """
+        return False
+    
+    def extractValues(self, match, mining=False, miningM3=False):
+        """ turns a single regex match into an Event """
+        if mining:
+            amount = match.group(1)
+            _type = match.group(2)
+            if miningM3 and _type in _oreVolume:
+                return Event(int(amount) * _oreVolume[_type])
+            return Event(int(amount))
+        amount = match.group(1) or 0
+        pilotName = match.group('default_pilot') or match.group('pilot') or '?'
+        shipType = match.group('ship') or match.group('default_ship') or pilotName
+        weaponType = match.group('default_weapon') or match.group('weapon') or 'Unknown'
+        intern = self.symbols.intern
+        return Event(int(amount), intern(pilotName.strip()), intern(shipType), intern(weaponType))
+
+class BadLogException(Exception):
+    pass
+
+class LogCollisionException(BadLogException):
+    """ raised when two characters logged in at the same second and share a log file """
+    def __init__(self, character, collisionCharacter):
+        BadLogException.__init__(self, "log file collision")
+        self.character = character
+        self.collisionCharacter = collisionCharacter
+
+@functools.lru_cache(maxsize=None)
+def _compileClassifiers(language, basicPilotAndWeaponRegex, pilotAndWeaponRegex):
+    """
+    returns (combatClassifiers, minedRegex) for LogParser.compileRegex, characters with the same
+     language and overview settings share them instead of compiling their own.
+    There is one entry per language and overview file in use, so it isn't bounded,
+     alts with different overviews would only evict each other's
+    """
+    # each combat regex is paired with its direction keyword (the literal text after the last '.*'),
+    #  so a line only gets matched against the regexes whose keyword it actually contains
+    combatClassifiers = []
+    for category in _combatCategories:
+        categoryRegex = _logLanguageRegex[language][category]
+        if category in ['damageOut', 'damageIn']:
+            regex = re.compile(categoryRegex + basicPilotAndWeaponRegex)
+        else:
+            regex = re.compile(categoryRegex + pilotAndWeaponRegex)
+        keyword = categoryRegex.rsplit('.*', 1)[1]
+        combatClassifiers.append((keyword, category, regex))
+    
+    minedRegex = re.compile(_logLanguageRegex[language]['mined'])
+    return tuple(combatClassifiers), minedRegex
+
+def ProcessCharacterLine(characterLine):
+    for language, regex in _logLanguageRegex.items():
+        character = re.search(regex['character'], characterLine)
+        if character:
+            return character.group(0), language
+    raise BadLogException("not character log")
@@ -0,0 +1,69 @@
+"""
+RingBuffer:
+    Fixed length history of values backed by a numpy array.
+
+    Every value is written twice, at its index and at index + length,
+    so the 'length' most recent values are always available as one contiguous
+    slice.  That makes push O(1) and view() a zero-copy, oldest-first array
+    that can be handed straight to numpy or matplotlib.
+
+    The sum of the values is kept as a running total, which is what the
+    moving averages need every tick.
+"""
+
+import numpy as np
+
+class RingBuffer():
+    def __init__(self, length, dtype=float, fill=0):
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        self.data = np.empty(length*2, dtype=self.dtype)
+        self.clear(fill)
+
+    def clear(self, fill=0):
+        """ resets every value in the buffer to 'fill' """
+        if self.dtype == object:
+            # each slot needs its own object, otherwise every slot would share the same list
+            for index in range(len(self.data)):
+                self.data[index] = fill() if callable(fill) else fill
+            self.total = 0
+        else:
+            self.data.fill(fill)
+            self.total = fill * self.length
+        self.index = 0
+
+    def push(self, value):
+        """ adds a new value, dropping the oldest one, which is returned """
+        dropped = self.data[self.index]
+        if self.dtype != object:
+            self.total += value - dropped
+        self.data[self.index] = value
+        self.data[self.index + self.length] = value
+        self.index = (self.index + 1) % self.length
+        if self.index == 0 and self.dtype != object:
+            # a running float total slowly drifts, so it is re-summed once per full window
+            self.total = self.view().sum()
+        return dropped
+
+    def addToLast(self, value):
+        """ adds 'value' to the newest entry instead of pushing a new one """
+        lastIndex = (self.index - 1) % self.length
+        self.data[lastIndex] += value
+        self.data[lastIndex + self.length] += value
+        self.total += value
+
+    def last(self):
+        return self.data[self.index + self.length - 1]
+
+    def sum(self):
+        return self.total
+
+    def max(self):
+        return self.view().max()
+
+    def view(self):
+        """ the values oldest first, this is a view so it changes when the buffer is pushed to """
+        return self.data[self.index:self.index + self.length]
+
+    def __len__(self):
+        return self.length
@@ -0,0 +1,54 @@
+"""
+Timestamp parsing for gamelog lines.
+
+Every log line starts with a fixed width '[ YYYY.MM.DD HH:MM:SS ]' prefix in
+EVE time (UTC), so it is parsed by slicing at fixed offsets instead of going
+through strptime.  A log rarely spans more than a couple of days, so the
+epoch value of each date is cached and only the time of day is converted
+per line.
+
+Times are returned as integer epoch seconds.
+"""
+
+import calendar
+import datetime
+
+# '[ 2018.01.01 12:00:00 ]'
+timestampLength = 23
+
+_dateCache = {}
+
+def _dateEpoch(date):
+    """ epoch seconds of midnight on 'date' ('YYYY.MM.DD'), raises ValueError if it isn't a valid date """
+    try:
+        return _dateCache[date]
+    except KeyError:
+        pass
+    if date[4] != '.' or date[7] != '.':
+        raise ValueError('not a log date: ' + date)
+    epoch = calendar.timegm(datetime.date(int(date[0:4]), int(date[5:7]), int(date[8:10])).timetuple())
+    _dateCache[date] = epoch
+    return epoch
+
+def parseLogTime(text):
+    """ epoch seconds of a 'YYYY.MM.DD HH:MM:SS' string, None if it isn't one """
+    if len(text) < 19 or text[10] != ' ' or text[13] != ':' or text[16] != ':':
+        return None
+    try:
+        return _dateEpoch(text[0:10]) + int(text[11:13])*3600 + int(text[14:16])*60 + int(text[17:19])
+    except ValueError:
+        return None
+
+def parseTimestamp(line):
+    """ epoch seconds of the '[ YYYY.MM.DD HH:MM:SS ]' prefix of a log line, None if the line doesn't start with one """
+    if line[0:2] != '[ ' or line[21:23] != ' ]':
+        return None
+    return parseLogTime(line[2:21])
+
+def toEpoch(logTime):
+    """ epoch seconds of a naive UTC datetime """
+    return calendar.timegm(logTime.timetuple())
+
+def fromEpoch(epoch):
+    """ naive UTC datetime of epoch seconds, the inverse of toEpoch """
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=epoch)
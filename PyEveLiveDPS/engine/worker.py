@@ -0,0 +1,97 @@
+"""
+LogReadWorker:
+    Reads and parses the live logs every interval on its own thread.
+    Each read is one tick, which goes on a bounded queue for whoever
+    displays or records them (the animator, or the Engine's
+    subscribers).  If the queue is full because the consumer has fallen
+    behind, new ticks are merged into the last tick that hasn't been
+    queued yet, so memory stays bounded and no entries are lost,
+    only resolution.
+    
+    This is the only loop that tails the logs, the GUI and the
+    headless Engine both read through it.
+"""
+
+import time
+import queue
+import logging
+import threading
+
+class LogReadWorker(threading.Thread):
+    def __init__(self, readLogs, getInterval, capacity=50):
+        threading.Thread.__init__(self, name="logworker", daemon=True)
+        self.readLogs = readLogs
+        # the interval in ms, read again every tick so a settings change takes effect right away
+        self.getInterval = getInterval
+        self.capacity = capacity
+        self.ticks = queue.Queue(maxsize=capacity)
+        # the tick that didn't fit in the queue, the next ones are merged into it
+        self.pending = None
+        self.mergedTicks = 0
+        # held while 'pending' and the queue are changed
+        self.lock = threading.Lock()
+        # counts the calls to clear(), a tick that was read before the last one is dropped
+        self.generation = 0
+        self.running = True
+        
+    def run(self):
+        deadline = time.perf_counter()
+        while self.running:
+            try:
+                generation = self.generation
+                newTick = self.readLogs()
+                if newTick is not None:
+                    self.queueTick(newTick, generation)
+            except Exception as e:
+                logging.exception(e)
+            interval = self.getInterval()/1000
+            deadline += interval
+            now = time.perf_counter()
+            if deadline > now:
+                time.sleep(deadline - now)
+            else:
+                # reading took longer than an interval, the next read starts over from now
+                deadline = now
+            
+    def queueTick(self, newTick, generation):
+        """ 'generation' is what self.generation was when newTick started being read """
+        with self.lock:
+            if generation != self.generation:
+                return
+            if self.pending is not None:
+                self.mergedTicks += 1
+                for character, entries in newTick.items():
+                    if character in self.pending:
+                        self.pending[character] = tuple(old + new for old, new in zip(self.pending[character], entries))
+                    else:
+                        self.pending[character] = entries
+                newTick = self.pending
+            try:
+                self.ticks.put_nowait(newTick)
+                self.pending = None
+            except queue.Full:
+                if self.pending is None:
+                    logging.warning('Log queue is full, ticks are merged until the animator catches up')
+                self.pending = newTick
+            
+    def takeTicks(self):
+        """ every queued tick, oldest first """
+        ticks = []
+        while True:
+            try:
+                ticks.append(self.ticks.get_nowait())
+            except queue.Empty:
+                return ticks
+            
+    def clear(self):
+        """
+        drops the queued ticks, the merged one waiting for room and the one being read,
+         after the graph was cleared they would show old entries as new
+        """
+        with self.lock:
+            self.generation += 1
+            self.pending = None
+            self.takeTicks()
+        
+    def stop(self):
+        self.running = False
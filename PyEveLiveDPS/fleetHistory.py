@@ -0,0 +1,133 @@
+"""
+FleetHistory:
+    The history of one fleet category (dps out, dps in or logi out) for
+    every pilot in the fleet.
+
+    Instead of a pair of RingBuffers per pilot, all pilots share two matrices,
+    one row per pilot and one column per tick: 'historical' holds the amounts
+    recieved in each tick, 'yValues' the moving averages that get graphed.
+    Both use the same double write as RingBuffer (every column is written at
+    index and index + length) with a single rolling column index, so one
+    pilot's history is still a contiguous, oldest-first slice.
+
+    A new tick, the moving averages, finding the top pilots and pruning pilots
+    that have gone quiet are all one numpy operation over every row, so the
+    cost per tick barely grows with the size of the fleet.
+
+    The aggregate of the fleet is the sum of the rows, its moving average is
+    kept in a RingBuffer for the combined graph.
+"""
+
+import numpy as np
+
+from engine.ringbuffer import RingBuffer
+
+class FleetHistory():
+    def __init__(self, length, characterName, capacity=16):
+        self.length = length
+        self.characterName = characterName
+        self.historical = np.zeros((capacity, length*2))
+        self.yValues = np.zeros((capacity, length*2))
+        # running sum of each row of historical
+        self.sums = np.zeros(capacity)
+        # row -> pilot name and pilot name -> row, only the first len(pilots) rows are in use
+        self.pilots = []
+        self.rows = {}
+        self.index = 0
+        self.aggregate = RingBuffer(length)
+        # the own character is always graphed, so it gets a row from the start and is never pruned
+        self.addPilot(characterName)
+
+    def addPilot(self, pilot):
+        row = len(self.pilots)
+        if row == len(self.sums):
+            self.grow()
+        self.pilots.append(pilot)
+        self.rows[pilot] = row
+        return row
+
+    def grow(self):
+        """ doubles the number of rows, so adding pilots is amortized O(1) """
+        capacity = len(self.sums) * 2
+        for name in ['historical', 'yValues']:
+            matrix = np.zeros((capacity, self.length*2))
+            matrix[:len(self.pilots)] = getattr(self, name)[:len(self.pilots)]
+            setattr(self, name, matrix)
+        sums = np.zeros(capacity)
+        sums[:len(self.pilots)] = self.sums[:len(self.pilots)]
+        self.sums = sums
+
+    def tick(self):
+        """ starts a new tick, dropping the oldest column of every pilot """
+        count = len(self.pilots)
+        column = self.index
+        self.sums[:count] -= self.historical[:count, column]
+        self.historical[:count, column] = 0
+        self.historical[:count, column + self.length] = 0
+        self.index = (self.index + 1) % self.length
+        if self.index == 0:
+            # like RingBuffer, re-sum once per full window so float drift doesn't build up
+            self.sums[:count] = self.historical[:count, :self.length].sum(axis=1)
+
+    def add(self, pilot, amount):
+        """ adds 'amount' to the current tick of 'pilot' """
+        row = self.rows.get(pilot)
+        if row is None:
+            row = self.addPilot(pilot)
+        column = (self.index - 1) % self.length
+        self.historical[row, column] += amount
+        self.historical[row, column + self.length] += amount
+        self.sums[row] += amount
+
+    def update(self, interval):
+        """
+        Computes this tick's moving average for every pilot and for the fleet,
+        then prunes pilots that have had nothing for a whole window
+        (apart from the own character)
+        """
+        count = len(self.pilots)
+        column = (self.index - 1) % self.length
+        averages = self.sums[:count] * (1000/interval) / self.length
+        # the column being overwritten still holds the oldest average, so this is the window before this tick
+        idle = (averages == 0) & ~self.yValues[:count, column:column + self.length].any(axis=1)
+        idle[self.rows[self.characterName]] = False
+        self.yValues[:count, column] = averages
+        self.yValues[:count, column + self.length] = averages
+        self.aggregate.push(averages.sum())
+        if idle.any():
+            self.prune(~idle)
+
+    def prune(self, keep):
+        """ drops the rows where 'keep' is False, moving the remaining rows up """
+        count = len(self.pilots)
+        kept = np.flatnonzero(keep)
+        for matrix in (self.historical, self.yValues):
+            matrix[:len(kept)] = matrix[kept]
+            matrix[len(kept):count] = 0
+        self.sums[:len(kept)] = self.sums[kept]
+        self.sums[len(kept):count] = 0
+        self.pilots = [self.pilots[row] for row in kept]
+        self.rows = {pilot: row for row, pilot in enumerate(self.pilots)}
+
+    def top(self, count):
+        """ the 'count' pilots with the highest current average, highest first """
+        latest = self.yValues[:len(self.pilots), (self.index - 1) % self.length]
+        if len(latest) > count:
+            rows = np.argpartition(-latest, count)[:count]
+        else:
+            rows = np.arange(len(latest))
+        rows = rows[np.argsort(-latest[rows], kind='stable')]
+        return [self.pilots[row] for row in rows]
+
+    def view(self, pilot):
+        """ the moving averages of 'pilot' oldest first, like RingBuffer.view """
+        return self.yValues[self.rows[pilot], self.index:self.index + self.length]
+
+    def last(self, pilot):
+        return self.yValues[self.rows[pilot], (self.index - 1) % self.length]
+
+    def __len__(self):
+        return len(self.pilots)
+
+    def __contains__(self, pilot):
+        return pilot in self.rows
@@ -7,7 +7,6 @@ Contains graphs of fleet statistics
 """
 
 import tkinter as tk
-import numpy as np
 from baseWindow import BaseWindow
 from peld import settings
 from graph import DPSGraph
@@ -291,24 +290,22 @@ class FleetWindow(tk.Toplevel):
                 peldText += "?"
             connectedLabel['text'] = peldText
     
-    def processRecieveQueue(self, recieveQueue, fleetData, arrayLength):
-        for category, pilots in fleetData.items():
-            for pilot, entries in pilots.items():
-                entries["historical"].pop(0)
-                entries["historical"].append(0)
+    def processRecieveQueue(self, recieveQueue, fleetData):
+        for history in fleetData.values():
+            history.tick()
         while not recieveQueue.empty():
             fleetEntry = recieveQueue.get(False)
+            if 'entries' in fleetEntry:
+                # a batch from a server that supports them, rows are [pilotName, shipType, weaponType, amount]
+                pilot = fleetEntry['owner']
+                for entryType, rows in fleetEntry['entries'].items():
+                    fleetData[entryType].add(pilot, sum(row[3] for row in rows))
+                continue
             entryType = fleetEntry['category']
             amount = fleetEntry['entry']['amount']
             pilot = fleetEntry['entry']['owner']
             #enemy = fleetEntry['entry']['pilotName']
-            fleetData['aggregate'][entryType]['historical'][-1] += amount
-            if pilot not in fleetData[entryType]:
-                fleetData[entryType][pilot] = {}
-                fleetData[entryType][pilot]['historical'] = [0] * arrayLength
-                fleetData[entryType][pilot]['yValues'] = np.array([0] * arrayLength)
-                fleetData[entryType][pilot]['line'] = []
-            fleetData[entryType][pilot]['historical'][-1] += amount
+            fleetData[entryType].add(pilot, amount)
     
     def displayFleetData(self, fleetData):
         for category in ['dpsOut', 'dpsIn', 'logiOut']:
@@ -317,13 +314,13 @@ class FleetWindow(tk.Toplevel):
             graph = self.graphs[category]['graph']
             lines = self.graphs[category]['lines']
             categoryColor = self.graphs[category]['color']
-            tops = sorted(fleetData[category], key=lambda pilot: -fleetData[category][pilot]['yValues'][-1])
-            tops = tops[0:3]
+            history = fleetData[category]
+            tops = history.top(3)
             youTopThree = False
             highestAverage = 0
             for rank in range(len(tops)):
                 pilot = tops[rank]
-                yValues = fleetData[category][pilot]['yValues']
+                yValues = history.view(pilot)
                 line = lines[rank]
                 color = self.calculateColor(categoryColor, rank)
 
@@ -333,32 +330,33 @@ class FleetWindow(tk.Toplevel):
                     graph.basicLine(yValues, categoryColor, lines[3], '')
                 graph.basicLine(yValues, color, line)
                 
-                highest = max(yValues)
+                highest = yValues.max()
                 if highest > highestAverage:
                     highestAverage = highest
             if not youTopThree:
-                yValues = fleetData[category][self.characterName]['yValues']
+                yValues = history.view(self.characterName)
                 graph.basicLine(yValues, categoryColor+'70', lines[3], ':')
                 tops.append(self.characterName)
             graph.subplot.legend(lines, tops, loc='upper left', fontsize='x-small', framealpha=0.5).set_zorder(100)
             graph.readjust(highestAverage)
-            topValue = fleetData[category][tops[0]]['yValues'][-1]
+            topValue = history.last(tops[0])
             self.graphs[category]['labelHandler'].updateLabel('top', topValue, categoryColor)
 
-    def displayAggregate(self, aggregateData):
+    def displayAggregate(self, fleetData):
         if not self.graphs['combined']['show']:
             return
+        aggregateData = {category: history.aggregate for category, history in fleetData.items()}
         highestAverage = 0
-        for category, items in aggregateData.items():
-            highest = max(items["yValues"])
+        for category, aggregate in aggregateData.items():
+            highest = aggregate.max()
             if highest > highestAverage:
                 highestAverage = highest
         combinedLines = self.graphs['combined']['lines']
-        self.graphs['combined']['graph'].basicLine(aggregateData['dpsOut']['yValues'], "#00FFFF", combinedLines['dpsOut'])
-        self.graphs['combined']['graph'].basicLine(aggregateData['dpsIn']['yValues'], "#FF0000", combinedLines['dpsIn'])
-        self.graphs['combined']['graph'].basicLine(aggregateData['logiOut']['yValues'], "#00FF00", combinedLines['logiOut'])
+        self.graphs['combined']['graph'].basicLine(aggregateData['dpsOut'].view(), "#00FFFF", combinedLines['dpsOut'])
+        self.graphs['combined']['graph'].basicLine(aggregateData['dpsIn'].view(), "#FF0000", combinedLines['dpsIn'])
+        self.graphs['combined']['graph'].basicLine(aggregateData['logiOut'].view(), "#00FF00", combinedLines['logiOut'])
         self.graphs['combined']['graph'].readjust(highestAverage)
 
-        self.graphs['dpsOut']['labelHandler'].updateLabel('total', aggregateData['dpsOut']['yValues'][-1], "#00FFFF")
-        self.graphs['dpsIn']['labelHandler'].updateLabel('total', aggregateData['dpsIn']['yValues'][-1], "#FF0000")
-        self.graphs['logiOut']['labelHandler'].updateLabel('total', aggregateData['logiOut']['yValues'][-1], "#00FF00")
+        self.graphs['dpsOut']['labelHandler'].updateLabel('total', aggregateData['dpsOut'].last(), "#00FFFF")
+        self.graphs['dpsIn']['labelHandler'].updateLabel('total', aggregateData['dpsIn'].last(), "#FF0000")
+        self.graphs['logiOut']['labelHandler'].updateLabel('total', aggregateData['logiOut'].last(), "#00FF00")
@@ -0,0 +1,20 @@
+"""
+Local stand-in for the PELD fleet server, used to test and load test fleet
+mode without peld-fleet.com.  It needs aiohttp, which PELD itself doesn't,
+it is in requirements-dev.txt, and python 3.7 or later (3.11 is the newest
+the pinned aiohttp installs on).
+To run the server on its own:
+
+    python -m fleetserver --port 5000
+
+and point PELD's fleet server setting at http://127.0.0.1:5000.  To load test:
+
+    python -m fleetserver.loadtest --help
+"""
+
+import sys
+
+if sys.version_info < (3, 7):
+    raise ImportError('the fleet server stand-in needs python 3.7 or later, this is ' + sys.version.split()[0])
+
+from fleetserver.server import FleetServer
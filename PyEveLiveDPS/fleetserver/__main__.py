@@ -0,0 +1,38 @@
+"""
+Runs the fleet server stand-in until interrupted, run from the PyEveLiveDPS directory:
+
+    python -m fleetserver --port 5000
+"""
+
+import sys
+import time
+import logging
+import argparse
+
+from fleetserver.server import FleetServer
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='python -m fleetserver', description='local stand-in for the PELD fleet server')
+    argParser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    argParser.add_argument('--port', type=int, default=5000, help='port to listen on')
+    argParser.add_argument('--legacy', action='store_true', help="behave like a server from before batching")
+    argParser.add_argument('--report', type=float, default=5.0, help='seconds between printed stats')
+    args = argParser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(name)s:%(levelname)s - %(message)s')
+    server = FleetServer(args.host, args.port, batching=not args.legacy)
+    print('Fleet server stand-in running on ' + server.start())
+    try:
+        while True:
+            time.sleep(args.report)
+            stats = server.stats()
+            print('%d clients, %.1f frames/s, %.1f rows/s' % (stats['clients'], stats['framesPerSecond'], stats['rowsPerSecond']))
+            server.resetStats()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Load test for fleet mode, run from the PyEveLiveDPS directory:
+
+    python -m fleetserver.loadtest --clients 10 50 200 --seconds 20
+
+For every client count a local FleetServer is started in its own process,
+along with that many SocketManager processes.  Each one is fed by its own
+generated gamelog (a loggenerator LogFeed), one message per tick like the
+animator sends.  One more SocketManager acts as the observer.  Its receive queue is drained every tick through
+FleetWindow.processRecieveQueue, like the animator does in fleet mode.
+
+Reported per client count:
+    latency     time from a simulated client queueing a tick to the observer receiving it
+    frames/s    messages the server received per second (rows/s is the entries in them)
+    recieved/s  messages the observer received per second
+    cpu         thread CPU time spent in processRecieveQueue and FleetHistory.update per tick
+"""
+
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+# SocketManager.run logs through a QueueHandler
+import logging.handlers
+import argparse
+import multiprocessing
+
+from engine.aggregator import categories
+from engine.events import coalesce
+from fleetWindow import FleetWindow
+from fleetserver.server import FleetServer
+from fleetHistory import FleetHistory
+from socketManager import SocketManager
+from loggenerator import GamelogGenerator, LogFeed
+
+# lines per second of each generated client, only the categories fleet mode sends
+_fleetRates = {'damageOut': 3, 'damageIn': 3, 'armorRepairedOut': 1, 'shieldBoostedOut': 1}
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(int(len(values)*fraction), len(values)-1)]
+
+def newFleetData(characterName, arrayLength):
+    """ the same layout Animator.changeSettings builds for fleet mode """
+    return {category: FleetHistory(arrayLength, characterName) for category in ['dpsOut', 'dpsIn', 'logiOut']}
+
+class ServerProcess(multiprocessing.Process):
+    """ a FleetServer in its own process, so the server doesn't compete with the harness for the GIL """
+    def __init__(self, batching):
+        multiprocessing.Process.__init__(self, daemon=True)
+        self.batching = batching
+        self.commands = multiprocessing.Queue()
+        self.replies = multiprocessing.Queue()
+
+    def run(self):
+        server = FleetServer(batching=self.batching)
+        self.replies.put(server.start())
+        while True:
+            command = self.commands.get()
+            if command == 'stats':
+                self.replies.put(server.stats())
+            elif command == 'reset':
+                server.resetStats()
+            elif command == 'stop':
+                server.stop()
+                return
+
+    def url(self):
+        """ waits for the server to start, then returns its url, only call this once """
+        return self.replies.get()
+
+    def stats(self):
+        self.commands.put('stats')
+        return self.replies.get()
+
+    def resetStats(self):
+        self.commands.put('reset')
+
+    def stop(self):
+        self.commands.put('stop')
+        self.join(5)
+
+def startClient(url, characterName):
+    loginNotificationQueue = multiprocessing.Queue()
+    client = SocketManager(url, characterName, '', loginNotificationQueue, login=False)
+    client.start()
+    return client, loginNotificationQueue
+
+class RegistrationTimeout(Exception):
+    pass
+
+def waitForRegistration(clients, timeout):
+    """ raises RegistrationTimeout if any client isn't registered with the server within 'timeout' seconds """
+    deadline = time.time() + timeout
+    for client, loginNotificationQueue in clients:
+        try:
+            loginNotificationQueue.get(timeout=max(deadline - time.time(), 0.1))
+        except queue.Empty:
+            raise RegistrationTimeout(client.characterName + ' did not register with the fleet server within ' +
+                                      str(timeout) + ' seconds, check the server output above for errors') from None
+
+def receive(observer, localQueue, latencies, running):
+    """ moves everything the observer receives to localQueue as soon as it arrives, noting the latency """
+    while running.is_set():
+        try:
+            fleetEntry = observer.dataRecieveQueue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if 'time' in fleetEntry:
+            latencies.append(time.time() - fleetEntry['time'])
+        localQueue.put(fleetEntry)
+
+def runLoad(clientCount, seconds, interval, batching, timeout):
+    server = ServerProcess(batching)
+    server.start()
+    url = server.url()
+    processes = []
+    running = threading.Event()
+    try:
+        observer = startClient(url, 'Observer')
+        processes.append(observer[0])
+        clients = []
+        for index in range(clientCount):
+            clients.append(startClient(url, 'Pilot %d' % index))
+            processes.append(clients[-1][0])
+        waitForRegistration([observer] + clients, timeout)
+        # a client can still be in the 1 s sleep of its registration loop, wait that out before measuring
+        time.sleep(1.5)
+        observer = observer[0]
+        feeds = [LogFeed(GamelogGenerator(rates=_fleetRates, seed=index), interval) for index in range(clientCount)]
+
+        fleetWindow = FleetWindow.__new__(FleetWindow)
+        arrayLength = int(10*1000/interval)
+        fleetData = newFleetData('Observer', arrayLength)
+        # the observer's queue is moved to a local one by another thread, so only processRecieveQueue itself is timed
+        localQueue = queue.Queue()
+        latencies = []
+        running.set()
+        threading.Thread(target=receive, args=(observer, localQueue, latencies, running), daemon=True).start()
+
+        cpuTimes = []
+        recieved = 0
+        server.resetStats()
+        startTime = time.time()
+        nextTick = startTime
+        while time.time() - startTime < seconds:
+            for (client, loginNotificationQueue), feed in zip(clients, feeds):
+                newEntries = feed.readLog()
+                fleetEntries = {category: coalesce(entries) for category, entries in zip(categories, newEntries)
+                                if category != 'mining' and entries}
+                if fleetEntries:
+                    client.dataQueue.put({'entries': fleetEntries, 'time': time.time()})
+            recieved += localQueue.qsize()
+            cpuStart = time.thread_time()
+            FleetWindow.processRecieveQueue(fleetWindow, localQueue, fleetData)
+            for history in fleetData.values():
+                history.update(interval)
+            cpuTimes.append(time.thread_time() - cpuStart)
+            nextTick += interval/1000
+            sleepTime = nextTick - time.time()
+            if sleepTime > 0:
+                time.sleep(sleepTime)
+        elapsed = time.time() - startTime
+        stats = server.stats()
+        return {
+            'clients': clientCount,
+            'batching': batching,
+            'latencyMedian': percentile(latencies, 0.5),
+            'latencyP95': percentile(latencies, 0.95),
+            'framesPerSecond': stats['framesPerSecond'],
+            'rowsPerSecond': stats['rowsPerSecond'],
+            'recievedPerSecond': recieved/elapsed,
+            'cpuPerTick': sum(cpuTimes)/max(len(cpuTimes), 1),
+            'pilotsTracked': len(fleetData['dpsOut'])
+            }
+    finally:
+        running.clear()
+        for process in processes:
+            process.terminate()
+        server.stop()
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='python -m fleetserver.loadtest', description='load test the fleet protocol against a local server')
+    argParser.add_argument('--clients', type=int, nargs='+', default=[10, 50, 100], help='simulated pilot counts to run, one run each')
+    argParser.add_argument('--seconds', type=float, default=15, help='length of each run')
+    argParser.add_argument('--interval', type=int, default=100, help='ms between ticks')
+    argParser.add_argument('--legacy', action='store_true', help='run the server without batch support')
+    argParser.add_argument('--timeout', type=float, default=60, help='seconds to wait for all clients to register')
+    argParser.add_argument('--json', action='store_true', help='print one json object per run')
+    args = argParser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s:%(name)s:%(levelname)s - %(message)s')
+    if not args.json:
+        print('%8s %14s %14s %10s %10s %12s %12s' % ('clients', 'latency p50 ms', 'latency p95 ms', 'frames/s', 'rows/s', 'recieved/s', 'cpu ms/tick'))
+    for clientCount in args.clients:
+        try:
+            result = runLoad(clientCount, args.seconds, args.interval, not args.legacy, args.timeout)
+        except RegistrationTimeout as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print('%8d %14.1f %14.1f %10.0f %10.0f %12.0f %12.3f' % (clientCount, result['latencyMedian']*1000, result['latencyP95']*1000,
+                  result['framesPerSecond'], result['rowsPerSecond'], result['recievedPerSecond'], result['cpuPerTick']*1000))
+        sys.stdout.flush()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+FleetServer:
+    A local stand-in for the fleet server, for testing and load testing
+    fleet mode without peld-fleet.com.  There is no login and no fleet
+    lookup, every connected client is in one fleet.
+
+    It speaks the same events as the real server on the '/client' namespace:
+        register_client     client -> server, replied to with client_registered
+        client_registered   server -> client, lists the server's capabilities
+        peld_data           both ways, a single entry
+        peld_data_batch     both ways, one tick of entries, only for clients that support batches
+        peld_check          both ways, the client's keepalive, replied to with the fleet metadata
+        peld_error          server -> client, not sent by the stand-in
+
+    With batching=False it behaves like a server from before batching,
+    it doesn't list any capabilities so clients fall back to peld_data.
+
+    It runs on aiohttp so clients get the websocket transport like they do
+    with the real server, long polling falls over long before a large fleet does.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+
+import socketio
+from aiohttp import web
+
+_namespace = '/client'
+
+class _TaskManager(socketio.AsyncManager):
+    """
+    The AsyncManager of python-socketio 4.x passes coroutines to asyncio.wait,
+     which python 3.11 no longer takes, so each emit is wrapped in a task first.
+    PELD is pinned to socketio 4.x, newer versions don't speak its protocol
+    """
+    async def emit(self, event, data, namespace, room=None, skip_sid=None, callback=None, **kwargs):
+        if namespace not in self.rooms or room not in self.rooms[namespace]:
+            return
+        if not isinstance(skip_sid, list):
+            skip_sid = [skip_sid]
+        tasks = []
+        for sid in self.get_participants(namespace, room):
+            if sid not in skip_sid:
+                ackId = self._generate_ack_id(sid, namespace, callback) if callback is not None else None
+                tasks.append(asyncio.ensure_future(self.server._emit_internal(sid, event, data, namespace, ackId)))
+        if tasks:
+            await asyncio.wait(tasks)
+
+class FleetServer():
+    def __init__(self, host='127.0.0.1', port=0, batching=True):
+        self.host = host
+        self.port = port
+        self.batching = batching
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.startTime = time.time()
+        self.frames = 0
+        self.rows = 0
+        self.loop = None
+        self.thread = None
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', client_manager=_TaskManager())
+        self.app = web.Application()
+        self.sio.attach(self.app)
+        for event in ['connect', 'disconnect', 'register_client', 'peld_data', 'peld_data_batch', 'peld_check']:
+            self.sio.on(event, getattr(self, 'on_' + event), namespace=_namespace)
+
+    def start(self):
+        """ starts serving on a background thread, returns the url clients should connect to """
+        started = threading.Event()
+        self.thread = threading.Thread(target=self.serve, args=(started,), name='fleetserver', daemon=True)
+        self.thread.start()
+        started.wait()
+        logging.info('Fleet server stand-in listening on ' + self.url())
+        return self.url()
+
+    def serve(self, started):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        runner = web.AppRunner(self.app, access_log=None)
+        self.loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, self.host, self.port)
+        self.loop.run_until_complete(site.start())
+        # port 0 means any free port, find out which one was picked
+        self.port = runner.addresses[0][1]
+        started.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(runner.cleanup())
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self):
+        if self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+    def url(self):
+        return 'http://' + self.host + ':' + str(self.port)
+
+    def stats(self):
+        """ frames and rows received since the server started (or resetStats was called) """
+        elapsed = max(time.time() - self.startTime, 0.001)
+        with self.lock:
+            return {
+                'clients': len(self.clients),
+                'frames': self.frames,
+                'rows': self.rows,
+                'framesPerSecond': self.frames/elapsed,
+                'rowsPerSecond': self.rows/elapsed
+                }
+
+    def resetStats(self):
+        with self.lock:
+            self.startTime = time.time()
+            self.frames = 0
+            self.rows = 0
+
+    async def on_connect(self, sid, environ):
+        pass
+
+    async def on_disconnect(self, sid):
+        with self.lock:
+            self.clients.pop(sid, None)
+
+    async def on_register_client(self, sid, info):
+        batch = self.batching and 'batch' in info.get('capabilities', [])
+        with self.lock:
+            self.clients[sid] = {'name': info.get('name'), 'socket_guid': info.get('socket_guid'), 'batch': batch}
+        self.sio.enter_room(sid, 'batch' if batch else 'legacy', namespace=_namespace)
+        if self.batching:
+            await self.sio.emit('client_registered', {'capabilities': ['batch']}, room=sid, namespace=_namespace)
+        else:
+            await self.sio.emit('client_registered', room=sid, namespace=_namespace)
+
+    async def on_peld_data(self, sid, data):
+        with self.lock:
+            self.frames += 1
+            self.rows += 1
+        await self.sio.emit('peld_data', json.dumps(data), namespace=_namespace)
+
+    async def on_peld_data_batch(self, sid, data):
+        with self.lock:
+            self.frames += 1
+            self.rows += sum(len(rows) for rows in data['entries'].values())
+            legacyClients = any(not client['batch'] for client in self.clients.values())
+        await self.sio.emit('peld_data_batch', json.dumps(data), room='batch', namespace=_namespace)
+        if not legacyClients:
+            return
+        # clients that can't take batches get the old format
+        for category, rows in data['entries'].items():
+            for pilotName, shipType, weaponType, amount in rows:
+                entry = {'amount': amount, 'pilotName': pilotName, 'shipType': shipType,
+                         'weaponType': weaponType, 'owner': data['owner']}
+                await self.sio.emit('peld_data', json.dumps({'category': category, 'entry': entry}), room='legacy', namespace=_namespace)
+
+    async def on_peld_check(self, sid, data):
+        with self.lock:
+            connected = len(self.clients)
+        metadata = {'client_access': True, 'connected': connected, 'total': connected, 'fc_connected': True}
+        await self.sio.emit('peld_check', json.dumps(metadata), room=sid, namespace=_namespace)
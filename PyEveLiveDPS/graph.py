@@ -4,9 +4,11 @@ DPSGraph:
     
     matplotlib is used for all graphing
     
-    Blitting the graph (only rewriting parts that changed) has almost no
-    effect on performance in my testing (and the ticks don't redraw, so we have
-    to redraw that every frame anyways).
+    With blit=True the figure is only fully redrawn when the y-axis bucket,
+    left margin or window size changes.  Every other frame restores the cached
+    background (axes, ticks and grid) and only draws the lines on top of it.
+    Graphs that change more than their lines every frame (like the fleet
+    graphs with their legends) should use the default full redraw.
     
 """
 
@@ -15,6 +17,7 @@ matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure, Axes
 
+import math
 import numpy as np
 import tkinter as tk
 import logreader
@@ -22,13 +25,31 @@ import decimal
 from peld import settings
 import simulator
 
+# smoothListGaussian kernels by degree
+_gaussianKernels = {}
+
 class DPSGraph(tk.Frame):
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, blit=False, **kwargs):
         tk.Frame.__init__(self, parent, **kwargs)
         
         self.parent = parent
         self.degree = 5
+        self.xValues = np.arange(0)
+        self.blit = blit
+        self.background = None
+        self.blitKey = None
+        
+        self.createFigure()
+        self.canvas = FigureCanvasTkAgg(self.graphFigure, self)
+        self.canvas.get_tk_widget().configure(bg="black")
+        self.canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
+        if self.blit:
+            self.canvas.mpl_connect('draw_event', self.onDraw)
         
+        self.canvas.draw()
+        
+    def createFigure(self):
+        """ the figure and its single subplot, without a canvas so it can be drawn by any backend """
         self.graphFigure = Figure(figsize=(4,2), dpi=100, facecolor="black")
         
         self.subplot = self.graphFigure.add_subplot(1,1,1, facecolor=(0.3, 0.3, 0.3))
@@ -38,12 +59,6 @@ class DPSGraph(tk.Frame):
         self.graphFigure.axes[0].get_xaxis().set_ticklabels([])
         self.graphFigure.subplots_adjust(left=(30/100), bottom=(15/100), 
                                          right=1, top=(1-15/100), wspace=0, hspace=0)
-
-        self.canvas = FigureCanvasTkAgg(self.graphFigure, self)
-        self.canvas.get_tk_widget().configure(bg="black")
-        self.canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
-        
-        self.canvas.draw()
         
     def readjust(self, highestAverage):
         """
@@ -53,18 +68,10 @@ class DPSGraph(tk.Frame):
         Annoyingly, we have to use a %, not a number of pixels
         """
         self.windowWidth = self.winfo_width()
-        if (highestAverage < 900):
-            self.graphFigure.subplots_adjust(left=(33/self.windowWidth), top=(1-15/self.windowWidth), 
-                                             bottom=(15/self.windowWidth), wspace=0, hspace=0)
-        elif (highestAverage < 9000):
-            self.graphFigure.subplots_adjust(left=(44/self.windowWidth), top=(1-15/self.windowWidth), 
-                                             bottom=(15/self.windowWidth), wspace=0, hspace=0)
-        elif (highestAverage < 90000):
-            self.graphFigure.subplots_adjust(left=(55/self.windowWidth), top=(1-15/self.windowWidth), 
-                                             bottom=(15/self.windowWidth), wspace=0, hspace=0)
-        else:
-            self.graphFigure.subplots_adjust(left=(66/self.windowWidth), top=(1-15/self.windowWidth), 
-                                             bottom=(15/self.windowWidth), wspace=0, hspace=0)
+        if self.blit:
+            self.readjustBlit(highestAverage)
+            return
+        self.adjustMargins(highestAverage)
         if (highestAverage < 100):
             self.graphFigure.axes[0].set_ylim(bottom=0, top=100)
         else:
@@ -72,98 +79,150 @@ class DPSGraph(tk.Frame):
         self.graphFigure.axes[0].get_yaxis().grid(True, linestyle="-", color="grey", alpha=0.2)
         self.canvas.draw()
         
-    def animateLine(self, yValues, categories, lines, zorder):
+    def adjustMargins(self, highestAverage):
+        self.graphFigure.subplots_adjust(left=(self.leftMargin(highestAverage)/self.windowWidth), top=(1-15/self.windowWidth), 
+                                         bottom=(15/self.windowWidth), wspace=0, hspace=0)
+        
+    def leftMargin(self, highestAverage):
+        """ pixels needed on the left-hand side for the y-axis numbers """
+        if (highestAverage < 900):
+            return 33
+        elif (highestAverage < 9000):
+            return 44
+        elif (highestAverage < 90000):
+            return 55
+        else:
+            return 66
+        
+    def yLimitBucket(self, highestAverage):
+        """
+        The top of the y-axis, rounded up to a quarter of its order of magnitude,
+         so it only changes when the values move into a new bucket instead of every frame
+        """
+        if (highestAverage < 100):
+            return 100
+        top = highestAverage+highestAverage*0.1
+        step = (10 ** math.floor(math.log10(top)))/4
+        return math.ceil(top/step)*step
+        
+    def readjustBlit(self, highestAverage):
+        """
+        Only redraws the whole figure when something other than the lines changed,
+         otherwise the cached background is restored and just the lines are drawn
+        """
+        top = self.yLimitBucket(highestAverage)
+        blitKey = (self.windowWidth, self.winfo_height(), self.leftMargin(highestAverage), top)
+        # lines that aren't animated yet are new (e.g. after subplot.clear), and may be in the background
+        newLines = False
+        for line in self.subplot.lines:
+            if not line.get_animated():
+                line.set_animated(True)
+                newLines = True
+        if blitKey != self.blitKey or newLines or self.background is None:
+            self.blitKey = blitKey
+            self.adjustMargins(highestAverage)
+            self.graphFigure.axes[0].set_ylim(bottom=0, top=top)
+            self.graphFigure.axes[0].get_yaxis().grid(True, linestyle="-", color="grey", alpha=0.2)
+            # onDraw takes care of the background and the lines
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.drawLines()
+            self.canvas.blit(self.subplot.bbox)
+        
+    def onDraw(self, event):
+        """ called by matplotlib after every full draw, the lines are animated so they aren't in the background """
+        self.background = self.canvas.copy_from_bbox(self.graphFigure.bbox)
+        self.drawLines()
+        
+    def drawLines(self):
+        for line in self.subplot.lines:
+            self.subplot.draw_artist(line)
+        
+    def animateLine(self, yValues, categories, lines, zorder, smoothed=None):
         """
         Magic to make many lines with colors work.
         
-        This code appears inefficient, but we HAVE to avoid calling subplot.clear
-         and also making new lines in order to save CPU cycles.
+        Every point is put in its color bin at once, then each run of points in the same bin
+         becomes one line, which also gets the last point of the run before it so they connect.
+        We HAVE to avoid calling subplot.clear and also making new lines in order to save CPU cycles,
+         so lines are pooled, and lines that aren't needed this frame are hidden instead of removed.
+        'smoothed' can be passed in if the caller keeps the smoothed values up to date itself
         """
-        smoothed = self.smoothListGaussian(yValues, self.degree)
+        if smoothed is None:
+            smoothed = self.smoothListGaussian(yValues, self.degree)
+        if len(smoothed) == 0:
+            for line in lines:
+                line.set_visible(False)
+            return
+        xValues = self.getXValues(len(smoothed))
         
-        lineCategoryTracker = 0
-        lastValue = smoothed[0]
-        currentLine = []
-        lineNumber = 0
-        for index, value in enumerate(smoothed):
-            for categoryIndex, lineCategory in enumerate(categories):
-                if categoryIndex == (len(categories)-1):
-                    if value >= lineCategory["transitionValue"]:
-                        if lineCategoryTracker == categoryIndex:
-                            currentLine.append(value)
-                        else:
-                            if (lineNumber < len(lines)):
-                                lines[lineNumber].set_data(range(index-len(currentLine), index), currentLine)
-                                lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
-                            else:
-                                newLine, = self.subplot.plot(range(index-len(currentLine), index), currentLine, 
-                                                            categories[lineCategoryTracker]["color"], zorder=zorder)
-                                lines.append(newLine)
-                            lineNumber += 1
-                            lineCategoryTracker = categoryIndex
-                            currentLine = []
-                            currentLine.append(lastValue)
-                            currentLine.append(value)
-                elif value >= lineCategory["transitionValue"] and value < categories[categoryIndex+1]["transitionValue"]:
-                    if lineCategoryTracker == categoryIndex:
-                        currentLine.append(value)
-                    else:
-                        if (lineNumber < len(lines)):
-                            lines[lineNumber].set_data(range(index-len(currentLine), index), currentLine)
-                            lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
-                        else:
-                            newLine, = self.subplot.plot(range(index-len(currentLine), index), currentLine, 
-                                                        categories[lineCategoryTracker]["color"], zorder=zorder)
-                            lines.append(newLine)
-                        lineNumber += 1
-                        lineCategoryTracker = categoryIndex
-                        currentLine = []
-                        currentLine.append(lastValue)
-                        currentLine.append(value)
-            lastValue = value
-        if (lineNumber < len(lines)):
-            lines[lineNumber].set_data(range(len(smoothed)-len(currentLine), len(smoothed)), currentLine)
-            lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
-        else:
-            newLine, = self.subplot.plot(range(len(smoothed)-len(currentLine), len(smoothed)), currentLine, 
-                                         categories[lineCategoryTracker]["color"], zorder=zorder)
-            lines.append(newLine)
-            
-        lineNumber += 1
-        while lineNumber < len(lines):
-            self.subplot.lines.remove(lines[lineNumber])
-            lines.pop(lineNumber)
-            lineNumber += 1
+        transitions = [lineCategory["transitionValue"] for lineCategory in categories]
+        order = np.argsort(transitions, kind='mergesort')
+        bins = np.searchsorted(np.take(transitions, order), smoothed, side='right') - 1
+        np.clip(bins, 0, None, out=bins)
+        bins = order[bins]
+        
+        starts = np.flatnonzero(bins[1:] != bins[:-1]) + 1
+        starts = np.insert(starts, 0, 0)
+        ends = np.append(starts[1:], len(smoothed))
+        for lineNumber in range(len(starts)):
+            start = max(starts[lineNumber]-1, 0)
+            end = ends[lineNumber]
+            color = categories[bins[starts[lineNumber]]]["color"]
+            if (lineNumber < len(lines)):
+                lines[lineNumber].set_data(xValues[start:end], smoothed[start:end])
+                lines[lineNumber].set_color(color)
+                lines[lineNumber].set_visible(True)
+            else:
+                newLine, = self.subplot.plot(xValues[start:end], smoothed[start:end], color=color, zorder=zorder)
+                lines.append(newLine)
+        for line in lines[len(starts):]:
+            line.set_visible(False)
+        
+    def getXValues(self, length):
+        """ x values for a line of 'length' points, reused as long as the length doesn't change """
+        if len(self.xValues) != length:
+            self.xValues = np.arange(length)
+        return self.xValues
         
     def basicLine(self, yValues, color, line, lineStyle='-'):
         """
         Basic single color line
         """
         smoothed = self.smoothListGaussian(yValues, self.degree)
-        line.set_data(range(0, len(smoothed)), smoothed)
+        line.set_data(self.getXValues(len(smoothed)), smoothed)
         line.set_color(color)
         line.set_linestyle(lineStyle)
         
+    def gaussianKernel(self, degree=5):
+        """Normalized Gaussian weights for a given degree.
+        These never change, so they are only built once per degree"""
+        kernel = _gaussianKernels.get(degree)
+        if kernel is None:
+            window = degree*2-1
+            offsets = np.arange(window) - degree + 1
+            weight = 1/np.exp((4*(offsets/float(window)))**2)
+            kernel = weight/np.sum(weight)
+            _gaussianKernels[degree] = kernel
+        return kernel
+        
     def smoothListGaussian(self, list, degree=5):
         """Standard Gaussian (1D) function to smooth out out line
-        It's not great computationally that we have to do this every time,
-        but it makes the graph look much better.
         Degree of 5 is chosen to strike a balance between prettiness and
-        accuracy/granularity of data"""
-        window=degree*2-1  
-        weight=np.array([1.0]*window)  
-        weightGauss=[]  
-
-        for i in range(window):  
-            i=i-degree+1  
-            frac=i/float(window)  
-            gauss=1/(np.exp((4*(frac))**2))  
-            weightGauss.append(gauss)  
-
-        weight=np.array(weightGauss)*weight  
-        smoothed=[0.0]*(len(list)-window) 
-
-        for i in range(len(smoothed)):  
-            smoothed[i]=sum(np.array(list[i:i+window])*weight)/sum(weight)  
-
-        return smoothed  
+        accuracy/granularity of data.
+        The result is len(list)-window points long, the last window isn't used"""
+        kernel = self.gaussianKernel(degree)
+        window = len(kernel)
+        values = np.asarray(list, dtype=float)
+        if len(values) <= window:
+            return np.zeros(0)
+        return np.convolve(values[:-1], kernel[::-1], mode='valid')
+        
+    def smoothTail(self, list, degree=5):
+        """The newest point smoothListGaussian would return for this list.
+        When a list has only shifted by one value since it was last smoothed,
+        every other smoothed point is unchanged, so this is all that needs computing"""
+        kernel = self.gaussianKernel(degree)
+        window = len(kernel)
+        return np.dot(np.asarray(list[-window-1:-1], dtype=float), kernel)
@@ -59,9 +59,15 @@ class LabelHandler(tk.Frame):
     def updateTotal(self, labelName, number):
         self.labels[labelName]["label"].updateTotal(number)
             
+    def updatePeak(self, labelName, number):
+        self.labels[labelName]["label"].updatePeak(number)
+            
     def updateLabel(self, labelName, number, color):
         self.labels[labelName]["label"].updateLabel(number, color)
     
+    def restoreValues(self, labelName, total, peak):
+        self.labels[labelName]["label"].restoreValues(total, peak)
+    
     def clearValues(self, findColor):
         for item in self.labels:
             self.labels[item]["label"].clearValues(findColor(item, 0))
@@ -83,6 +89,7 @@ class Label(tk.Frame):
 
         self.showPeak = False
         self.peakValue = 0.0
+        self.peakChanged = False
         self.peakLabel = tk.Label(self, text="Peak:", fg="white", background="black")
         self.peakLabel.grid(row="1", column="1")
         self.peakLabel.grid_remove()
@@ -92,6 +99,7 @@ class Label(tk.Frame):
 
         self.showTotal = False
         self.totalValue = 0.0
+        self.totalChanged = False
         self.totalLabel = tk.Label(self, text="Total:", fg="white", background="black")
         self.totalLabel.grid(row="2", column="1")
         self.totalLabel.grid_remove()
@@ -132,20 +140,38 @@ class Label(tk.Frame):
             return formatString.format(round(number, decimals))
 
     def updateTotal(self, number):
+        """ totals and peaks are kept every tick, but only displayed by updateLabel """
         self.totalValue += number
-        color = self.findColor(self.totalValue)
-        self.totalNumberLabel["text"] = self.convertNumberToStr(self.totalValue)
-        self.totalNumberLabel.configure(fg=color)
+        self.totalChanged = True
+        
+    def updatePeak(self, number):
+        if self.showPeak and number >= self.peakValue:
+            self.peakValue = number
+            self.peakChanged = True
         
     def updateLabel(self, number, color):
         self.numberLabel["text"] = self.convertNumberToStr(number)
         self.numberLabel.configure(fg=color)
-        if self.showPeak and number >= self.peakValue:
-            self.peakValue = number
-            self.peakNumberLabel["text"] = self.convertNumberToStr(number)
-            self.peakNumberLabel.configure(fg=color)
+        if self.peakChanged:
+            self.peakChanged = False
+            self.peakNumberLabel["text"] = self.convertNumberToStr(self.peakValue)
+            self.peakNumberLabel.configure(fg=self.findColor(self.peakValue))
+        if self.totalChanged:
+            self.totalChanged = False
+            self.totalNumberLabel["text"] = self.convertNumberToStr(self.totalValue)
+            self.totalNumberLabel.configure(fg=self.findColor(self.totalValue))
+    
+    def restoreValues(self, total, peak):
+        """ the total and peak of the character being switched to, displayed by the next updateLabel """
+        self.totalValue = total
+        self.totalChanged = self.showTotal
+        if self.showPeak:
+            self.peakValue = peak
+            self.peakChanged = True
     
     def clearValues(self, color):
+        self.totalChanged = False
+        self.peakChanged = False
         if self.totalValue:
             self.totalValue = 0
             self.totalNumberLabel["text"] = self.convertNumberToStr(0)
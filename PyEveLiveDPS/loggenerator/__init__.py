@@ -0,0 +1,12 @@
+"""
+Synthetic EVE gamelogs for testing and load testing PELD, in every language
+it can read.  To write a log, or to keep appending to one like EVE does:
+
+    python -m loggenerator --output logs/ --language german --seconds 3600
+    python -m loggenerator --output logs/ --live --rate 200
+
+Point PELD's log location at the directory and the live log shows up as a
+character.  See python -m loggenerator --help for the rest.
+"""
+
+from loggenerator.generator import GamelogGenerator, LogFeed, defaultRates, scaledRates, logFileName
@@ -0,0 +1,82 @@
+"""
+Command line interface for the gamelog generator, run from the PyEveLiveDPS directory:
+
+    python -m loggenerator --output logs/ --seconds 3600                  an hour long log, written at once
+    python -m loggenerator --output logs/ --live --rate 200               append 200 lines a second until interrupted
+    python -m loggenerator --output logs/ --set damageIn=20 --set mining=0
+"""
+
+import os
+import sys
+import datetime
+import argparse
+
+from engine.parser import _logLanguageRegex
+from engine.timestamps import parseLogTime, fromEpoch
+from loggenerator.generator import GamelogGenerator, defaultRates, scaledRates, logFileName
+
+def parseRate(text):
+    kind, _, rate = text.partition('=')
+    if kind not in defaultRates:
+        raise argparse.ArgumentTypeError('unknown kind of line ' + kind + ', known kinds: ' + ', '.join(defaultRates))
+    try:
+        return kind, float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError('not a rate: ' + rate)
+
+def parseStartTime(text):
+    epoch = parseLogTime(text)
+    if epoch is None:
+        raise argparse.ArgumentTypeError("start time should look like '2018.01.01 12:00:00'")
+    return fromEpoch(epoch)
+
+def loadOverviewSettings(overviewFile):
+    if not overviewFile:
+        return None
+    import yaml
+    with open(overviewFile, encoding='utf8') as overviewFileContent:
+        return yaml.safe_load(overviewFileContent.read())
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='python -m loggenerator', description='write synthetic EVE gamelogs')
+    argParser.add_argument('--output', required=True, help='log file to write, or a directory to create one in')
+    argParser.add_argument('--language', default='english', choices=list(_logLanguageRegex))
+    argParser.add_argument('--character', default='Generated Character', help='the Listener of the log')
+    argParser.add_argument('--seconds', type=int, default=600, help='length of a log written at once')
+    argParser.add_argument('--start', type=parseStartTime, help="EVE time the log starts at, like '2018.01.01 12:00:00' (default: now)")
+    argParser.add_argument('--live', action='store_true', help='keep appending lines as they happen instead')
+    argParser.add_argument('--duration', type=float, help='stop appending after this many seconds')
+    argParser.add_argument('--rate', type=float, help='total lines per second, the default mix of lines is kept')
+    argParser.add_argument('--set', type=parseRate, action='append', default=[], metavar='KIND=RATE',
+                           help='lines per second of one kind of line, can be repeated (kinds: ' + ', '.join(defaultRates) + ')')
+    argParser.add_argument('--fleet', type=int, default=8, help='fleet members that send and receive assistance')
+    argParser.add_argument('--hostiles', type=int, default=8, help='hostile pilots')
+    argParser.add_argument('--overview', help='exported overview settings yaml file, for the ship label format')
+    argParser.add_argument('--seed', type=int, help='random seed, the same seed writes the same log')
+    args = argParser.parse_args(argv)
+
+    rates = dict(defaultRates)
+    rates.update(args.set)
+    if args.rate:
+        rates = scaledRates(rates, args.rate)
+    generator = GamelogGenerator(args.language, args.character, rates, args.seed, args.fleet, args.hostiles,
+                                 loadOverviewSettings(args.overview))
+
+    startTime = args.start or datetime.datetime.utcnow().replace(microsecond=0)
+    path = args.output
+    if os.path.isdir(path):
+        path = os.path.join(path, logFileName(startTime))
+
+    if args.live:
+        print('appending to ' + path + ', interrupt to stop')
+        try:
+            count = generator.appendLive(path, args.duration)
+        except KeyboardInterrupt:
+            return 0
+    else:
+        count = generator.writeLog(path, args.seconds, startTime)
+    print('%d lines written to %s' % (count, path))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+GamelogGenerator:
+    Writes gamelogs that look like the ones EVE writes, in any language
+    PELD can read: the header with the Listener and Session Started lines,
+    then combat and mining lines at configurable rates.
+
+    Combat lines are built from the language's own regex in _logLanguageRegex
+    (its direction text, sign and color), wrapped in the same markup EVE
+    uses, so a generated line is read as exactly the category it was made for.
+    Damage lines always name the other pilot as 'Pilot[TICKER](Ship)', like
+    EVE does.  Every other line uses the overview's ship label format when
+    overview settings are given, which is what LogParser expects.
+
+    Rates are lines per second for every kind in defaultRates.  'miss' and
+    'notify' lines don't count as anything, they are there because real
+    logs are full of them.
+
+LogFeed:
+    Generated lines parsed by a LogParser one tick at a time, a stand-in for
+    CharacterDetector.readLog (and the Simulator) in benchmarks and load tests.
+"""
+
+import os
+import time
+import random
+import datetime
+
+from engine.parser import _logLanguageRegex, _combatCategories, LogParser
+
+# lines per second of each kind of line, a small gang fight with some logi support
+defaultRates = {
+    'damageOut': 2.0,
+    'damageIn': 3.0,
+    'armorRepairedOut': 0.4,
+    'hullRepairedOut': 0.05,
+    'shieldBoostedOut': 0.4,
+    'armorRepairedIn': 0.4,
+    'hullRepairedIn': 0.05,
+    'shieldBoostedIn': 0.4,
+    'capTransferedOut': 0.2,
+    'capNeutralizedOut': 0.3,
+    'nosRecieved': 0.2,
+    'capTransferedIn': 0.2,
+    'capNeutralizedIn': 0.3,
+    'nosTaken': 0.2,
+    'mining': 0.2,
+    'miss': 0.8,
+    'notify': 0.1
+    }
+
+_colors = {
+    'damageOut': '0xff00ffff',
+    'damageIn': '0xffcc0000',
+    'capNeutralizedOut': '0xff7fffff',
+    'capNeutralizedIn': '0xffe57f7f',
+    'nosRecieved': '0xffe57f7f',
+    'nosTaken': '0xffe57f7f'
+    }
+_assistColor = '0xffccff66'
+
+# (low, high) amount of one line
+_amounts = {
+    'damageOut': (40, 900),
+    'damageIn': (40, 900),
+    'armorRepairedOut': (200, 1300),
+    'hullRepairedOut': (100, 600),
+    'shieldBoostedOut': (200, 1100),
+    'armorRepairedIn': (200, 1300),
+    'hullRepairedIn': (100, 600),
+    'shieldBoostedIn': (200, 1100),
+    'capTransferedOut': (300, 500),
+    'capNeutralizedOut': (100, 700),
+    'nosRecieved': (10, 200),
+    'capTransferedIn': (300, 500),
+    'capNeutralizedIn': (100, 700),
+    'nosTaken': (10, 200),
+    'mining': (50, 5000)
+    }
+
+# the module behind each kind of line that isn't damage
+_modules = {
+    'armorRepairedOut': 'Large Remote Armor Repairer II',
+    'armorRepairedIn': 'Large Remote Armor Repairer II',
+    'hullRepairedOut': 'Large Remote Hull Repairer II',
+    'hullRepairedIn': 'Large Remote Hull Repairer II',
+    'shieldBoostedOut': 'Large Remote Shield Booster II',
+    'shieldBoostedIn': 'Large Remote Shield Booster II',
+    'capTransferedOut': 'Large Remote Capacitor Transmitter II',
+    'capTransferedIn': 'Large Remote Capacitor Transmitter II',
+    'capNeutralizedOut': 'Heavy Energy Neutralizer II',
+    'capNeutralizedIn': 'Heavy Energy Neutralizer II',
+    'nosRecieved': 'Heavy Energy Nosferatu II',
+    'nosTaken': 'Heavy Energy Nosferatu II'
+    }
+# kinds of lines that involve hostiles, the rest of the assistance lines involve the fleet
+_hostileKinds = ['capNeutralizedOut', 'capNeutralizedIn', 'nosRecieved', 'nosTaken']
+
+_firstNames = ['Kadesh', 'Ilya', 'Mara', 'Tovan', 'Sereth', 'Jax', 'Orin', 'Vela', 'Kiro', 'Anek', 'Brisa', 'Dagan']
+_lastNames = ['Vorn', 'Halcyon', 'Dray', 'Ostrava', 'Kell', 'Sunder', 'Marrow', 'Asanari', 'Thorne', 'Iskander']
+_combatShips = ['Rifter', 'Thrasher', 'Hurricane', 'Ishtar', 'Gila', 'Loki', 'Hyperion', 'Machariel', 'Cerberus', 'Zealot']
+_supportShips = ['Scimitar', 'Guardian', 'Basilisk', 'Oneiros', 'Scalpel', 'Curse', 'Pilgrim', 'Bhaalgorn']
+_weapons = ['Hammerhead II', 'Warrior II', 'Scourge Heavy Missile', '425mm AutoCannon II', 'Heavy Pulse Laser II',
+            'Neutron Blaster Cannon II', 'Inferno Fury Light Missile', 'Vespa II', '800mm Repeating Cannon II']
+_qualities = ['Hits', 'Hits', 'Hits', 'Penetrates', 'Smashes', 'Glances Off', 'Grazes', 'Wrecks']
+_ores = ['Veldspar', 'Concentrated Veldspar', 'Scordite', 'Pyroxeres', 'Plagioclase', 'Kernite', 'Omber']
+_notifications = ['(notify) Your target is too far away.',
+                  '(notify) You are already targeting the maximum number of targets.',
+                  '(notify) Interference from the warp disruption field prevents warping.',
+                  '(hint) Drones are now engaging your target.',
+                  '(None) Undocking from station.']
+
+def headerLabel(language, field):
+    """ the 'Listener: ' / 'Session Started: ' text of a language, taken from its lookbehind regex """
+    return _logLanguageRegex[language][field][len('(?<='):-len(').*')]
+
+def logFileName(startTime, characterId=None):
+    """ the name EVE gives a log started at 'startTime' """
+    name = startTime.strftime('%Y%m%d_%H%M%S')
+    if characterId:
+        name += '_' + str(characterId)
+    return name + '.txt'
+
+def scaledRates(rates, linesPerSecond):
+    """ 'rates' scaled so they add up to linesPerSecond """
+    total = sum(rates.values())
+    return {kind: rate*linesPerSecond/total for kind, rate in rates.items()}
+
+class Pilot():
+    def __init__(self, rnd, ships):
+        self.name = rnd.choice(_firstNames) + ' ' + rnd.choice(_lastNames)
+        self.corporation = ''.join(rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for letter in range(rnd.randint(2, 5)))
+        self.alliance = ''.join(rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for letter in range(rnd.randint(3, 5)))
+        self.ship = rnd.choice(ships)
+        self.weapon = rnd.choice(_weapons)
+
+class GamelogGenerator():
+    def __init__(self, language='english', character='Generated Character', rates=None, seed=None,
+                 fleetSize=8, hostiles=8, overviewSettings=None):
+        if language not in _logLanguageRegex:
+            raise ValueError('unknown language: ' + language)
+        self.language = language
+        self.character = character
+        self.rates = dict(defaultRates if rates is None else rates)
+        self.random = random.Random(seed)
+        self.own = Pilot(self.random, _combatShips)
+        self.fleet = [Pilot(self.random, _supportShips + _combatShips) for pilot in range(fleetSize)]
+        self.hostiles = [Pilot(self.random, _combatShips + _supportShips) for pilot in range(hostiles)]
+        self.shipLabels = self.overviewLabels(overviewSettings)
+        # fractional lines carried over between bursts, so low rates still show up
+        self.pending = {kind: 0.0 for kind in self.rates}
+
+    def overviewLabels(self, overviewSettings):
+        """ the enabled ship labels in overview order, the same way LogParser.createOverviewRegex reads them """
+        if not overviewSettings:
+            return None
+        order = overviewSettings.get('shipLabelOrder', [])
+        sortKey = lambda shipLabel: order.index(shipLabel[0]) if shipLabel[0] in order else 10
+        labels = []
+        for shipLabel in sorted(overviewSettings['shipLabels'], key=sortKey):
+            label = dict(shipLabel[1])
+            if label['state']:
+                labels.append(label)
+        return labels
+
+    def header(self, startTime):
+        separator = '-' * 60
+        return '\n'.join([
+            separator,
+            '  Gamelog',
+            '  ' + headerLabel(self.language, 'character') + self.character,
+            '  ' + headerLabel(self.language, 'sessionTime') + startTime.strftime('%Y.%m.%d %H:%M:%S'),
+            separator,
+            ''])
+
+    def pilotLabel(self, pilot, overview=True):
+        """ how the overview names a pilot, 'Pilot[TICKER](Ship)' unless there are overview settings """
+        if not (overview and self.shipLabels):
+            return pilot.name + '[' + pilot.corporation + '](' + pilot.ship + ')'
+        values = {'pilot name': pilot.name, 'ship type': pilot.ship, 'corporation': pilot.corporation,
+                  'alliance': pilot.alliance, 'ship name': pilot.name.split()[0] + "'s " + pilot.ship}
+        text = ''
+        for label in self.shipLabels:
+            text += label['pre'] or ''
+            if label['type'] in values:
+                text += values[label['type']] + (label['post'] or '')
+        return text
+
+    def combatLine(self, category, amount, pilot, module, quality=None):
+        regex = _logLanguageRegex[self.language][category]
+        keyword = regex.rsplit('.*', 1)[1]
+        sign = '+' if '<b>\\+(' in regex else '-' if '<b>\\-(' in regex else ''
+        color = _colors.get(category, _assistColor)
+        # the keyword is the direction text with the '>' and '<' of the tags around it
+        direction = '<font size=10>' + keyword.lstrip('>') + '/font>'
+        if category in ['damageOut', 'damageIn']:
+            return ('(combat) <color=%s><b>%s%d</b> <color=0x77ffffff>%s <b><color=0xffffffff>%s</b>'
+                    '<font size=10><color=0x77ffffff> - %s - %s' % (color, sign, amount, direction,
+                    self.pilotLabel(pilot, overview=False), module, quality))
+        return ('(combat) <color=%s><b>%s%d</b><color=0x77ffffff>%s<b><color=0xffffffff>%s</b>'
+                '<color=0x77ffffff><font size=10> - %s</font>' % (color, sign, amount, direction,
+                self.pilotLabel(pilot), module))
+
+    def miningLine(self, amount, ore):
+        if self.language == 'english':
+            return '(mining) You mined <color=#ff8dc169><b>%d</b> units of <b><color=#ffeeeeee>%s</color></b>' % (amount, ore)
+        return '(mining) You mined <color=#ff8dc169><b>%d</b> units of <localized hint="%s">%s*</localized>' % (amount, ore, ore)
+
+    def line(self, kind):
+        """ one random line of 'kind', without its timestamp """
+        rnd = self.random
+        if kind == 'notify':
+            return rnd.choice(_notifications)
+        if kind == 'miss':
+            target = rnd.choice(self.hostiles)
+            return '(combat) Your %s misses %s completely - %s' % (self.own.weapon, target.name, self.own.weapon)
+        amount = rnd.randint(*_amounts[kind])
+        if kind == 'mining':
+            return self.miningLine(amount, rnd.choice(_ores))
+        if kind == 'damageOut':
+            quality = rnd.choice(_qualities)
+            return self.combatLine(kind, amount*3 if quality == 'Wrecks' else amount, rnd.choice(self.hostiles), self.own.weapon, quality)
+        if kind == 'damageIn':
+            hostile = rnd.choice(self.hostiles)
+            quality = rnd.choice(_qualities)
+            return self.combatLine(kind, amount*3 if quality == 'Wrecks' else amount, hostile, hostile.weapon, quality)
+        pilot = rnd.choice(self.hostiles if kind in _hostileKinds else self.fleet)
+        return self.combatLine(kind, amount, pilot, _modules[kind])
+
+    def burst(self, seconds):
+        """ the lines logged in 'seconds' (which can be a fraction), in a random order """
+        kinds = []
+        for kind, rate in self.rates.items():
+            self.pending[kind] += rate * seconds * self.random.uniform(0.5, 1.5)
+            count = int(self.pending[kind])
+            self.pending[kind] -= count
+            kinds += [kind] * count
+        self.random.shuffle(kinds)
+        return [self.line(kind) for kind in kinds]
+
+    def lines(self, startTime, seconds=None):
+        """ timestamped lines, one second of log at a time from startTime, forever if 'seconds' is None """
+        second = 0
+        while seconds is None or second < seconds:
+            timestamp = (startTime + datetime.timedelta(seconds=second)).strftime('[ %Y.%m.%d %H:%M:%S ] ')
+            for line in self.burst(1):
+                yield timestamp + line
+            second += 1
+
+    def writeLog(self, path, seconds, startTime=None):
+        """ writes a whole log covering 'seconds', returns the number of lines after the header """
+        startTime = startTime or datetime.datetime.utcnow().replace(microsecond=0)
+        count = 0
+        with open(path, 'w', encoding='utf8') as log:
+            log.write(self.header(startTime))
+            for line in self.lines(startTime, seconds):
+                log.write(line + '\n')
+                count += 1
+        return count
+
+    def appendLive(self, path, duration=None, interval=0.1, clock=None):
+        """
+        Appends lines to 'path' as they happen, with the current EVE time, like EVE does
+         during a fight.  The header is written first if the file doesn't exist yet.
+        Runs for 'duration' seconds, or until interrupted, returns the number of lines written
+        """
+        clock = clock or time.time
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf8') as log:
+                log.write(self.header(datetime.datetime.utcnow().replace(microsecond=0)))
+        count = 0
+        startTime = lastTime = clock()
+        with open(path, 'a', encoding='utf8') as log:
+            while duration is None or lastTime - startTime < duration:
+                time.sleep(interval)
+                now = clock()
+                timestamp = datetime.datetime.utcnow().strftime('[ %Y.%m.%d %H:%M:%S ] ')
+                lines = self.burst(now - lastTime)
+                lastTime = now
+                if lines:
+                    log.write(''.join(timestamp + line + '\n' for line in lines))
+                    log.flush()
+                    count += len(lines)
+        return count
+
+class LogFeed():
+    """ parses generated lines 'interval' ms at a time, every readLog returns one tick like CharacterDetector.readLog """
+    def __init__(self, generator, interval, parser=None, startTime=datetime.datetime(2018, 1, 1)):
+        self.generator = generator
+        self.interval = interval
+        self.parser = parser or LogParser(generator.language)
+        self.time = startTime
+
+    def readLog(self):
+        timestamp = self.time.strftime('[ %Y.%m.%d %H:%M:%S ] ')
+        self.time += datetime.timedelta(milliseconds=self.interval)
+        return self.parser.readLog('\n'.join(timestamp + line for line in self.generator.burst(self.interval/1000)))
+
+    def readLogs(self):
+        """ the same tick keyed by character, as the one queued tick CharacterDetector.readLogs returns """
+        return [{self.generator.character: self.readLog()}]
+
+    def queueStats(self):
+        """ there is no queue, every tick is read when it's taken """
+        return 1, 0
+
+    def selectedCharacter(self):
+        return self.generator.character
+
+    def simulate(self):
+        """ the same tick, for code that takes a Simulator """
+        return self.readLog()
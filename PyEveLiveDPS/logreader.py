@@ -8,152 +8,52 @@ CharacterDetector:
     either replaces an existing character with the new log file,
     or adds a new character to the character menu.
     
+    Normally only the selected character's log is read.  In 'track all
+    characters' mode every character's log is read and parsed at the
+    same time on a small thread pool, so the animator can keep the
+    history of every character and switching between them is instant.
+    
+    The live logs are read and parsed on the thread of an
+    engine.worker.LogReadWorker, which queues each read as a tick,
+    the Tk thread only takes the finished ticks off its queue.
+    Playback is still read on the Tk thread, as it follows the
+    playback controls.
+    
 LogReader:
     This class does the actual reading of the logs.  Each eve
-    character has it's own instance of this class.  This class
-    contains the regex which process new log entries into a consumable
-    format.
+    character has it's own instance of this class.  The parsing
+    itself is done by engine.LogParser, this class only adds the
+    GUI specific parts (settings, error popups, playback controls).
+    
+    Until a character is tracked its LogReader is only a handle on
+    its log.  The regex (and the overview settings it needs) is
+    compiled on the Tk thread once the character is selected, or
+    when every character is tracked, as loading the overview settings
+    can show popups.  The log itself is opened the first time it is
+    read, so characters that are never selected cost next to nothing.
 """
 
 import re
 import os
 import datetime
 import time
+import queue
+import threading
 import tkinter as tk
 from peld import settings
 import logging
-import data.oreVolume
-_oreVolume = data.oreVolume._oreVolume
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, IntVar, filedialog
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-_emptyResult = [[] for x in range(0,9)]
-
-# this holds the regex strings for all the different languages the eve game log can be in
-_logLanguageRegex = {
-    'english': {
-        'character': "(?<=Listener: ).*",
-        'sessionTime': "(?<=Session Started: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?P<default_ship>.*)\)<|<)/b.*> \-(?: (?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>to<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>from<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired to <",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired to <",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted to <",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired by <",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired by <",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted by <",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted to <",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> energy neutralized <",
-        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> energy drained from <",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted by <",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> energy neutralized <",
-        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> energy drained to <",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*> units of <.*?><.*?>(.+?)<"
-    },
-    'russian': {
-        'character': "(?<=Слушатель: ).*",
-        'sessionTime': "(?<=Сеанс начат: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>на<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>из<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности брони отремонтировано <",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности корпуса отремонтировано <",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности щитов накачано <",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности брони получено дистанционным ремонтом от <",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности корпуса получено дистанционным ремонтом от <",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса прочности щитов получено накачкой от <",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса энергии накопителя отправлено в <",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> энергии нейтрализовано <",
-        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> энергии извлечено из <",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> единиц запаса энергии накопителя получено от <",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> энергии нейтрализовано <",
-        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> энергии извлечено и передано <",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
-    },
-    'french': {
-        'character': "(?<=Auditeur: ).*",
-        'sessionTime': "(?<=Session commencée: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>à<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>de<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> points de blindage transférés à distance à <",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> points de structure transférés à distance à <",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> points de boucliers transférés à distance à <",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> points de blindage réparés à distance par <",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> points de structure réparés à distance par <",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> points de boucliers transférés à distance par <",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> points de capaciteur transférés à distance à <",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> d'énergie neutralisée en faveur de <",
-        'nosRecieved': "\(combat\) <.*?><b>([0-9]+).*> d'énergie siphonnée aux dépens de <",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> points de capaciteur transférés à distance par <",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*> d'énergie neutralisée aux dépens de <",
-        'nosTaken': "\(combat\) <.*?><b>([0-9]+).*> d'énergie siphonnée en faveur de <",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
-    },
-    'german': {
-        'character': "(?<=Empfänger: ).*",
-        'sessionTime': "(?<=Sitzung gestartet: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>nach<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>von<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> Panzerungs-Fernreparatur zu <",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> Rumpf-Fernreparatur zu <",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> Schildfernbooster aktiviert zu <",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> Panzerungs-Fernreparatur von <",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> Rumpf-Fernreparatur von <",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> Schildfernbooster aktiviert von <",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> Fernenergiespeicher übertragen zu <",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> Energie neutralisiert <",
-        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> Energie transferiert von <",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> Fernenergiespeicher übertragen von <",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>\-([0-9]+).*> Energie neutralisiert <",
-        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> Energie transferiert zu <",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
-    },
-    'japanese': {
-        'character': "(?<=傍聴者: ).*",
-        'sessionTime': "(?<=セッション開始: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>対象:<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>攻撃者:<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired to <",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired to <",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted to <",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote armor repaired by <",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*> remote hull repaired by <",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*> remote shield boosted by <",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted to <",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*> エネルギーニュートラライズ 対象:<",
-        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*> エネルギードレイン 対象:<",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*> remote capacitor transmitted by <",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*>のエネルギーが解放されました<",
-        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*> エネルギードレイン 攻撃者:<",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
-    },
-    'chinese':{
-        'character': "(?<=收听者: ).*",
-        'sessionTime': "(?<=进程开始: ).*",
-        'pilotAndWeapon': '(?:.*ffffffff>(?:<localized .*?>)?(?P<default_pilot>[^\(\)<>]*)(?:\[.*\((?:<localized .*?>)?(?P<default_ship>.*)\)<|<)/b.*> \-(?: (?:<localized .*?>)?(?P<default_weapon>.*?)(?: \-|<)|.*))',
-        'damageOut': "\(combat\) <.*?><b>([0-9]+).*>对<",
-        'damageIn': "\(combat\) <.*?><b>([0-9]+).*>来自<",
-        'armorRepairedOut': "\(combat\) <.*?><b>([0-9]+).*>远程装甲维修量至<",
-        'hullRepairedOut': "\(combat\) <.*?><b>([0-9]+).*>远程结构维修量至<",
-        'shieldBoostedOut': "\(combat\) <.*?><b>([0-9]+).*>远程护盾回充增量至<",
-        'armorRepairedIn': "\(combat\) <.*?><b>([0-9]+).*>远程装甲维修量由<",
-        'hullRepairedIn': "\(combat\) <.*?><b>([0-9]+).*>远程结构维修量由<",
-        'shieldBoostedIn': "\(combat\) <.*?><b>([0-9]+).*>远程护盾回充增量由<",
-        'capTransferedOut': "\(combat\) <.*?><b>([0-9]+).*>远程电容传输至<",
-        'capNeutralizedOut': "\(combat\) <.*?ff7fffff><b>([0-9]+).*>能量中和<",
-        'nosRecieved': "\(combat\) <.*?><b>\+([0-9]+).*>被从<",
-        'capTransferedIn': "\(combat\) <.*?><b>([0-9]+).*>远程电容传输量由<",
-        'capNeutralizedIn': "\(combat\) <.*?ffe57f7f><b>([0-9]+).*>能量中和<",
-        'nosTaken': "\(combat\) <.*?><b>\-([0-9]+).*>被吸取到<",
-        'mined': "\(mining\) .*? <.*?><.*?>([0-9]+).*(?:<localized .*?>)?(.+)\*<"
-        }
-}
+from engine.parser import _emptyResult, _logLanguageRegex, LogParser, BadLogException, LogCollisionException, ProcessCharacterLine
+from engine.logindex import LogIndex
+from engine.timestamps import parseTimestamp, parseLogTime, toEpoch, fromEpoch
+from engine.logfile import LogTail, HeaderCache
+from engine.discovery import recentLogStats
+from engine.worker import LogReadWorker
 
 _logReaders = []
 
@@ -164,25 +64,31 @@ class CharacterDetector(FileSystemEventHandler):
         self.observer = Observer()
         self.logReaders = _logReaders
         self.selectedIndex = IntVar()
+        # a copy of selectedIndex, which the log worker can read without calling into Tk
+        self.selected = 0
+        # held while the log readers are read, replaced or caught up
+        self.readLock = threading.Lock()
         self.playbackLogReader = None
         self.menuEntries = []
+        self.trackAll = IntVar(value=int(bool(settings.trackAllCharacters)))
+        self.readerPool = ThreadPoolExecutor(max_workers=4)
+        self.headerCache = HeaderCache(settings.headerCachePath)
+        # logs created while PELD runs, watchdog finds them on its own thread so they are added on the Tk thread
+        self.newLogs = queue.Queue()
+        self.mainWindow.bind('<<NewLog>>', lambda e: self.addNewLogs())
         self._start()
+        self.logWorker = LogReadWorker(self.readLiveLogs, settings.getInterval)
+        self.logWorker.start()
 
     def _start(self):
         self.path = settings.getLogLocation()
         try:
-            oneDayAgo = datetime.datetime.now() - datetime.timedelta(hours=24)
-            fileList = sorted(os.listdir(self.path), key=lambda file: os.stat(os.path.join(self.path, file)).st_mtime)
-            for filename in fileList:
-                timeString = re.sub(r'_[0-9]*\.txt$', '', filename)
-                try:
-                    fileTime = datetime.datetime.strptime(timeString, "%Y%m%d_%H%M%S")
-                except ValueError:
-                    continue
-                if (fileTime >= oneDayAgo):
-                    self.addLog(os.path.join(self.path, filename))
-
+            # the first log added is selected, addLog compiles it
             self.selectedIndex.set(0)
+            self.selected = 0
+            for logPath, logStat in recentLogStats(self.path):
+                self.addLog(logPath, logStat)
+            self.headerCache.save()
 
             if len(self.menuEntries) == 0:
                 self.characterMenu.menu.add_command(label='No character logs detected for past 24 hours', state=tk.DISABLED)
@@ -199,14 +105,18 @@ class CharacterDetector(FileSystemEventHandler):
         self.characterMenu.menu.add_separator()
         from settings.overviewSettings import OverviewSettingsWindow
         self.characterMenu.menu.add_command(label='Open overview settings', command=OverviewSettingsWindow)
+        self.characterMenu.menu.add_checkbutton(label='Track all characters', variable=self.trackAll, command=self.toggleTrackAll)
 
     def restart(self):
         self.observer.stop()
         self.observer.join()
         self.characterMenu.menu.delete(0, tk.END)
-        self.menuEntries.clear()
-        self.logReaders.clear()
+        with self.readLock:
+            self.menuEntries.clear()
+            self.logReaders.clear()
         self.playbackLogReader = None
+        # the ticks read from the old logs would be shown as the new ones
+        self.logWorker.clear()
         self.observer = Observer()
         try:
             self._start()
@@ -215,200 +125,155 @@ class CharacterDetector(FileSystemEventHandler):
             messagebox.showerror("Error", "Failed to restart log reader, invald log file path:\n\n" + str(e))
         
     def on_created(self, event):
-        self.addLog(event.src_path)
+        if not event.src_path.endswith('.txt'):
+            return
+        self.newLogs.put(event.src_path)
+        self.mainWindow.event_generate('<<NewLog>>', when='tail')
         
-    def addLog(self, logPath):
+    def addNewLogs(self):
+        while not self.newLogs.empty():
+            self.addLog(self.newLogs.get())
+        
+    def addLog(self, logPath, logStat=None):
         logging.info('Processing log file: ' + logPath)
-        log = open(logPath, 'r', encoding="utf8")
-        log.readline()
-        log.readline()
-        characterLine = log.readline()
         try:
-            character, language = ProcessCharacterLine(characterLine)
+            character, language = self.headerCache.readLogHeader(logPath, logStat)
+        except LogCollisionException as e:
+            logging.error('Log file collision on characters' + e.character + " and " + e.collisionCharacter)
+            messagebox.showerror("Error", "Log file collision on characters:\n\n" + e.character + " and " + e.collisionCharacter +
+                                "\n\nThis happens when both characters log in at exactly the same second.\n" + 
+                                "This makes it impossible to know which character owns which log.\n\n" + 
+                                "Please restart the client of the character you want to track to use this program.\n" + 
+                                "If you already did, you can ignore this message, or delete this log file:\n" + logPath)
+            return
         except BadLogException:
             logging.info("Log " + logPath + " is not a character log.")
             return
-        log.close()
         
         if len(self.menuEntries) == 0:
             self.characterMenu.menu.delete(0)
         
+        # reading starts where the log ended when it was found, like the old log did
+        newLogReader = LogReader(logPath, self.mainWindow, character, language, logStat.st_size if logStat else None)
         for i in range(len(self.menuEntries)):
             if (character == self.menuEntries[i]):
-                try:
-                    newLogReader = LogReader(logPath, self.mainWindow)
-                except BadLogException:
-                    return
-                self.logReaders[i] = newLogReader
+                if self.isTracked(i):
+                    newLogReader.compile()
+                with self.readLock:
+                    self.logReaders[i] = newLogReader
                 return
         
-        try:
-            newLogReader = LogReader(logPath, self.mainWindow)
-        except BadLogException:
-            return
-        self.logReaders.append(newLogReader)
+        if self.isTracked(len(self.menuEntries)):
+            newLogReader.compile()
         self.characterMenu.menu.insert_radiobutton(0, label=character, variable=self.selectedIndex, 
                                                 value=len(self.menuEntries), command=self.catchupLog)
-        self.menuEntries.append(character)
+        with self.readLock:
+            self.logReaders.append(newLogReader)
+            self.menuEntries.append(character)
         
     def stop(self):
         self.observer.stop()
+        self.logWorker.stop()
+        self.readerPool.shutdown(wait=False)
+        
+    def isTracked(self, index):
+        """ if the log worker reads the log at 'index', its reader has to be compiled before it does """
+        return settings.trackAllCharacters or index == self.selected
+        
+    def toggleTrackAll(self):
+        if not self.trackAll.get():
+            settings.trackAllCharacters = False
+            return
+        # the worker doesn't read the other logs until every one is compiled and caught up,
+        #  their backlog from while they weren't tracked would all land in one tick
+        with self.readLock:
+            for index, logReader in enumerate(self.logReaders):
+                if index != self.selected:
+                    logReader.compile()
+                    logReader.catchup()
+            settings.trackAllCharacters = True
         
     def playbackLog(self, logPath):
         try:
             self.mainWindow.animator.dataQueue = None
             self.playbackLogReader = PlaybackLogReader(logPath, self.mainWindow)
+            self.playbackLogReader.onProgress = lambda seconds: self.mainWindow.playbackFrame.timeSlider.set(seconds)
+            self.playbackLogReader.onEnd = lambda: self.mainWindow.playbackFrame.pauseButtonRelease(None)
             self.mainWindow.addPlaybackFrame(self.playbackLogReader.startTimeLog, self.playbackLogReader.endTimeLog)
         except BadLogException:
             self.playbackLogReader = None
             
     def stopPlayback(self):
         self.playbackLogReader = None
+        # the live ticks queued before playback started are stale now
+        self.logWorker.clear()
         self.mainWindow.removePlaybackFrame()
         
-    def readLog(self):
+    def readLogs(self):
+        """
+        Called by the animator on the Tk thread, returns the ticks read since the last call,
+         oldest first, each one is character -> new entries like readLiveLogs.
+        The live ticks come from the log worker, playback is read right here.
+        """
+        if (self.playbackLogReader):
+            return [{self.playbackLogReader.character: self.playbackLogReader.readLog()}]
+        return self.logWorker.takeTicks()
+    
+    def readLiveLogs(self):
+        """
+        Called by the log worker, returns character -> new entries for every character that is tracked,
+         that is the selected one, or all of them in 'track all characters' mode.
+        Returns None during playback, as the live logs aren't read then.
+        """
+        if (self.playbackLogReader):
+            return None
+        with self.readLock:
+            if (len(self.menuEntries) == 0):
+                return {}
+            elif not settings.trackAllCharacters:
+                return {self.menuEntries[self.selected]: self.logReaders[self.selected].readLog()}
+            logReaders = list(self.logReaders)
+            newEntries = self.readerPool.map(lambda logReader: logReader.readLog(), logReaders)
+            return {logReader.character: entries for logReader, entries in zip(logReaders, newEntries)}
+    
+    def queueStats(self):
+        """ (size, ticks merged so far) of the log worker's queue """
+        return self.logWorker.capacity, self.logWorker.mergedTicks
+    
+    def selectedCharacter(self):
+        """ the character whose log is displayed, None if there isn't one """
         if (self.playbackLogReader):
-            return self.playbackLogReader.readLog()
+            return self.playbackLogReader.character
         elif (len(self.menuEntries) > 0):
-            return self.logReaders[self.selectedIndex.get()].readLog()
-        else:
-            return _emptyResult
+            return self.menuEntries[self.selected]
+        return None
     
     def catchupLog(self):
+        selected = self.selectedIndex.get()
+        # when every character is tracked the animator already has the new character's history
+        if settings.trackAllCharacters:
+            self.selected = selected
+            return
         self.mainWindow.animator.catchup()
-        try:
-            self.logReaders[self.selectedIndex.get()].catchup()
-        except IndexError:
-            pass
+        with self.readLock:
+            # the new log is caught up before the worker can see it's selected, so its backlog is never read
+            if selected < len(self.logReaders):
+                self.logReaders[selected].compile()
+                self.logReaders[selected].catchup()
+                self.logReaders[selected].open()
+            self.selected = selected
+        self.logWorker.clear()
         
-class BaseLogReader():
+class BaseLogReader(LogParser):
+    """ LogParser that takes its overview and mining settings from the current PELD profile """
     def __init__(self, logPath, mainWindow):
         self.mainWindow = mainWindow
 
-    def createOverviewRegex(self, overviewSettings):
-        if overviewSettings:
-            def safeGetIndex(elem, _list):
-                try:
-                    return _list.index(elem)
-                except ValueError:
-                    return 10
-            try:
-                keyLambda = lambda e: safeGetIndex(e[0], overviewSettings['shipLabelOrder'])
-                sortedShipLabels = sorted(overviewSettings['shipLabels'], key=keyLambda)
-                pilotAndWeaponRegex = "(?:(?:.*ffffffff>"
-                for shipLabel in sortedShipLabels[:]:
-                    shipLabel[1] = dict(shipLabel[1])
-                    if not shipLabel[1]['state']:
-                        if shipLabel[1]['type'] in ['pilot name', 'ship type']:
-                            identifier = shipLabel[1]['type'].split()[0]
-                            pilotAndWeaponRegex += '(?P<'+identifier+'>)'
-                        continue
-                    if shipLabel[1]['type'] == None:
-                        safePre = re.escape(shipLabel[1]['pre'])
-                        pilotAndWeaponRegex += '(?:'+safePre+')?'
-                    elif shipLabel[1]['type'] in ['alliance', 'corporation', 'ship name']:
-                        safePre = re.escape(shipLabel[1]['pre'])
-                        safePost = re.escape(shipLabel[1]['post'])
-                        pilotAndWeaponRegex += '(?:'+safePre+'.*?'+safePost+')?'
-                    elif shipLabel[1]['type'] in ['pilot name', 'ship type']:
-                        safePre = re.escape(shipLabel[1]['pre'])
-                        safePost = re.escape(shipLabel[1]['post'])
-                        identifier = shipLabel[1]['type'].split()[0]
-                        pilotAndWeaponRegex += '(?:'+safePre+'(?:<localized .*?>)?(?P<'+identifier+'>.*?)'+safePost+')'
-                    else:
-                        continue
-                pilotAndWeaponRegex += ".*> \-(?: (?:<localized .*?>)?(?P<weapon>.*?)(?: \-|<)|.*))"
-                pilotAndWeaponRegex += '|' + _logLanguageRegex[self.language]['pilotAndWeapon'] + ')?'
-                return pilotAndWeaponRegex
-            except Exception as e:
-                logging.error('error parsing overview settings: ' + str(e))
-                return None
-        else:
-            return None
-        
     def compileRegex(self):
-        basicPilotAndWeaponRegex = _logLanguageRegex[self.language]['pilotAndWeapon']
-        basicPilotAndWeaponRegex += '(?P<pilot>)(?P<ship>)(?P<weapon>)'
+        super().compileRegex(settings.getOverviewSettings(self.character))
 
-        overviewSettings = settings.getOverviewSettings(self.character)
-        pilotAndWeaponRegex = self.createOverviewRegex(overviewSettings) or basicPilotAndWeaponRegex
-
-        self.damageOutRegex = re.compile(_logLanguageRegex[self.language]['damageOut'] + basicPilotAndWeaponRegex)
-        
-        self.damageInRegex = re.compile(_logLanguageRegex[self.language]['damageIn'] + basicPilotAndWeaponRegex)
-        
-        self.armorRepairedOutRegex = re.compile(_logLanguageRegex[self.language]['armorRepairedOut'] + pilotAndWeaponRegex)
-        self.hullRepairedOutRegex = re.compile(_logLanguageRegex[self.language]['hullRepairedOut'] + pilotAndWeaponRegex)
-        self.shieldBoostedOutRegex = re.compile(_logLanguageRegex[self.language]['shieldBoostedOut'] + pilotAndWeaponRegex)
-        
-        self.armorRepairedInRegex = re.compile(_logLanguageRegex[self.language]['armorRepairedIn']+ pilotAndWeaponRegex)
-        self.hullRepairedInRegex = re.compile(_logLanguageRegex[self.language]['hullRepairedIn'] + pilotAndWeaponRegex)
-        self.shieldBoostedInRegex = re.compile(_logLanguageRegex[self.language]['shieldBoostedIn'] + pilotAndWeaponRegex)
-        
-        self.capTransferedOutRegex = re.compile(_logLanguageRegex[self.language]['capTransferedOut'] + pilotAndWeaponRegex)
-        
-        self.capNeutralizedOutRegex = re.compile(_logLanguageRegex[self.language]['capNeutralizedOut'] + pilotAndWeaponRegex)
-        self.nosRecievedRegex = re.compile(_logLanguageRegex[self.language]['nosRecieved'] + pilotAndWeaponRegex)
-        
-        self.capTransferedInRegex = re.compile(_logLanguageRegex[self.language]['capTransferedIn'] + pilotAndWeaponRegex)
-        #add nos recieved to this group in readlog
-        
-        self.capNeutralizedInRegex = re.compile(_logLanguageRegex[self.language]['capNeutralizedIn'] + pilotAndWeaponRegex)
-        self.nosTakenRegex = re.compile(_logLanguageRegex[self.language]['nosTaken'] + pilotAndWeaponRegex)
-        
-        self.minedRegex = re.compile(_logLanguageRegex[self.language]['mined'])
-        
-    def readLog(self, logData):
-        damageOut = self.extractValues(self.damageOutRegex, logData)
-        damageIn = self.extractValues(self.damageInRegex, logData)
-        logisticsOut = self.extractValues(self.armorRepairedOutRegex, logData)
-        logisticsOut.extend(self.extractValues(self.hullRepairedOutRegex, logData))
-        logisticsOut.extend(self.extractValues(self.shieldBoostedOutRegex, logData))
-        logisticsIn = self.extractValues(self.armorRepairedInRegex, logData)
-        logisticsIn.extend(self.extractValues(self.hullRepairedInRegex, logData))
-        logisticsIn.extend(self.extractValues(self.shieldBoostedInRegex, logData))
-        capTransfered = self.extractValues(self.capTransferedOutRegex, logData)
-        capRecieved = self.extractValues(self.capTransferedInRegex, logData)
-        capRecieved.extend(self.extractValues(self.nosRecievedRegex, logData))
-        capDamageDone = self.extractValues(self.capNeutralizedOutRegex, logData)
-        capDamageDone.extend(self.extractValues(self.nosRecievedRegex, logData))
-        capDamageRecieved = self.extractValues(self.capNeutralizedInRegex, logData)
-        capDamageRecieved.extend(self.extractValues(self.nosTakenRegex, logData))
-        mined = self.extractValues(self.minedRegex, logData, mining=True)
-                
-        return damageOut, damageIn, logisticsOut, logisticsIn, capTransfered, capRecieved, capDamageDone, capDamageRecieved, mined
-    
-    def extractValues(self, regex, logData, mining=False):
-        returnValue = []
-        group = regex.finditer(logData)
-        if mining:
-            for match in group:
-                amount = match.group(1)
-                _type = match.group(2)
-                if amount != 0:
-                    returnGroup = {}
-                    if settings.getMiningM3Setting():
-                        if _type in _oreVolume:
-                            returnGroup['amount'] = int(amount) * _oreVolume[_type]
-                        else:
-                            returnGroup['amount'] = int(amount)
-                    else:
-                        returnGroup['amount'] = int(amount)
-                    returnValue.append(returnGroup)
-            return returnValue
-        for match in group:
-            amount = match.group(1) or 0
-            pilotName = match.group('default_pilot') or match.group('pilot') or '?'
-            shipType = match.group('ship') or match.group('default_ship') or pilotName
-            weaponType = match.group('default_weapon') or match.group('weapon') or 'Unknown'
-            if amount != 0:
-                returnGroup = {}
-                returnGroup['amount'] = int(amount)
-                returnGroup['pilotName'] = pilotName.strip()
-                returnGroup['shipType'] = shipType
-                returnGroup['weaponType'] = weaponType
-                returnValue.append(returnGroup)
-        return returnValue
+    def getMiningM3Setting(self):
+        return settings.getMiningM3Setting()
     
 class PlaybackLogReader(BaseLogReader):
     def __init__(self, logPath, mainWindow):
@@ -417,14 +282,18 @@ class PlaybackLogReader(BaseLogReader):
         self.mainWindow = mainWindow
         self.paused = False
         self.logPath = logPath
+        # the GUI sets these to drive the playback frame
+        self.onProgress = lambda seconds: None
+        self.onEnd = lambda: None
         try:
-            self.log = open(logPath, 'r', encoding="utf8")
-            self.log.readline()
-            self.log.readline()
+            with open(logPath, 'r', encoding="utf8") as header:
+                header.readline()
+                header.readline()
+                characterLine = header.readline()
+                sessionLine = header.readline()
         except:
             messagebox.showerror("Error", "This doesn't appear to be a EVE log file.\nPlease select a different file.")
             raise BadLogException("not character log")
-        characterLine = self.log.readline()
         try:
             self.character, self.language = ProcessCharacterLine(characterLine)
         except BadLogException:
@@ -433,126 +302,99 @@ class PlaybackLogReader(BaseLogReader):
         logging.info('Log language is ' + self.language)
         
         startTimeRegex = _logLanguageRegex[self.language]['sessionTime']
-        self.startTimeLog = datetime.datetime.strptime(re.search(startTimeRegex, self.log.readline()).group(0), "%Y.%m.%d %X")
-
-        self.log.readline()
-        self.logLine = self.log.readline()
-        while (self.logLine == "------------------------------------------------------------\n"):
-            self.log.readline()
-            collisionCharacter, language = ProcessCharacterLine(self.log.readline())
-            #Since we currently don't have a use for characters during playback, this is not needed for now.
-            #messagebox.showerror("Error", "Log file collision on characters:\n\n" + character + " and " + collisionCharacter +
-            #                    "\n\nThis happens when both characters log in at exactly the same second.\n" + 
-            #                    "This makes it impossible to know which character owns this log.\n\n" + 
-            #                    "Playback will continue\nlog file:\n" + logPath)
-            self.log.readline()
-            self.log.readline()
-            self.logLine = self.log.readline()
-        self.timeRegex = re.compile("^\[ .*? \]")
-        self.nextLine = self.logLine
-        self.nextTime = datetime.datetime.strptime(self.timeRegex.findall(self.nextLine)[0], "[ %Y.%m.%d %X ]")
-        self.startTimeDelta = datetime.datetime.utcnow() - self.startTimeLog
+        self.startTimeLog = fromEpoch(parseLogTime(re.search(startTimeRegex, sessionLine).group(0)))
+        self.startEpoch = toEpoch(self.startTimeLog)
         
-        self.compileRegex()
+        # one pass over the log gives the end time, the activity graph and the seek offsets
+        self.index = LogIndex(logPath, self.startTimeLog, sidecarDir=settings.logIndexPath)
+        if self.index.empty():
+            messagebox.showerror("Error", "This log doesn't contain any entries.\nPlease select a different file.")
+            raise BadLogException("empty log")
+        self.endTimeLog = self.startTimeLog + datetime.timedelta(seconds=self.index.endSeconds())
+        self.logEntryFrequency = self.index.frequency()
         
-        #inefficient, but ok for our normal log size
-        endOfLog = open(logPath, 'r', encoding="utf8")
-        line = endOfLog.readline()
-        while ( line != '' ):
-            line = endOfLog.readline()
-            try:
-                nextTimeString = self.timeRegex.findall(line)[0]
-            except IndexError:
-                continue
-            self.endTimeLog = datetime.datetime.strptime(nextTimeString, "[ %Y.%m.%d %X ]")
-        endOfLog.close()
+        # the log is read as bytes so it can be seeked to the offsets in the index
+        self.log = open(logPath, 'rb')
+        self.seekTo(self.index.firstOffset())
+        # log times are epoch seconds, playback is at (current time - startTimeDelta)
+        self.startTimeDelta = time.time() - self.startEpoch
         
-        endOfLog = open(logPath, 'r', encoding="utf8")
-        line = endOfLog.readline()
-        self.logEntryFrequency = [0] * (self.endTimeLog - self.startTimeLog).seconds
-        while ( line != '' ):
-            line = endOfLog.readline()
-            try:
-                nextTimeString = self.timeRegex.findall(line)[0]
-                entryTime = datetime.datetime.strptime(nextTimeString, "[ %Y.%m.%d %X ]")
-                self.logEntryFrequency[(entryTime - self.startTimeLog).seconds] += 1
-            except IndexError:
-                continue
-        endOfLog.close()
+        self.compileRegex()
         
+    def seekTo(self, offset):
+        """ moves the log to 'offset', which is the start of a line with a timestamp or None for the end of the log """
+        if offset is None:
+            self.log.seek(0, os.SEEK_END)
+            self.nextLine = ''
+            self.nextTime = self.startEpoch + self.index.endSeconds()
+            return
+        self.log.seek(offset)
+        self.nextLine = self.log.readline().decode('utf8')
+        self.nextTime = parseTimestamp(self.nextLine)
         
     def newStartTime(self, newTime):
-        self.log.close()
-        self.log = open(self.logPath, 'r', encoding="utf8")
-        self.startTimeDelta = datetime.datetime.utcnow() - newTime
-        self.nextTime = self.startTimeLog
-        while ( self.nextTime < newTime ):
-            line = self.log.readline()
-            try:
-                nextTimeString = self.timeRegex.findall(line)[0]
-            except IndexError:
-                continue
-            self.nextTime = datetime.datetime.strptime(nextTimeString, "[ %Y.%m.%d %X ]")
-            self.nextLine = line
+        newEpoch = toEpoch(newTime)
+        self.startTimeDelta = time.time() - newEpoch
+        self.seekTo(self.index.offsetAt(newEpoch - self.startEpoch))
         
     def readLog(self):
         if self.paused:
             return _emptyResult
         logData = ""
-        logReaderTime = datetime.datetime.utcnow() - self.startTimeDelta
-        self.mainWindow.playbackFrame.timeSlider.set((logReaderTime - self.startTimeLog).seconds)
+        logReaderTime = time.time() - self.startTimeDelta
+        self.onProgress(int(logReaderTime - self.startEpoch))
         while ( self.nextTime < logReaderTime ):
             logData += self.nextLine
-            self.nextLine = self.log.readline()
+            self.nextLine = self.log.readline().decode('utf8')
             if (self.nextLine == ''):
-                self.mainWindow.playbackFrame.pauseButtonRelease(None)
+                self.onEnd()
                 return _emptyResult
-            try:
-                nextTimeString = self.timeRegex.findall(self.nextLine)[0]
-            except IndexError:
-                continue
-            self.nextTime = datetime.datetime.strptime(nextTimeString, "[ %Y.%m.%d %X ]")
+            nextTime = parseTimestamp(self.nextLine)
+            if nextTime is not None:
+                self.nextTime = nextTime
         return super().readLog(logData)
         
         
 class LogReader(BaseLogReader):
-    def __init__(self, logPath, mainWindow):
+    def __init__(self, logPath, mainWindow, character, language, endOffset=None):
         super().__init__(logPath, mainWindow)
-        self.log = open(logPath, 'r', encoding="utf8")
-        self.log.readline()
-        self.log.readline()
-        characterLine = self.log.readline()
-        self.character, self.language = ProcessCharacterLine(characterLine)
-        logging.info('Log language is ' + self.language)
-        self.log.readline()
-        self.log.readline()
-        self.logLine = self.log.readline()
-        if (self.logLine == "------------------------------------------------------------\n"):
-            self.log.readline()
-            collisionCharacter, language = ProcessCharacterLine(self.log.readline())
-            logging.error('Log file collision on characters' + self.character + " and " + collisionCharacter)
-            messagebox.showerror("Error", "Log file collision on characters:\n\n" + self.character + " and " + collisionCharacter +
-                                "\n\nThis happens when both characters log in at exactly the same second.\n" + 
-                                "This makes it impossible to know which character owns which log.\n\n" + 
-                                "Please restart the client of the character you want to track to use this program.\n" + 
-                                "If you already did, you can ignore this message, or delete this log file:\n" + logPath)
-            raise BadLogException("log file collision")
-        self.log.read()
-        self.compileRegex()
+        self.logPath = logPath
+        self.character = character
+        self.language = language
+        # where reading starts once the log is opened, None for wherever the log ends then
+        self.endOffset = endOffset
+        self.logTail = None
+        self.compiled = False
+        
+    def compile(self):
+        """
+        compiles the regex for the character's overview settings, if it isn't already
+        Has to be called on the Tk thread, loading the overview settings can show a popup
+        """
+        if not self.compiled:
+            logging.info('Log language is ' + self.language)
+            super().compileRegex()
+            self.compiled = True
+            
+    def compileRegex(self):
+        # when the overview settings change, a reader that isn't compiled yet just uses the new ones once it is
+        if self.compiled:
+            super().compileRegex()
+        
+    def open(self):
+        """ opens the log, the first time it is read or selected """
+        if self.logTail is None:
+            self.logTail = LogTail(self.logPath, self.endOffset)
             
     def readLog(self):
-        logData = self.log.read()
-        return super().readLog(logData)
+        # the Tk thread compiles every reader before it is tracked, this is only in case one slips through
+        if not self.compiled:
+            return _emptyResult
+        self.open()
+        return self.readLines(self.logTail.lines())
     
     def catchup(self):
-        self.log.read()
-    
-class BadLogException(Exception):
-    pass
-
-def ProcessCharacterLine(characterLine):
-    for language, regex in _logLanguageRegex.items():
-        character = re.search(regex['character'], characterLine)
-        if character:
-            return character.group(0), language
-    raise BadLogException("not character log")
+        if self.logTail is None:
+            self.endOffset = None
+        else:
+            self.logTail.catchup()
@@ -27,6 +27,7 @@ from baseWindow import BaseWindow
 from detailsWindow import DetailsWindow
 from collapseWindow import UncollapseWindow
 from fleetWindow import FleetWindow
+from perfOverlay import PerfOverlay
 if (platform.system() == "Windows"):
     from ctypes import windll
 
@@ -85,7 +86,7 @@ class MainWindow(tk.Tk):
         self.update_idletasks()
         
         # The hero of our app
-        self.graphFrame = graph.DPSGraph(self.middleFrame, background="black", borderwidth="0")
+        self.graphFrame = graph.DPSGraph(self.middleFrame, blit=True, background="black", borderwidth="0")
         self.graphFrame.grid(row="1", column="0", columnspan="3", sticky="nesw")
         self.makeDraggable(self.graphFrame.canvas.get_tk_widget())
         
@@ -98,6 +99,9 @@ class MainWindow(tk.Tk):
         self.animator = animate.Animator(self)
         self.bind('<<ChangeSettings>>', lambda e: self.animator.changeSettings())
         
+        # hidden until it is toggled from the menu
+        self.perfOverlay = PerfOverlay(self, self.animator.perfMonitor)
+        
         self.graphFrame.readjust(0)
         if settings.getGraphDisabled():
             self.graphFrame.grid_remove()
@@ -171,6 +175,7 @@ class MainWindow(tk.Tk):
         self.mainMenu.menu.add_command(label="Simulate Input", command=lambda: simulationWindow.SimulationWindow(self))
         getLogFilePath = lambda: tk.filedialog.askopenfilename(initialdir=self.characterDetector.path, title="Select log file")
         self.mainMenu.menu.add_command(label="Playback Log", command=lambda: self.characterDetector.playbackLog(getLogFilePath()))
+        self.mainMenu.menu.add_command(label="Performance Overlay", command=lambda: self.perfOverlay.toggle())
         self.mainMenu.menu.add_separator()
         self.mainMenu.menu.add_command(label="Quit", command=self.quitEvent)
     
@@ -301,6 +306,8 @@ class MainWindow(tk.Tk):
             self.detailsWindow.withdraw()
         if settings.fleetWindowShow and hasattr(self, 'fleetWindow') and self.animator.dataQueue:
             self.fleetWindow.withdraw()
+        if hasattr(self, 'perfOverlay') and self.perfOverlay.shown:
+            self.perfOverlay.withdraw()
         self.iconify()
         self.update()
         self.middleFrame.bind("<Map>", self.showEvent)
@@ -321,6 +328,8 @@ class MainWindow(tk.Tk):
             self.detailsWindow.deiconify()
         if settings.fleetWindowShow and hasattr(self, 'fleetWindow') and self.animator.dataQueue:
             self.fleetWindow.deiconify()
+        if hasattr(self, 'perfOverlay') and self.perfOverlay.shown:
+            self.perfOverlay.deiconify()
         self.addToTaskbar()
         self.middleFrame.bind("<Map>", self.showEvent)
     
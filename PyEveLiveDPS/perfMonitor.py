@@ -0,0 +1,132 @@
+"""
+PerfMonitor:
+    How long each stage of Animator.animate takes, over the last 'window' ticks.
+
+    animate calls startTick() when it starts, lap(stage) after each piece of
+    work and endTick() when it is done.  A lap adds the time since the
+    previous lap to that stage, so work that is spread over the category loop
+    (the graph, labels and details of every category) still adds up to one
+    duration per stage per tick.  Durations are kept in a RingBuffer per
+    stage, the percentiles are only calculated when the overlay or the
+    periodic log line asks for them.
+
+    A tick is late when it starts more than half an interval after its
+    deadline.  Deadlines the Animator skipped because it was too far behind
+    are counted as dropped ticks.  A tick is over budget when animate itself
+    took longer than the interval.
+
+    The logs are read and parsed on the log worker's thread, so 'read' is
+    only the time taken to get the queued ticks.  How far behind the Tk
+    thread is shows in the queue instead: how many ticks were waiting
+    each time animate took them, and how many the worker had to merge
+    because the queue was full.
+"""
+
+import time
+import logging
+
+import numpy as np
+
+from engine.ringbuffer import RingBuffer
+
+# in the order animate runs them
+stages = ['read', 'aggregate', 'graph', 'labels', 'details', 'fleet']
+
+class PerfMonitor():
+    def __init__(self, window=600, logInterval=60):
+        self.window = window
+        self.logInterval = logInterval
+        self.durations = {stage: RingBuffer(window) for stage in stages + ['total']}
+        self.queueDepths = RingBuffer(window)
+        self.current = dict.fromkeys(stages, 0.0)
+        self.reset()
+
+    def reset(self):
+        """ forgets every tick so far, for when the settings (and so the work per tick) change """
+        for durations in self.durations.values():
+            durations.clear()
+        self.queueDepths.clear()
+        self.queueCapacity = 0
+        self.mergedTicks = 0
+        self.ticks = 0
+        self.frames = 0
+        self.lateTicks = 0
+        self.droppedTicks = 0
+        self.overBudgetTicks = 0
+        self.interval = 0
+        self.tickStart = None
+        self.lastLap = None
+        self.lastLog = time.perf_counter()
+
+    def startTick(self, interval, deadline=None):
+        """ 'deadline' is the perf_counter time the tick was due, if it was scheduled """
+        now = time.perf_counter()
+        if deadline is not None and (now - deadline)*1000 > interval/2:
+            self.lateTicks += 1
+        self.interval = interval
+        self.tickStart = now
+        self.lastLap = now
+        for stage in self.current:
+            self.current[stage] = 0.0
+
+    def dropTicks(self, count):
+        self.droppedTicks += count
+
+    def queued(self, depth, capacity, mergedTicks):
+        """ the log worker's queue when animate took from it: the ticks waiting, its size and the ticks it merged so far """
+        self.queueDepths.push(depth)
+        self.queueCapacity = capacity
+        self.mergedTicks = mergedTicks
+
+    def queueDepth(self):
+        """ (median, max) of the ticks waiting in the log queue, over the ticks in the window """
+        count = min(self.ticks, self.window)
+        if count == 0:
+            return 0, 0
+        depths = self.queueDepths.view()[-count:]
+        return np.median(depths), depths.max()
+
+    def frameDrawn(self):
+        self.frames += 1
+
+    def lap(self, stage):
+        """ adds the time since the last lap to 'stage' """
+        now = time.perf_counter()
+        self.current[stage] += now - self.lastLap
+        self.lastLap = now
+
+    def endTick(self):
+        if self.tickStart is None:
+            return
+        now = time.perf_counter()
+        total = now - self.tickStart
+        for stage, duration in self.current.items():
+            self.durations[stage].push(duration)
+        self.durations['total'].push(total)
+        self.ticks += 1
+        if total*1000 > self.interval:
+            self.overBudgetTicks += 1
+        if now - self.lastLog >= self.logInterval:
+            self.lastLog = now
+            logging.info(self.logLine())
+
+    def percentiles(self, stage):
+        """ (median, 95th percentile, max) of 'stage' in ms, over the ticks in the window """
+        count = min(self.ticks, self.window)
+        if count == 0:
+            return 0.0, 0.0, 0.0
+        durations = self.durations[stage].view()[-count:]*1000
+        median, p95 = np.percentile(durations, [50, 95])
+        return median, p95, durations.max()
+
+    def summary(self):
+        """ (stage, median, 95th percentile, max) for every stage and the total """
+        return [(stage,) + self.percentiles(stage) for stage in stages + ['total']]
+
+    def logLine(self):
+        timings = ', '.join('%s %.1f/%.1f' % (stage, median, p95) for stage, median, p95, highest in self.summary())
+        medianDepth, maxDepth = self.queueDepth()
+        return ('animate ms p50/p95: %s | %d ticks, %d frames, %d late, %d dropped, %d over budget | '
+                'log queue median %g, max %d of %d, %d merged' %
+                (timings, self.ticks, self.frames, self.lateTicks, self.droppedTicks, self.overBudgetTicks,
+                 medianDepth, maxDepth, self.queueCapacity, self.mergedTicks))
@@ -0,0 +1,83 @@
+"""
+PerfOverlay:
+
+A small always on top window with the animator's PerfMonitor numbers,
+toggled from the File menu.  It only refreshes while it is shown.
+
+Some of the styling for this window comes from BaseWindow
+so only items specific to this window have to be implemented
+"""
+
+import tkinter as tk
+from baseWindow import BaseWindow
+from perfMonitor import stages
+
+class PerfOverlay(tk.Toplevel):
+    refreshInterval = 1000
+
+    def __init__(self, mainWindow, perfMonitor):
+        tk.Toplevel.__init__(self)
+        self.baseWindow = BaseWindow(self)
+        self.mainWindow = mainWindow
+        self.perfMonitor = perfMonitor
+        self.shown = False
+        self.refreshId = None
+        self.withdraw()
+
+        self.columnconfigure(5, weight=1)
+        self.rowconfigure(10, weight=1)
+
+        self.topLabel = tk.Label(self, text="Performance", fg="white", background="black")
+        self.topLabel.grid(row="5", column="5", columnspan="10")
+        self.makeDraggable(self.topLabel)
+
+        tk.Frame(self, highlightthickness="1", highlightbackground="dim gray", background="black").grid(row="6", column="5", sticky="we", columnspan="10")
+
+        self.table = tk.Frame(self, background="black")
+        self.table.grid(row="10", column="1", columnspan="19", sticky="news")
+        self.makeDraggable(self.table)
+        for column, text in enumerate(["ms", "p50", "p95", "max"]):
+            self.addLabel(text, 0, column, "gray")
+        # stage -> the labels of its p50, p95 and max
+        self.valueLabels = {}
+        for row, stage in enumerate(stages + ['total'], start=1):
+            self.addLabel(stage, row, 0, "gray")
+            self.valueLabels[stage] = [self.addLabel("", row, column, "white") for column in range(1, 4)]
+        self.countsLabel = self.addLabel("", len(stages) + 2, 0, "white", columnspan=4)
+        self.queueLabel = self.addLabel("", len(stages) + 3, 0, "white", columnspan=4)
+
+        self.geometry("+%s+%s" % (mainWindow.winfo_x(), mainWindow.winfo_y() + mainWindow.winfo_height()))
+
+    def __getattr__(self, attr):
+        return getattr(self.baseWindow, attr)
+
+    def addLabel(self, text, row, column, color, columnspan=1):
+        label = tk.Label(self.table, text=text, fg=color, background="black", anchor="e" if column else "w")
+        label.grid(row=row, column=column, columnspan=columnspan, sticky="we", padx=3)
+        self.makeDraggable(label)
+        return label
+
+    def toggle(self):
+        self.shown = not self.shown
+        if self.shown:
+            self.deiconify()
+            self.refresh()
+        else:
+            self.withdraw()
+            if self.refreshId:
+                self.after_cancel(self.refreshId)
+                self.refreshId = None
+
+    def refresh(self):
+        if not self.shown:
+            return
+        for stage, median, p95, highest in self.perfMonitor.summary():
+            for label, value in zip(self.valueLabels[stage], (median, p95, highest)):
+                label.configure(text="%.1f" % value)
+        monitor = self.perfMonitor
+        self.countsLabel.configure(text="%d late, %d dropped, %d over budget of %d ticks, %d frames" %
+                                   (monitor.lateTicks, monitor.droppedTicks, monitor.overBudgetTicks, monitor.ticks, monitor.frames))
+        medianDepth, maxDepth = monitor.queueDepth()
+        self.queueLabel.configure(text="log queue median %g, max %d of %d ticks, %d merged" %
+                                  (medianDepth, maxDepth, monitor.queueCapacity, monitor.mergedTicks))
+        self.refreshId = self.after(self.refreshInterval, self.refresh)
@@ -83,14 +83,22 @@ class Settings(FileSystemEventHandler):
         if (platform.system() == "Windows"):
             self.path = os.environ['APPDATA'] + "\\PELD"
             filename = "PELD.json"
+            headerCacheFilename = "logHeaders.cache"
+            logIndexDirname = "logIndexes"
         else:
             self.path = os.environ['HOME']
             filename = ".peld"
+            headerCacheFilename = ".peldLogHeaders"
+            logIndexDirname = ".peldLogIndexes"
             
         if not os.path.exists(self.path):
             os.mkdir(self.path)
             
         self.fullPath = os.path.join(self.path, filename)
+        # the character and language of the gamelogs read at startup, see engine.HeaderCache
+        self.headerCachePath = os.path.join(self.path, headerCacheFilename)
+        # the playback indexes of logs that were played back, see engine.LogIndex
+        self.logIndexPath = os.path.join(self.path, logIndexDirname)
             
         if not os.path.exists(self.fullPath):
             settingsFile = open(self.fullPath, 'w')
@@ -106,6 +114,8 @@ class Settings(FileSystemEventHandler):
         self.currentProfile = self.allSettings[0]["profileSettings"]
 
         self.lowCPUMode = False
+        # overview file -> (modification time, parsed settings), many characters use the same file
+        self.overviewCache = {}
         
     def on_moved(self, event):
         if not event.dest_path.endswith('.json'):
@@ -297,7 +307,7 @@ class Settings(FileSystemEventHandler):
             return []
         try:
             return self.currentProfile["mining"][0]["showM3"]
-        except KeyError:
+        except (KeyError, IndexError):
             return False
     
     def getInterval(self):
@@ -467,6 +477,19 @@ class Settings(FileSystemEventHandler):
                 profile["disableUpdateReminderFor"] = value
         self.writeSettings()
         
+    @property
+    def trackAllCharacters(self):
+        for profile in self.allSettings:
+            if (profile["profile"] == "Default"):
+                return profile.get("trackAllCharacters", False)
+    
+    @trackAllCharacters.setter
+    def trackAllCharacters(self, value):
+        for profile in self.allSettings:
+            if (profile["profile"] == "Default"):
+                profile["trackAllCharacters"] = value
+        self.writeSettings()
+        
     @property
     def logLevel(self):
         for profile in self.allSettings:
@@ -678,8 +701,13 @@ class Settings(FileSystemEventHandler):
         if not overviewFile:
             return None
         try:
+            modified = os.stat(overviewFile).st_mtime_ns
+            if overviewFile in self.overviewCache and self.overviewCache[overviewFile][0] == modified:
+                return self.overviewCache[overviewFile][1]
             with open(overviewFile, encoding='utf8') as overviewFileContent:
-                return yaml.safe_load(overviewFileContent.read())
+                overviewSettings = yaml.safe_load(overviewFileContent.read())
+            self.overviewCache[overviewFile] = (modified, overviewSettings)
+            return overviewSettings
         except Exception as e:
             logging.exception('Exception loading overview settings file: ' + overviewFile)
             logging.exception(e)
@@ -1,4 +1,5 @@
 import random
+from engine.events import Event, sessionSymbols
 
 class Simulator():
     def __init__(self, values, interval):
@@ -32,11 +33,8 @@ class Simulator():
     
     def simulateValue(self, value):
         returnValue = []
-        returnGroup = {}
         if ((self.timesRun*self.interval)%(value["cycle"]*1000) == 0):
-            returnGroup['amount'] = random.randint(value["floor"], value["ceiling"])
-            returnGroup['pilotName'] = 'Pilot Name'
-            returnGroup['shipType'] = 'ShipType'
-            returnGroup['weaponType'] = 'Weapon Type'
-            returnValue.append(returnGroup)
+            intern = sessionSymbols.intern
+            returnValue.append(Event(random.randint(value["floor"], value["ceiling"]), 
+                                     intern('Pilot Name'), intern('ShipType'), intern('Weapon Type')))
         return returnValue
\ No newline at end of file
@@ -1,7 +1,28 @@
+"""
+SocketManager:
+    Runs the websocket connection to the fleet server in its own process.
+    The animator puts one message per tick on dataQueue, holding that tick's
+    hits summed per category, pilot and weapon:
+        {'entries': {category: [[pilotName, shipType, weaponType, amount], ...]}}
+    A message may also carry 'time', the epoch time it was produced at, which is
+    passed through to the server so end to end latency can be measured.
+
+    Servers that understand batches list 'batch' in the capabilities of their
+    client_registered reply, those get each message as a single 'peld_data_batch'.
+    Older servers don't reply with capabilities, and get one 'peld_data' per row
+    in the original per-hit format.
+
+    The send loop blocks on dataQueue, so data goes out as soon as the animator
+    produces it, and the process sleeps when there is nothing to send.  The only
+    other wakeup is the peld_check sent every 30 seconds.
+"""
+
 import logging
 import multiprocessing
 import logging
 import threading
+import queue
+import time
 import json
 import uuid
 import webbrowser
@@ -12,8 +33,24 @@ from version import version
 
 urllib3.disable_warnings()
 
+# what this client tells the server it can do during register_client
+_capabilities = ['batch']
+_peldCheckSeconds = 30
+
+def serverCapabilities(args):
+    """ the capabilities listed in a client_registered reply, servers from before batching send none """
+    for arg in args:
+        if isinstance(arg, str):
+            try:
+                arg = json.loads(arg)
+            except ValueError:
+                continue
+        if isinstance(arg, dict):
+            return arg.get('capabilities', [])
+    return []
+
 class SocketManager(multiprocessing.Process):
-    def __init__(self, server, characterName, loginArgs, loginNotificationQueue):
+    def __init__(self, server, characterName, loginArgs, loginNotificationQueue, login=True):
         multiprocessing.Process.__init__(self)
         if server.startswith("http://") or server.startswith("https://"):
             self.server = server
@@ -25,6 +62,8 @@ class SocketManager(multiprocessing.Process):
         self.guid = str(uuid.uuid4())
         self.loginArgs += "&socket_guid=" + self.guid
         self.loginNotificationQueue = loginNotificationQueue
+        # the local fleet server used for load testing doesn't need the browser login
+        self.login = login
         self.dataQueue = multiprocessing.Queue()
         self.fleetMetadataQueue = multiprocessing.Queue()
         self.dataRecieveQueue = multiprocessing.Queue()
@@ -32,6 +71,7 @@ class SocketManager(multiprocessing.Process):
         self.daemon = True
         self.running = True
         self.registered = False
+        self.batchMode = False
         
         logger = logging.getLogger()
         self.loggerLevel = logger.getEffectiveLevel()
@@ -47,7 +87,7 @@ class SocketManager(multiprocessing.Process):
         logging.getLogger("socketio.client").setLevel(30)
         logging.getLogger("engineio.client").setLevel(30)
         _sockMgr = self
-        info = {'version': version.split('-')[0], 'socket_guid': self.guid, 'name': self.characterName}
+        info = {'version': version.split('-')[0], 'socket_guid': self.guid, 'name': self.characterName, 'capabilities': _capabilities}
         peld_check_data = {'socket_guid': self.guid, 'name': self.characterName}
 
         class Namespace(socketio.ClientNamespace):
@@ -59,7 +99,8 @@ class SocketManager(multiprocessing.Process):
                 logger.info('Websocket disconnected from ' + _sockMgr.server)
 
             def on_client_registered(self, *args):
-                logger.info('Websocket client registered with server')
+                _sockMgr.batchMode = 'batch' in serverCapabilities(args)
+                logger.info('Websocket client registered with server' + (', sending batched data' if _sockMgr.batchMode else ''))
                 _sockMgr.loginNotificationQueue.put(True)
                 _sockMgr.registered = True
             
@@ -72,10 +113,21 @@ class SocketManager(multiprocessing.Process):
                 if data['category'] in ['dpsOut', 'dpsIn', 'logiOut']:
                     _sockMgr.dataRecieveQueue.put(data)
             
+            def on_peld_data_batch(self, data):
+                if isinstance(data, str):
+                    data = json.loads(data)
+                entries = {category: rows for category, rows in data['entries'].items() if category in ['dpsOut', 'dpsIn', 'logiOut']}
+                if entries:
+                    fleetEntry = {'owner': data['owner'], 'entries': entries}
+                    if 'time' in data:
+                        fleetEntry['time'] = data['time']
+                    _sockMgr.dataRecieveQueue.put(fleetEntry)
+            
             def on_peld_error(self, data):
                 _sockMgr.errorQueue.put(data)
 
-        webbrowser.open(self.server + self.loginArgs)
+        if self.login:
+            webbrowser.open(self.server + self.loginArgs)
         while self.running:
             try:
                 self.registered = False
@@ -85,22 +137,51 @@ class SocketManager(multiprocessing.Process):
                 while not self.registered:
                     self.socket.emit('register_client', info, namespace='/client')
                     self.socket.sleep(1)
-                timeWaiting = 30.0
+                nextCheck = time.time()
                 while self.running:
-                    while not self.dataQueue.empty():
-                        peld_data = self.dataQueue.get()
-                        peld_data['entry']['owner'] = self.characterName
-                        peld_data['socket_guid'] = self.guid
-                        self.socket.emit('peld_data', peld_data, namespace='/client')
-                    self.socket.sleep(0.1)
-                    timeWaiting += 0.1
-                    if timeWaiting >= 30:
+                    batches = self.waitForBatches(max(nextCheck - time.time(), 0))
+                    if batches:
+                        self.sendBatches(batches)
+                    if time.time() >= nextCheck:
                         self.socket.emit('peld_check', peld_check_data, namespace='/client')
-                        timeWaiting = 1
+                        nextCheck = time.time() + _peldCheckSeconds
             except Exception as e:
                 logger.exception(e)
             except:
                 logger.critical('baseException')
+    
+    def waitForBatches(self, timeout):
+        """ blocks until the animator sends data or 'timeout' seconds pass, then returns everything waiting """
+        try:
+            batches = [self.dataQueue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batches.append(self.dataQueue.get_nowait())
+            except queue.Empty:
+                return batches
+    
+    def sendBatches(self, batches):
+        """ sends the waiting tick messages, as one frame if the server takes batches """
+        if self.batchMode:
+            entries = {}
+            for batch in batches:
+                for category, rows in batch['entries'].items():
+                    entries.setdefault(category, []).extend(rows)
+            peld_data = {'socket_guid': self.guid, 'owner': self.characterName, 'entries': entries}
+            times = [batch['time'] for batch in batches if 'time' in batch]
+            if times:
+                peld_data['time'] = min(times)
+            self.socket.emit('peld_data_batch', peld_data, namespace='/client')
+            return
+        for batch in batches:
+            for category, rows in batch['entries'].items():
+                for pilotName, shipType, weaponType, amount in rows:
+                    entry = {'amount': amount, 'pilotName': pilotName, 'shipType': shipType, 
+                             'weaponType': weaponType, 'owner': self.characterName}
+                    peld_data = {'category': category, 'entry': entry, 'socket_guid': self.guid}
+                    self.socket.emit('peld_data', peld_data, namespace='/client')
 
 def LoggerThread(q):
     while True:
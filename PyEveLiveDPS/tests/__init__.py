@@ -0,0 +1,5 @@
+"""
+Tests, run from the PyEveLiveDPS directory:
+
+    python -m unittest discover tests
+"""
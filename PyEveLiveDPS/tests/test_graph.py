@@ -0,0 +1,258 @@
+"""
+DPSGraph's smoothing and line segmentation are vectorized with numpy.
+These check them against the loops they replaced, which are kept here
+as they were, on random input and on the edge cases.
+"""
+
+import unittest
+import numpy as np
+
+from graph import DPSGraph
+
+class FakeLine:
+    def __init__(self, xValues, yValues, color):
+        self.set_data(xValues, yValues)
+        self.set_color(color)
+        self.visible = True
+        
+    def set_data(self, xValues, yValues):
+        self.xValues = list(xValues)
+        self.yValues = list(yValues)
+        
+    def set_color(self, color):
+        self.color = color
+        
+    def set_visible(self, visible):
+        self.visible = visible
+        
+class FakeSubplot:
+    def __init__(self):
+        self.lines = []
+        
+    def plot(self, xValues, yValues, color=None, zorder=None):
+        line = FakeLine(xValues, yValues, color)
+        self.lines.append(line)
+        return line,
+    
+def makeGraph(degree=5):
+    """ a DPSGraph with just what the smoothing and line code needs, without tk """
+    graph = DPSGraph.__new__(DPSGraph)
+    graph.degree = degree
+    graph.xValues = np.zeros(0)
+    graph.subplot = FakeSubplot()
+    return graph
+
+def oldSmoothListGaussian(list, degree=5):
+    window=degree*2-1  
+    weight=np.array([1.0]*window)  
+    weightGauss=[]  
+
+    for i in range(window):  
+        i=i-degree+1  
+        frac=i/float(window)  
+        gauss=1/(np.exp((4*(frac))**2))  
+        weightGauss.append(gauss)  
+
+    weight=np.array(weightGauss)*weight  
+    smoothed=[0.0]*(len(list)-window) 
+
+    for i in range(len(smoothed)):  
+        smoothed[i]=sum(np.array(list[i:i+window])*weight)/sum(weight)  
+
+    return smoothed  
+
+def oldAnimateLine(self, smoothed, categories, lines, zorder):
+    lineCategoryTracker = 0
+    lastValue = smoothed[0]
+    currentLine = []
+    lineNumber = 0
+    for index, value in enumerate(smoothed):
+        for categoryIndex, lineCategory in enumerate(categories):
+            if categoryIndex == (len(categories)-1):
+                if value >= lineCategory["transitionValue"]:
+                    if lineCategoryTracker == categoryIndex:
+                        currentLine.append(value)
+                    else:
+                        if (lineNumber < len(lines)):
+                            lines[lineNumber].set_data(range(index-len(currentLine), index), currentLine)
+                            lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
+                        else:
+                            newLine, = self.subplot.plot(range(index-len(currentLine), index), currentLine, 
+                                                        categories[lineCategoryTracker]["color"], zorder=zorder)
+                            lines.append(newLine)
+                        lineNumber += 1
+                        lineCategoryTracker = categoryIndex
+                        currentLine = []
+                        currentLine.append(lastValue)
+                        currentLine.append(value)
+            elif value >= lineCategory["transitionValue"] and value < categories[categoryIndex+1]["transitionValue"]:
+                if lineCategoryTracker == categoryIndex:
+                    currentLine.append(value)
+                else:
+                    if (lineNumber < len(lines)):
+                        lines[lineNumber].set_data(range(index-len(currentLine), index), currentLine)
+                        lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
+                    else:
+                        newLine, = self.subplot.plot(range(index-len(currentLine), index), currentLine, 
+                                                    categories[lineCategoryTracker]["color"], zorder=zorder)
+                        lines.append(newLine)
+                    lineNumber += 1
+                    lineCategoryTracker = categoryIndex
+                    currentLine = []
+                    currentLine.append(lastValue)
+                    currentLine.append(value)
+        lastValue = value
+    if (lineNumber < len(lines)):
+        lines[lineNumber].set_data(range(len(smoothed)-len(currentLine), len(smoothed)), currentLine)
+        lines[lineNumber].set_color(categories[lineCategoryTracker]["color"])
+    else:
+        newLine, = self.subplot.plot(range(len(smoothed)-len(currentLine), len(smoothed)), currentLine, 
+                                     categories[lineCategoryTracker]["color"], zorder=zorder)
+        lines.append(newLine)
+        
+    lineNumber += 1
+    while lineNumber < len(lines):
+        self.subplot.lines.remove(lines[lineNumber])
+        lines.pop(lineNumber)
+        lineNumber += 1
+
+def visibleLines(lines):
+    """ (color, x values, y values) of every line that is drawn """
+    return [(line.color, line.xValues, line.yValues) for line in lines if line.visible]
+
+def oldVisibleLines(lines):
+    """
+    The same for the old loop, which left an empty line in front when the first point
+     wasn't in the first category, and gave the next line a copy of the first point at x = -1
+    """
+    drawn = []
+    for line in lines:
+        points = [(x, y) for x, y in zip(line.xValues, line.yValues) if x >= 0]
+        if points:
+            drawn.append((line.color, [x for x, y in points], [y for x, y in points]))
+    return drawn
+
+categories = [
+    {"transitionValue": 0, "color": "#00FF00"},
+    {"transitionValue": 100, "color": "#FFFF00"},
+    {"transitionValue": 300, "color": "#FF0000"}
+    ]
+
+class TestSmoothListGaussian(unittest.TestCase):
+    def setUp(self):
+        self.graph = makeGraph()
+        self.random = np.random.RandomState(42)
+        
+    def test_randomInput(self):
+        for degree in [1, 2, 5, 10]:
+            for length in [50, 200, 1000]:
+                values = list(self.random.uniform(0, 1000, length))
+                new = self.graph.smoothListGaussian(values, degree)
+                old = oldSmoothListGaussian(values, degree)
+                self.assertEqual(len(new), len(old))
+                self.assertTrue(np.allclose(new, old))
+                
+    def test_shorterThanKernel(self):
+        window = 5*2-1
+        for length in range(0, window+3):
+            values = list(self.random.uniform(0, 1000, length))
+            new = self.graph.smoothListGaussian(values, 5)
+            old = oldSmoothListGaussian(values, 5)
+            self.assertEqual(len(new), max(length-window, 0))
+            self.assertEqual(len(new), len(old))
+            self.assertTrue(np.allclose(new, old))
+            
+    def test_smoothTail(self):
+        values = list(self.random.uniform(0, 1000, 100))
+        for end in range(5*2, len(values)):
+            smoothed = oldSmoothListGaussian(values[:end], 5)
+            self.assertTrue(np.isclose(self.graph.smoothTail(values[:end], 5), smoothed[-1]))
+            
+class TestAnimateLine(unittest.TestCase):
+    def setUp(self):
+        self.random = np.random.RandomState(42)
+        
+    def compare(self, smoothed, lineCategories=categories):
+        oldGraph = makeGraph()
+        oldLines = []
+        oldAnimateLine(oldGraph, smoothed, lineCategories, oldLines, 1)
+        graph = makeGraph()
+        lines = []
+        graph.animateLine(None, lineCategories, lines, 1, smoothed=smoothed)
+        self.assertEqual(len(graph.subplot.lines), len(lines))
+        
+        old = oldVisibleLines(oldLines)
+        new = visibleLines(lines)
+        self.assertEqual(len(new), len(old))
+        for (oldColor, oldX, oldY), (newColor, newX, newY) in zip(old, new):
+            self.assertEqual(newColor, oldColor)
+            self.assertTrue(np.array_equal(newX, oldX))
+            self.assertTrue(np.allclose(newY, oldY))
+        return lines
+            
+    def test_randomInput(self):
+        for length in [1, 2, 50, 500]:
+            for scale in [50, 400, 1000]:
+                graph = makeGraph()
+                yValues = list(self.random.uniform(0, scale, length + 9))
+                self.compare(graph.smoothListGaussian(yValues, 5))
+                
+    def test_randomWalk(self):
+        # long runs in one category, crossing the transitions back and forth
+        smoothed = np.clip(200 + np.cumsum(self.random.normal(0, 30, 1000)), 0, None)
+        self.compare(smoothed)
+        
+    def test_onTransitionValue(self):
+        self.compare(np.array([0, 100, 99.9, 300, 299.9, 300, 100, 0], dtype=float))
+        
+    def test_unsortedCategories(self):
+        unsorted = [categories[2], categories[0], categories[1]]
+        graph = makeGraph()
+        lines = []
+        smoothed = np.array([10, 150, 350, 20], dtype=float)
+        graph.animateLine(None, unsorted, lines, 1, smoothed=smoothed)
+        self.assertEqual([line[0] for line in visibleLines(lines)], ["#00FF00", "#FFFF00", "#FF0000", "#00FF00"])
+        
+    def test_belowFirstThreshold(self):
+        # The old loop didn't draw values below the first transition value at all,
+        #  now they are drawn in the first category's color, which is what the old loop
+        #  did when the first transition value is low enough to include them
+        raised = [dict(categories[0], transitionValue=50)] + categories[1:]
+        lowered = [dict(categories[0], transitionValue=-np.inf)] + categories[1:]
+        smoothed = np.array([10, 20, 60, 150, 40, 5, 350, 30], dtype=float)
+        
+        graph = makeGraph()
+        lines = []
+        graph.animateLine(None, raised, lines, 1, smoothed=smoothed)
+        oldGraph = makeGraph()
+        oldLines = []
+        oldAnimateLine(oldGraph, smoothed, lowered, oldLines, 1)
+        self.assertEqual(visibleLines(lines), oldVisibleLines(oldLines))
+        
+        graph = makeGraph()
+        lines = []
+        graph.animateLine(None, raised, lines, 1, smoothed=-smoothed)
+        self.assertEqual(visibleLines(lines), [("#00FF00", list(range(len(smoothed))), list(-smoothed))])
+        
+    def test_shorterThanKernel(self):
+        graph = makeGraph()
+        lines = []
+        graph.animateLine(list(self.random.uniform(0, 1000, 50)), categories, lines, 1)
+        self.assertTrue(len(visibleLines(lines)) > 0)
+        for length in [0, 1, 5*2-1]:
+            graph.animateLine(list(self.random.uniform(0, 1000, length)), categories, lines, 1)
+            self.assertEqual(visibleLines(lines), [])
+            
+    def test_linesReused(self):
+        graph = makeGraph()
+        lines = []
+        graph.animateLine(None, categories, lines, 1, smoothed=np.array([10, 150, 350, 150, 10], dtype=float))
+        pooled = list(lines)
+        graph.animateLine(None, categories, lines, 1, smoothed=np.array([10, 150, 10], dtype=float))
+        self.assertEqual(lines, pooled)
+        self.assertEqual(len(graph.subplot.lines), len(pooled))
+        self.assertEqual(len(visibleLines(lines)), 3)
+        self.assertTrue(np.array_equal(lines[2].xValues, [1, 2]))
+        
+if __name__ == '__main__':
+    unittest.main()